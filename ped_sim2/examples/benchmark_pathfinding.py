@@ -0,0 +1,136 @@
+"""
+Pathfinding benchmark over the preset scenarios.
+
+For every scenario in scenarios/, plans routes from each entrance to each
+exit plus a fixed set of random walkable cell pairs, once per search mode,
+and reports expanded nodes, wall-clock time and path length. Jump Point
+Search must return paths of the same length as plain A*.
+
+Usage:
+    python examples/benchmark_pathfinding.py [--pairs N] [--modes astar jps ...]
+"""
+import sys
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.simulation.environment import Environment
+from src.simulation.simulator import Simulator
+
+
+SCENARIOS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scenarios'))
+
+
+def load_scenarios():
+    """Load every scenario file Environment.from_dict understands as (name, Environment)."""
+    scenarios = []
+    for filename in sorted(os.listdir(SCENARIOS_DIR)):
+        if not filename.endswith('.json') or filename == 'scenarios_index.json':
+            continue
+        with open(os.path.join(SCENARIOS_DIR, filename), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        try:
+            env = Environment.from_dict(data['environment'])
+        except (KeyError, TypeError) as e:
+            print(f"Skipping {filename}: unsupported scenario format ({e!r})")
+            continue
+        scenarios.append((filename[:-5], env))
+    return scenarios
+
+
+def sample_queries(simulator, random_pairs, seed=0):
+    """Entrance-to-exit cell pairs plus random walkable pairs, snapped to free cells."""
+    pathfinder = simulator.pathfinder
+    cs = pathfinder.cell_size
+
+    def to_cell(position):
+        cell = (int(position[0] / cs), int(position[1] / cs))
+        if not pathfinder._is_valid_cell(cell):
+            cell = pathfinder._find_nearest_free_cell(cell)
+        return cell
+
+    queries = []
+    for entrance in simulator.environment.entrances:
+        for exit_zone in simulator.environment.exits:
+            queries.append((to_cell(entrance['position']), to_cell(exit_zone['position'])))
+
+    free = np.argwhere(pathfinder.get_walkable_mask())
+    rng = np.random.RandomState(seed)
+    for _ in range(random_pairs):
+        a, b = free[rng.randint(len(free), size=2)]
+        queries.append(((int(a[1]), int(a[0])), (int(b[1]), int(b[0]))))
+
+    return [(s, g) for s, g in queries if s is not None and g is not None]
+
+
+def path_length(cells):
+    """Length of a cell path in cells."""
+    if cells is None or len(cells) < 2:
+        return 0.0
+    steps = np.diff(np.asarray(cells, dtype=float), axis=0)
+    return float(np.hypot(steps[:, 0], steps[:, 1]).sum())
+
+
+def run_mode(pathfinder, mode, queries):
+    """Run all queries in one mode; returns (expanded, seconds, lengths)."""
+    pathfinder.set_search_mode(mode)
+    # Build the walkable mask and components outside the timed region
+    pathfinder._get_components()
+
+    expanded = 0
+    lengths = []
+    start_time = time.perf_counter()
+    for start, goal in queries:
+        pathfinder.last_expanded = 0
+        cells = pathfinder._search(start, goal)
+        expanded += pathfinder.last_expanded
+        lengths.append(path_length(cells) if cells is not None else np.inf)
+    elapsed = time.perf_counter() - start_time
+    return expanded, elapsed, np.array(lengths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pairs', type=int, default=50,
+                        help='Random walkable pairs per scenario (default: 50)')
+    parser.add_argument('--modes', nargs='+', default=['astar', 'jps'],
+                        help="Search modes to compare; the first is the reference")
+    args = parser.parse_args()
+
+    reference = args.modes[0]
+    print(f"{'scenario':<20}{'mode':<14}{'queries':>8}{'expanded':>12}"
+          f"{'time (ms)':>12}{'length':>12}{'vs ' + reference:>12}")
+
+    all_optimal = True
+    for name, env in load_scenarios():
+        simulator = Simulator(env, dt=0.1)
+        queries = sample_queries(simulator, args.pairs)
+
+        baseline = None
+        for mode in args.modes:
+            expanded, elapsed, lengths = run_mode(simulator.pathfinder, mode, queries)
+            reachable = np.isfinite(lengths)
+            if baseline is None:
+                baseline = lengths
+                ratio = '-'
+            else:
+                both = reachable & np.isfinite(baseline)
+                excess = lengths[both].sum() / max(baseline[both].sum(), 1e-9) - 1.0
+                ratio = f"{excess * 100:+.2f}%"
+                if mode == 'jps' and not np.allclose(lengths[both], baseline[both]):
+                    all_optimal = False
+            print(f"{name:<20}{mode:<14}{len(queries):>8}{expanded:>12}"
+                  f"{elapsed * 1000:>12.1f}{lengths[reachable].sum():>12.1f}{ratio:>12}")
+
+    if 'jps' in args.modes and reference == 'astar':
+        print("\nJPS path lengths match A*" if all_optimal else
+              "\nWARNING: JPS path lengths differ from A*")
+
+
+if __name__ == '__main__':
+    main()
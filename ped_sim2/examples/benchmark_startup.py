@@ -0,0 +1,71 @@
+"""
+Startup benchmark over the preset scenarios.
+
+Times Simulator construction for every scenario in scenarios/, split into
+wall rasterization, road rasterization and the rest of the setup, as the
+median over several repeats.
+
+Usage:
+    python examples/benchmark_startup.py [--repeats N]
+"""
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from examples.benchmark_pathfinding import load_scenarios
+from src.simulation.pathfinding import PathFinder
+from src.simulation.simulator import Simulator
+
+
+def time_rasterization(env):
+    """Seconds spent rasterizing walls and roads onto a fresh grid."""
+    pathfinder = PathFinder((env.width, env.height), cell_size=0.5)
+
+    start_time = time.perf_counter()
+    pathfinder.add_wall_segments(env.walls)
+    wall_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    roads = getattr(env, 'roads', None) or []
+    if roads:
+        pathfinder.set_roads_only_mode(True)
+        for road in roads:
+            pathfinder.add_road_segment([tuple(p) for p in road['points']], road.get('width', 2.0))
+    road_time = time.perf_counter() - start_time
+
+    return wall_time, road_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='Repeats per scenario; the median is reported (default: 5)')
+    args = parser.parse_args()
+
+    print(f"{'scenario':<20}{'walls':>7}{'roads':>7}{'walls (ms)':>12}"
+          f"{'roads (ms)':>12}{'startup (ms)':>14}")
+
+    for name, env in load_scenarios():
+        wall_times, road_times, startup_times = [], [], []
+        for _ in range(args.repeats):
+            wall_time, road_time = time_rasterization(env)
+            wall_times.append(wall_time)
+            road_times.append(road_time)
+
+            start_time = time.perf_counter()
+            Simulator(env, dt=0.1)
+            startup_times.append(time.perf_counter() - start_time)
+
+        roads = len(getattr(env, 'roads', None) or [])
+        print(f"{name:<20}{len(env.walls):>7}{roads:>7}"
+              f"{np.median(wall_times) * 1000:>12.2f}{np.median(road_times) * 1000:>12.2f}"
+              f"{np.median(startup_times) * 1000:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
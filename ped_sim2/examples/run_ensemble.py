@@ -0,0 +1,64 @@
+"""
+Monte Carlo evacuation study over one scenario.
+
+Runs N seeded replicates of a scenario file across worker processes and
+prints the mean evacuation curve, evacuation time and exit usage with
+confidence intervals.
+
+Usage:
+    python examples/run_ensemble.py scenarios/hospital.json [--runs N] [--workers W]
+"""
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.simulation.ensemble import EnsembleRunner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenario', help='Scenario JSON file')
+    parser.add_argument('--runs', type=int, default=20, help='Number of replicates (default: 20)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--pedestrians', type=int, default=None,
+                        help="Pedestrians per run (default: the scenario's recommendation)")
+    parser.add_argument('--max-time', type=float, default=None,
+                        help='Time limit per run in seconds (default: config.json)')
+    parser.add_argument('--interval', type=float, default=10.0,
+                        help='Evacuation curve sample spacing in seconds (default: 10)')
+    args = parser.parse_args()
+
+    runner = EnsembleRunner.from_scenario(args.scenario, pedestrians=args.pedestrians,
+                                          max_time=args.max_time, sample_interval=args.interval)
+    start_time = time.perf_counter()
+    summary = runner.run(args.runs, workers=args.workers)
+    elapsed = time.perf_counter() - start_time
+
+    level = int(runner.confidence * 100)
+    print(f"{args.runs} runs of {runner.template.target_pedestrian_count} pedestrians "
+          f"in {elapsed:.1f}s ({args.workers} workers)")
+    print(f"Evacuated within {runner.max_time:.0f}s: {summary['evacuated_fraction'] * 100:.0f}% of runs")
+    if np.isfinite(summary['evacuation_time_mean']):
+        print(f"Evacuation time: {summary['evacuation_time_mean']:.1f}s "
+              f"({level}% CI {summary['evacuation_time_low']:.1f} - {summary['evacuation_time_high']:.1f})")
+
+    print(f"\n{'time (s)':>10}{'exited':>10}{'CI low':>10}{'CI high':>10}")
+    for t, mean, low, high in zip(summary['times'], summary['exited_mean'],
+                                  summary['exited_low'], summary['exited_high']):
+        print(f"{t:>10.0f}{mean:>10.1f}{low:>10.1f}{high:>10.1f}")
+
+    print(f"\n{'exit':>10}{'count':>10}{'CI low':>10}{'CI high':>10}")
+    for idx, (mean, low, high) in enumerate(zip(summary['exit_counts_mean'],
+                                                summary['exit_counts_low'],
+                                                summary['exit_counts_high'])):
+        print(f"{idx:>10}{mean:>10.1f}{low:>10.1f}{high:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
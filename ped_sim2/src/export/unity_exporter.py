@@ -68,7 +68,7 @@ class UnityExporter:
                 'export_time': datetime.now().isoformat(),
                 'duration': float(simulator.time),
                 'total_pedestrians': int(simulator.stats['spawned']),
-                'frame_count': len(simulator.trajectory_data),
+                'frame_count': len(simulator.recorder),
                 'timestep': float(simulator.dt)
             },
             'environment': self._export_environment(simulator.environment),
@@ -1,18 +1,43 @@
 """Simulation package for pedestrian movement."""
-from .pedestrian import Pedestrian
+from .pedestrian import Pedestrian, PedestrianPool
 from .social_force import SocialForceModel
+from .spatial_hash import SpatialHash
+from .wall_index import WallIndex
+from .hazard_index import HazardIndex
 from .pathfinding import PathFinder
+from .hierarchical import HierarchicalPlanner
+from .incremental import IncrementalPlanner
+from .landmarks import LandmarkHeuristic
+from .navmesh import NavMesh
+from .flow_field import FlowField, FlowFieldCache
 from .environment import Environment
 from .events import EventManager, EventType, Event
 from .simulator import Simulator
+from .recording import TrajectoryRecorder
+from .ensemble import EnsembleRunner
+from .diagnostics import Diagnostics, diagnostics
 
 __all__ = [
     'Pedestrian',
+    'PedestrianPool',
     'SocialForceModel',
+    'SpatialHash',
+    'WallIndex',
+    'HazardIndex',
     'PathFinder',
+    'HierarchicalPlanner',
+    'IncrementalPlanner',
+    'LandmarkHeuristic',
+    'NavMesh',
+    'FlowField',
+    'FlowFieldCache',
     'Environment',
     'EventManager',
     'EventType',
     'Event',
-    'Simulator'
+    'Simulator',
+    'TrajectoryRecorder',
+    'EnsembleRunner',
+    'Diagnostics',
+    'diagnostics'
 ]
@@ -0,0 +1,41 @@
+"""
+Access to the project-wide config.json.
+"""
+import copy
+import json
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+DEFAULT_CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'config.json'))
+
+# Used when config.json or one of its entries is missing
+DEFAULT_MAX_SIMULATION_TIME = 300.0
+
+
+@lru_cache(maxsize=8)
+def _read_config(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_config(path: Optional[str] = None) -> dict:
+    """
+    Load simulation parameters from config.json.
+    
+    Args:
+        path: Config file (defaults to config.json at the project root)
+        
+    Returns:
+        Parsed configuration (a copy; empty if the file does not exist)
+    """
+    return copy.deepcopy(_read_config(os.path.abspath(path or DEFAULT_CONFIG_PATH)))
+
+
+def simulation_setting(config: dict, key: str, default=None):
+    """Value of config['simulation'][key], or default if missing or null."""
+    value = config.get('simulation', {}).get(key)
+    return default if value is None else value
@@ -0,0 +1,101 @@
+"""
+Category-based, sampled diagnostics on top of the logging module.
+
+Each category ('spawn', 'traffic_light', 'pedestrian', 'loop', ...) logs
+to its own logger under ped_sim, so it can be switched on with the usual
+logging configuration, e.g.
+
+    logging.basicConfig()
+    logging.getLogger('ped_sim.spawn').setLevel(logging.DEBUG)
+
+and thinned out with set_sampling(). Hot loops guard their messages with
+enabled(), which is a cached level check when the category is off, so a
+disabled category formats nothing and draws no random numbers.
+"""
+import logging
+import time
+from typing import Dict
+
+
+ROOT_LOGGER = 'ped_sim'
+
+
+class Diagnostics:
+    """Per-category loggers with deterministic sampling and rate limits."""
+
+    def __init__(self, root: str = ROOT_LOGGER):
+        """
+        Initialize diagnostics.
+
+        Args:
+            root: Name of the parent logger of all categories
+        """
+        self.root = root
+        self._loggers: Dict[str, logging.Logger] = {}
+        self._every: Dict[str, int] = {}  # Log one in every N events
+        self._interval: Dict[str, float] = {}  # Minimum seconds between messages
+        self._counts: Dict[str, int] = {}
+        self._last_emit: Dict[str, float] = {}
+
+    def logger(self, category: str) -> logging.Logger:
+        """Logger of a category (ped_sim.<category>)."""
+        logger = self._loggers.get(category)
+        if logger is None:
+            logger = logging.getLogger(f"{self.root}.{category}")
+            self._loggers[category] = logger
+        return logger
+
+    def set_sampling(self, category: str, every: int = 1, interval: float = 0.0):
+        """
+        Thin out the messages of a category.
+
+        Args:
+            category: Category name
+            every: Emit only one in every N enabled events
+            interval: Minimum wall-clock seconds between emitted messages
+        """
+        self._every[category] = max(1, int(every))
+        self._interval[category] = max(0.0, float(interval))
+        self._counts[category] = 0
+        self._last_emit.pop(category, None)
+
+    def enabled(self, category: str, level: int = logging.DEBUG) -> bool:
+        """
+        Whether a message of this category should be built and logged now.
+
+        Also advances the category's sampling state, so call it once per
+        event, right before log().
+
+        Args:
+            category: Category name
+            level: Level the message would be logged at
+
+        Returns:
+            True if the caller should log the message
+        """
+        if not self.logger(category).isEnabledFor(level):
+            return False
+
+        every = self._every.get(category, 1)
+        if every > 1:
+            count = self._counts.get(category, 0)
+            self._counts[category] = count + 1
+            if count % every != 0:
+                return False
+
+        interval = self._interval.get(category, 0.0)
+        if interval > 0.0:
+            now = time.monotonic()
+            last = self._last_emit.get(category)
+            if last is not None and now - last < interval:
+                return False
+            self._last_emit[category] = now
+        return True
+
+    def log(self, category: str, message: str, *args, level: int = logging.DEBUG):
+        """Log a %-style message to a category (formatted only if emitted)."""
+        self.logger(category).log(level, message, *args)
+
+
+# Shared channel used by the simulation modules
+diagnostics = Diagnostics()
@@ -0,0 +1,192 @@
+"""
+Monte Carlo ensembles of seeded simulation runs.
+
+A scenario is loaded and compiled (environment, pathfinding grid) once into
+a template Simulator. The template is shipped to each worker process once,
+and every replicate runs on a private copy of it, so neither the JSON nor
+the grid is rebuilt per run. Per-run evacuation curves and exit counts are
+aggregated into mean arrays with confidence intervals.
+"""
+import copy
+import json
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from scipy import stats as scipy_stats
+
+from .environment import Environment
+from .simulator import Simulator
+
+
+class EnsembleRunner:
+    """Runs seeded replicates of one scenario and summarizes them."""
+
+    def __init__(self, simulator: Simulator, sample_interval: float = 1.0,
+                 max_time: Optional[float] = None, confidence: float = 0.95):
+        """
+        Initialize from a configured, not yet stepped simulator.
+
+        Args:
+            simulator: Template every replicate starts from (not modified)
+            sample_interval: Spacing (s) of the evacuation curve samples
+            max_time: Time limit per run (defaults to the template's
+                max_simulation_time, i.e. config.json)
+            confidence: Confidence level of the reported intervals
+        """
+        self.template = simulator
+        self.sample_interval = sample_interval
+        self.max_time = simulator.max_simulation_time if max_time is None else max_time
+        self.confidence = confidence
+
+    @classmethod
+    def from_scenario(cls, path: str, pedestrians: Optional[int] = None,
+                      dt: float = 0.1, exit_selection_mode: str = 'nearest',
+                      config: Optional[dict] = None, **kwargs) -> 'EnsembleRunner':
+        """
+        Load a scenario file and compile its template simulator.
+
+        Args:
+            path: Scenario JSON (as in scenarios/)
+            pedestrians: Pedestrians per run (defaults to the scenario's
+                recommended_pedestrians, else the Simulator default)
+            dt: Time step (s)
+            exit_selection_mode: 'random', 'nearest' or 'weighted'
+            config: Parsed config.json (loaded from the project root if None)
+            **kwargs: Passed on to EnsembleRunner()
+
+        Returns:
+            EnsembleRunner for the scenario
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        simulator = Simulator(Environment.from_dict(data['environment']), dt=dt, config=config)
+        if pedestrians is None:
+            pedestrians = data.get('recommended_pedestrians')
+        if pedestrians is not None:
+            simulator.target_pedestrian_count = int(pedestrians)
+        simulator.exit_selection_mode = exit_selection_mode
+        simulator.pathfinder.get_walkable_mask()  # Compile before the template is shipped
+        return cls(simulator, **kwargs)
+
+    @property
+    def sample_times(self) -> np.ndarray:
+        """Times (s) at which the evacuation curve is sampled."""
+        return np.arange(0.0, self.max_time + self.sample_interval / 2, self.sample_interval)
+
+    def run(self, runs: int, seeds: Optional[Sequence[int]] = None,
+            workers: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Run replicates and summarize them.
+
+        Args:
+            runs: Number of replicates N
+            seeds: One seed per replicate (defaults to 0..N-1)
+            workers: Worker processes (0 or 1 runs in-process)
+
+        Returns:
+            Dict with per-run arrays ('seeds', 'evacuation_times' (NaN if
+            not evacuated within max_time), 'exited' (N, T), 'exit_counts'
+            (N, exits)) and summaries: 'times' (T,), 'exited_mean' /
+            'exited_low' / 'exited_high', 'exit_counts_mean' / '_low' /
+            '_high', 'evacuation_time_mean' / '_low' / '_high' over the
+            evacuated runs, and 'evacuated_fraction'
+        """
+        seeds = list(range(runs)) if seeds is None else [int(s) for s in seeds]
+        if len(seeds) != runs:
+            raise ValueError(f"Expected {runs} seeds, got {len(seeds)}")
+        tasks = [(seed, self.sample_times) for seed in seeds]
+
+        if workers > 1 and runs > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_ensemble_worker,
+                                     initargs=(self.template,)) as executor:
+                results = list(executor.map(_run_in_worker, tasks))
+        else:
+            results = [run_replicate(self.template, seed, times) for seed, times in tasks]
+
+        return self.summarize(seeds, results)
+
+    def summarize(self, seeds: List[int], results: List[dict]) -> Dict[str, np.ndarray]:
+        """Stack per-run results and add means with confidence intervals."""
+        exited = np.array([r['exited'] for r in results], dtype=float).reshape(len(results), -1)
+        exit_counts = np.array([r['exit_counts'] for r in results], dtype=float).reshape(len(results), -1)
+        evacuation_times = np.array([r['evacuation_time'] for r in results], dtype=float)
+
+        summary = {
+            'seeds': np.array(seeds, dtype=np.int64),
+            'times': self.sample_times,
+            'exited': exited,
+            'exit_counts': exit_counts,
+            'evacuation_times': evacuation_times,
+            'evacuated_fraction': float(np.mean(np.isfinite(evacuation_times))) if results else 0.0,
+        }
+        for name, values in (('exited', exited), ('exit_counts', exit_counts)):
+            mean, low, high = self._mean_interval(values)
+            summary[f'{name}_mean'] = mean
+            summary[f'{name}_low'] = low
+            summary[f'{name}_high'] = high
+
+        mean, low, high = self._mean_interval(evacuation_times[np.isfinite(evacuation_times), None])
+        summary['evacuation_time_mean'] = float(mean[0])
+        summary['evacuation_time_low'] = float(low[0])
+        summary['evacuation_time_high'] = float(high[0])
+        return summary
+
+    def _mean_interval(self, values: np.ndarray):
+        """Column means with Student-t confidence intervals (NaN without data)."""
+        count = len(values)
+        if count == 0:
+            nan = np.full(values.shape[1:], np.nan)
+            return nan, nan, nan
+        mean = values.mean(axis=0)
+        if count == 1:
+            return mean, mean.copy(), mean.copy()
+        half_width = (scipy_stats.t.ppf(0.5 + self.confidence / 2, count - 1) *
+                      values.std(axis=0, ddof=1) / np.sqrt(count))
+        return mean, mean - half_width, mean + half_width
+
+
+def run_replicate(template: Simulator, seed: int, sample_times: np.ndarray) -> dict:
+    """
+    Run one seeded replicate on a copy of a template simulator.
+
+    Args:
+        template: Configured simulator (left untouched)
+        seed: Random seed of the run
+        sample_times: Times (s) at which the exited count is sampled; the
+            last one is the time limit
+
+    Returns:
+        Dict with 'exited' (T,), 'exit_counts' (exits,) and
+        'evacuation_time' (NaN if not evacuated)
+    """
+    simulator = copy.deepcopy(template)
+    simulator.reseed(seed)
+
+    exited = np.zeros(len(sample_times), dtype=np.int64)
+    evacuation_time = np.nan
+    with simulator:
+        for k, sample_time in enumerate(sample_times):
+            if simulator.run_until(Simulator.is_evacuated, max_time=sample_time) and np.isnan(evacuation_time):
+                evacuation_time = simulator.time
+            exited[k] = simulator.stats['exited']
+
+    return {
+        'exited': exited,
+        'exit_counts': simulator.exit_counts.copy(),
+        'evacuation_time': evacuation_time,
+    }
+
+
+_worker_template = None
+
+
+def _init_ensemble_worker(template: Simulator):
+    """Process pool initializer: keep the shipped template for all runs."""
+    global _worker_template
+    _worker_template = template
+
+
+def _run_in_worker(task: tuple) -> dict:
+    """Run one (seed, sample_times) replicate in a worker process."""
+    seed, sample_times = task
+    return run_replicate(_worker_template, seed, sample_times)
@@ -4,6 +4,10 @@ Environment class managing the simulation space, obstacles, and zones.
 import numpy as np
 from typing import List, Tuple, Dict
 
+from .wall_index import WallIndex
+from .hazard_index import HazardIndex
+from .diagnostics import diagnostics
+
 
 class Environment:
     """Represents the simulation environment with walls, entrances, and exits."""
@@ -19,11 +23,23 @@ class Environment:
         self.width = width
         self.height = height
         self.walls = []  # List of wall segments [(start, end), ...]
+        self.walls_version = 0  # Incremented whenever walls change
+        self._wall_index = None  # Cached WallIndex for the current walls
+        self._wall_index_version = -1
         self.entrances = []  # List of entrance zones [(center, radius, flow_rate), ...]
         self.exits = []  # List of exit zones [(center, radius), ...]
+        # Packed copies of the exits, kept in sync by add/block/unblock_exit
+        self.exit_positions = np.zeros((0, 2))
+        self.exit_radii = np.zeros(0)
+        self.exit_active = np.zeros(0, dtype=bool)
         self.hazard_zones = []  # Emergency hazards [(center, radius, type), ...]
+        self.hazard_version = 0  # Incremented whenever hazard_zones changes
+        self._hazard_index = None  # Cached HazardIndex for the current hazards
+        self._hazard_index_version = -1
         self.blocked_entrances = set()  # Set of blocked entrance indices
         self.roads = []  # List of road segments
+        self._crossings = None  # Crossing lanes compiled into arrays
+        self._crossings_key = None
         self.decorations = []  # List of decorative elements (trees, ponds, etc.)
         
     def add_wall(self, start: Tuple[float, float], end: Tuple[float, float]):
@@ -35,6 +51,7 @@ class Environment:
             end: Wall end point (x, y)
         """
         self.walls.append([np.array(start), np.array(end)])
+        self.walls_version += 1
     
     def add_entrance(self, position: Tuple[float, float], radius: float = 1.0, 
                      flow_rate: float = 2.0):
@@ -66,6 +83,9 @@ class Environment:
             'radius': radius,
             'active': True
         })
+        self.exit_positions = np.vstack([self.exit_positions, np.asarray(position, dtype=float)])
+        self.exit_radii = np.append(self.exit_radii, float(radius))
+        self.exit_active = np.append(self.exit_active, True)
     
     def add_hazard_zone(self, position: Tuple[float, float], radius: float, 
                        hazard_type: str = 'fire'):
@@ -83,6 +103,7 @@ class Environment:
             'type': hazard_type,
             'intensity': 1.0
         })
+        self.hazard_version += 1
     
     def block_entrance(self, entrance_idx: int):
         """Block an entrance (emergency closure)."""
@@ -100,16 +121,23 @@ class Environment:
         """Block an exit (emergency closure)."""
         if 0 <= exit_idx < len(self.exits):
             self.exits[exit_idx]['active'] = False
+            self.exit_active[exit_idx] = False
     
     def unblock_exit(self, exit_idx: int):
         """Unblock an exit."""
         if 0 <= exit_idx < len(self.exits):
             self.exits[exit_idx]['active'] = True
+            self.exit_active[exit_idx] = True
     
     def remove_hazard(self, hazard_idx: int):
         """Remove a hazard zone."""
         if 0 <= hazard_idx < len(self.hazard_zones):
             self.hazard_zones.pop(hazard_idx)
+            self.hazard_version += 1
+    
+    def mark_hazards_changed(self):
+        """Signal that hazard_zones was modified in place by the caller."""
+        self.hazard_version += 1
     
     def is_point_in_hazard(self, position: np.ndarray) -> Tuple[bool, float]:
         """
@@ -121,17 +149,23 @@ class Environment:
         Returns:
             Tuple of (is_in_hazard, panic_level)
         """
-        max_panic = 0.0
-        
-        for hazard in self.hazard_zones:
-            distance = np.linalg.norm(position - hazard['position'])
-            if distance < hazard['radius']:
-                # Panic increases closer to hazard center
-                panic = hazard['intensity'] * (1.0 - distance / hazard['radius'])
-                max_panic = max(max_panic, panic)
-        
+        max_panic = float(self.get_panic_levels(np.asarray(position, dtype=float)[None, :])[0])
         return max_panic > 0, max_panic
     
+    def get_panic_levels(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Batched version of is_point_in_hazard.
+        
+        Args:
+            positions: (N, 2) points to check
+            
+        Returns:
+            (N,) panic levels; a point is in a hazard iff its level is > 0
+        """
+        if not self.hazard_zones:
+            return np.zeros(len(positions))
+        return self.get_hazard_index().panic_levels(positions)
+    
     def get_nearest_exit(self, position: np.ndarray) -> np.ndarray:
         """
         Find the nearest active exit to a position.
@@ -142,22 +176,48 @@ class Environment:
         Returns:
             Position of nearest exit
         """
-        active_exits = [e for e in self.exits if e['active']]
-        
-        if not active_exits:
+        exit_idx = self.get_nearest_exit_indices(np.asarray(position, dtype=float)[None, :])[0]
+        if exit_idx < 0:
             # No active exits, return center of environment
             return np.array([self.width / 2, self.height / 2])
+        return self.exits[exit_idx]['position']
+    
+    def get_nearest_exit_indices(self, positions: np.ndarray,
+                                 candidates: np.ndarray = None) -> np.ndarray:
+        """
+        Index of the nearest active exit for a batch of positions.
         
-        min_distance = float('inf')
-        nearest_exit = active_exits[0]['position']
-        
-        for exit_zone in active_exits:
-            distance = np.linalg.norm(position - exit_zone['position'])
-            if distance < min_distance:
-                min_distance = distance
-                nearest_exit = exit_zone['position']
+        Args:
+            positions: (N, 2) positions
+            candidates: Optional (N, E) boolean mask further restricting the
+                exits each position may choose from
+            
+        Returns:
+            (N,) exit indices, -1 where no exit is available
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        allowed = np.broadcast_to(self.exit_active, (len(positions), len(self.exits)))
+        if candidates is not None:
+            allowed = allowed & candidates
+        if allowed.shape[1] == 0:
+            return np.full(len(positions), -1, dtype=np.int64)
+        
+        diff = positions[:, None, :] - self.exit_positions[None, :, :]
+        distance = np.where(allowed, np.einsum('ijk,ijk->ij', diff, diff), np.inf)
+        nearest = np.argmin(distance, axis=1)
+        return np.where(allowed.any(axis=1), nearest, -1)
+    
+    def get_nearest_exits(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Batched version of get_nearest_exit.
         
-        return nearest_exit
+        Args:
+            positions: (N, 2) positions
+            
+        Returns:
+            (N, 2) nearest active exit positions (environment center if none)
+        """
+        return self._exit_positions_or_center(self.get_nearest_exit_indices(positions))
     
     def get_alternative_exit(self, position: np.ndarray, blocked_exit: np.ndarray) -> np.ndarray:
         """
@@ -170,33 +230,60 @@ class Environment:
         Returns:
             Position of alternative exit
         """
-        active_exits = [e for e in self.exits if e['active']]
-        
-        if not active_exits:
-            return np.array([self.width / 2, self.height / 2])
+        return self.get_alternative_exits(np.asarray(position, dtype=float)[None, :],
+                                          np.asarray(blocked_exit, dtype=float)[None, :])[0]
+    
+    def get_alternative_exits(self, positions: np.ndarray, blocked_exits: np.ndarray) -> np.ndarray:
+        """
+        Batched version of get_alternative_exit.
         
-        # Filter out the blocked exit (with some tolerance)
-        alternative_exits = []
-        for exit_zone in active_exits:
-            distance_to_blocked = np.linalg.norm(exit_zone['position'] - blocked_exit)
-            if distance_to_blocked > 2.0:  # More than 2m away from blocked exit
-                alternative_exits.append(exit_zone)
+        Exits more than 2 m from the blocked one are preferred; if every
+        active exit is that close, all active exits are considered.
         
-        if not alternative_exits:
-            # If all exits are near the blocked one, return the farthest one
-            alternative_exits = active_exits
+        Args:
+            positions: (N, 2) current positions
+            blocked_exits: (N, 2) exit each position should avoid
+            
+        Returns:
+            (N, 2) alternative exit positions (environment center if none)
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        blocked_exits = np.asarray(blocked_exits, dtype=float).reshape(-1, 2)
         
-        # Find nearest alternative exit
-        min_distance = float('inf')
-        best_exit = alternative_exits[0]['position']
+        distance_to_blocked = np.linalg.norm(
+            self.exit_positions[None, :, :] - blocked_exits[:, None, :], axis=2)
+        alternatives = (distance_to_blocked > 2.0) & self.exit_active[None, :]
+        # If all exits are near the blocked one, fall back to any active exit
+        alternatives[~alternatives.any(axis=1)] = True
         
-        for exit_zone in alternative_exits:
-            distance = np.linalg.norm(position - exit_zone['position'])
-            if distance < min_distance:
-                min_distance = distance
-                best_exit = exit_zone['position']
+        return self._exit_positions_or_center(self.get_nearest_exit_indices(positions, alternatives))
+    
+    def find_exits_reached(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Detect which positions are inside an active exit zone.
         
-        return best_exit
+        Args:
+            positions: (N, 2) positions
+            
+        Returns:
+            (N,) index of the first active exit each position is inside, or -1
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if len(self.exits) == 0 or len(positions) == 0:
+            return np.full(len(positions), -1, dtype=np.int64)
+        
+        diff = positions[:, None, :] - self.exit_positions[None, :, :]
+        inside = np.einsum('ijk,ijk->ij', diff, diff) < self.exit_radii[None, :] ** 2
+        inside &= self.exit_active[None, :]
+        return np.where(inside.any(axis=1), np.argmax(inside, axis=1), -1)
+    
+    def _exit_positions_or_center(self, exit_indices: np.ndarray) -> np.ndarray:
+        """Exit positions for indices, with the environment center for -1."""
+        result = np.empty((len(exit_indices), 2))
+        result[:] = [self.width / 2, self.height / 2]
+        found = exit_indices >= 0
+        result[found] = self.exit_positions[exit_indices[found]]
+        return result
     
     def is_path_blocked_by_hazard(self, start: np.ndarray, end: np.ndarray) -> bool:
         """
@@ -209,45 +296,63 @@ class Environment:
         Returns:
             True if path intersects any hazard zone
         """
-        for hazard in self.hazard_zones:
-            hazard_pos = hazard['position']
-            hazard_radius = hazard['radius']
-            
-            # Calculate distance from hazard center to line segment
-            line_vec = end - start
-            line_len = np.linalg.norm(line_vec)
-            
-            if line_len < 0.01:
-                # Start and end are the same point
-                distance = np.linalg.norm(start - hazard_pos)
-                if distance < hazard_radius:
-                    return True
-                continue
-            
-            line_dir = line_vec / line_len
-            
-            # Vector from start to hazard center
-            to_hazard = hazard_pos - start
-            
-            # Project onto line
-            projection = np.dot(to_hazard, line_dir)
-            projection = np.clip(projection, 0, line_len)
-            
-            # Closest point on line to hazard center
-            closest_point = start + line_dir * projection
-            
-            # Distance from hazard center to closest point
-            distance = np.linalg.norm(closest_point - hazard_pos)
-            
-            if distance < hazard_radius:
-                return True
+        return bool(self.are_paths_blocked_by_hazard(np.asarray(start)[None, :],
+                                                     np.asarray(end)[None, :])[0])
+    
+    def are_paths_blocked_by_hazard(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Batched version of is_path_blocked_by_hazard.
         
-        return False
+        Args:
+            starts: (N, 2) start positions
+            ends: (N, 2) end positions
+            
+        Returns:
+            (N,) boolean array, True where the segment intersects a hazard zone
+        """
+        if not self.hazard_zones:
+            return np.zeros(len(starts), dtype=bool)
+        return self.get_hazard_index().segments_blocked(starts, ends)
     
     def get_walls_as_segments(self) -> List[np.ndarray]:
         """Get all wall segments."""
         return self.walls
     
+    def get_wall_index(self, cutoff: float = 2.0) -> WallIndex:
+        """
+        Get the compiled wall index, rebuilding it only if walls changed.
+        
+        Args:
+            cutoff: Wall interaction cutoff distance (m)
+            
+        Returns:
+            WallIndex over the current walls
+        """
+        index = self._wall_index
+        if index is None or index.cutoff != cutoff or self._wall_index_version != self.walls_version:
+            self._wall_index = WallIndex(self.walls, cutoff)
+            self._wall_index_version = self.walls_version
+        return self._wall_index
+    
+    def get_hazard_index(self, margin: float = 0.0) -> HazardIndex:
+        """
+        Get the compiled hazard index, rebuilding it only if hazards changed.
+        
+        Args:
+            margin: Extra query distance (m) beyond 1.5 hazard radii
+            
+        Returns:
+            HazardIndex over the current hazard zones
+        """
+        index = self._hazard_index
+        if (index is None or index.margin < margin or
+                self._hazard_index_version != self.hazard_version):
+            if index is not None:
+                margin = max(margin, index.margin)  # Keep serving earlier callers
+            self._hazard_index = HazardIndex(self.hazard_zones, margin)
+            self._hazard_index_version = self.hazard_version
+        return self._hazard_index
+    
     def get_traffic_light_state(self, position: np.ndarray, direction: np.ndarray) -> Tuple[bool, str]:
         """
         Check if pedestrian should stop at traffic light before entering crossing.
@@ -259,84 +364,113 @@ class Environment:
         Returns:
             Tuple of (should_stop, reason)
         """
-        if not hasattr(self, 'traffic_lights') or not hasattr(self, 'crossing_lanes'):
+        light_idx = self._red_light_stops(np.asarray(position, dtype=float)[None, :],
+                                          np.asarray(direction, dtype=float)[None, :])[0]
+        if light_idx < 0:
             return (False, "")
+        light_id = self.traffic_lights[light_idx]['id']
+        if diagnostics.enabled('crossing'):
+            diagnostics.log('crossing', "Ped at [%.1f,%.1f] stops for %s",
+                            position[0], position[1], light_id)
+        return (True, f"Red light at {light_id}")
+    
+    def get_traffic_light_stop_mask(self, positions: np.ndarray, directions: np.ndarray) -> np.ndarray:
+        """
+        Batched version of get_traffic_light_state.
         
-        if np.linalg.norm(direction) < 0.01:
-            return (False, "")
+        Args:
+            positions: (N, 2) pedestrian positions
+            directions: (N, 2) directions the pedestrians are moving
+            
+        Returns:
+            (N,) boolean array, True where a pedestrian must stop at a red light
+        """
+        return self._red_light_stops(positions, directions) >= 0
+    
+    def compile_crossings(self):
+        """
+        Pack crossing lanes into arrays and index traffic lights by id.
         
-        # Normalize direction
-        dir_normalized = direction / np.linalg.norm(direction)
+        Called by from_dict; get_traffic_light_state recompiles on its own
+        if crossing_lanes or traffic_lights are replaced afterwards.
+        """
+        lanes = getattr(self, 'crossing_lanes', [])
+        lights = getattr(self, 'traffic_lights', [])
+        self._crossings_key = (id(lanes), len(lanes), id(lights), len(lights))
+        
+        light_index = {}
+        for idx, light in enumerate(lights):
+            light_index.setdefault(light['id'], idx)
+        
+        # Degenerate crossings (shorter than 1 cm) never stop anyone
+        lanes = [c for c in lanes
+                 if np.linalg.norm(np.subtract(c['end'], c['start'], dtype=float)) >= 0.01]
+        starts = np.array([c['start'] for c in lanes], dtype=float).reshape(-1, 2)
+        vectors = np.array([c['end'] for c in lanes], dtype=float).reshape(-1, 2) - starts
+        lengths = np.linalg.norm(vectors, axis=1)
+        directions = vectors / np.maximum(lengths, 1e-12)[:, None]
+        
+        self._crossings = {
+            'starts': starts,
+            'directions': directions,
+            'perpendiculars': np.column_stack([-directions[:, 1], directions[:, 0]]),
+            'lengths': lengths,
+            'half_widths': np.array([c.get('width', 4) for c in lanes], dtype=float) / 2.0,
+            # Index into traffic_lights of each crossing's light, -1 if none
+            'lights': np.array([light_index.get(c.get('trafficLightId'), -1) for c in lanes],
+                               dtype=np.int64),
+        }
+    
+    def _red_light_stops(self, positions: np.ndarray, directions: np.ndarray) -> np.ndarray:
+        """
+        Red traffic light each pedestrian has to wait at.
         
-        # Check each crossing lane
-        for crossing in self.crossing_lanes:
-            start = np.array(crossing['start'])
-            end = np.array(crossing['end'])
-            width = crossing.get('width', 4)
-            
-            # Calculate crossing vector and direction
-            crossing_vec = end - start
-            if np.linalg.norm(crossing_vec) < 0.01:
-                continue
-            crossing_dir = crossing_vec / np.linalg.norm(crossing_vec)
-            crossing_length = np.linalg.norm(crossing_vec)
-            
-            # Check if pedestrian's movement direction aligns with crossing
-            # (moving parallel to the crossing)
-            alignment = abs(np.dot(dir_normalized, crossing_dir))
-            
-            # Only check if moving parallel to crossing (alignment > 0.7)
-            if alignment > 0.7:
-                # Project pedestrian position onto crossing line
-                to_ped = position - start
-                proj_on_crossing = np.dot(to_ped, crossing_dir)
-                
-                # Check if pedestrian is within lateral bounds of crossing (with 5m buffer)
-                # Expanded buffer to catch pedestrians approaching from outside crossing area
-                lateral_buffer = 5.0
-                if -lateral_buffer <= proj_on_crossing <= crossing_length + lateral_buffer:
-                    # Calculate perpendicular distance to crossing line
-                    # Perpendicular vector (rotate crossing_dir by 90°)
-                    perp_vec = np.array([-crossing_dir[1], crossing_dir[0]])
-                    perp_dist_signed = np.dot(to_ped, perp_vec)
-                    perp_dist = abs(perp_dist_signed)
-                    
-                    # CRITICAL: If pedestrian is within the crossing width (on the zebra crossing),
-                    # NEVER stop them - let them finish crossing regardless of light state
-                    if perp_dist < width/2.0:
-                        # Debug: Show when we skip stopping someone on the crossing
-                        if np.random.random() < 0.005:  # 0.5% sampling
-                            print(f"ON CROSSING: Ped at [{position[0]:.1f},{position[1]:.1f}] on {crossing.get('trafficLightId', 'unknown')}, perp_dist={perp_dist:.2f} < {width/2.0:.2f}, allowing to continue")
-                        continue  # Skip this crossing, don't stop them
-                    
-                    # Check if approaching (moving toward crossing, not away)
-                    moving_toward = np.dot(dir_normalized, perp_vec) * perp_dist_signed < 0
-                    
-                    # Stop line: 3m before crossing edge (5m from center)
-                    stop_distance = width/2.0 + 3.0
-                    
-                    # Only check pedestrians in the approach zone (between crossing edge and stop line)
-                    # perp_dist is between width/2 (2m) and stop_distance (5m)
-                    in_approach_zone = perp_dist < stop_distance
-                    
-                    # Additional check: Pedestrian must be within crossing lateral bounds
-                    # to be stopped (not just in the buffer zone)
-                    # This prevents stopping pedestrians who are walking diagonally past the crossing
-                    within_crossing_bounds = 0 <= proj_on_crossing <= crossing_length
-                    
-                    # Stop if in approach zone, moving toward crossing, and within lateral bounds
-                    if in_approach_zone and moving_toward and within_crossing_bounds:
-                        # Check traffic light state
-                        traffic_light_id = crossing.get('trafficLightId')
-                        if traffic_light_id:
-                            for light in self.traffic_lights:
-                                if light['id'] == traffic_light_id and light.get('state') == 'red':
-                                    # Debug output for detection
-                                    if np.random.random() < 0.01:  # Only print 1% of the time to avoid spam
-                                        print(f"DETECTED! Ped at [{position[0]:.1f},{position[1]:.1f}] stop for {traffic_light_id}, perp_dist={perp_dist:.2f}, perp_signed={perp_dist_signed:.2f}, align={alignment:.2f}, moving_toward={moving_toward}")
-                                    return (True, f"Red light at {traffic_light_id}")
-        
-        return (False, "")
+        A pedestrian stops when moving roughly along a crossing (alignment
+        > 0.7), within its length, outside its width (those already on the
+        zebra always finish crossing), within 3 m of its edge and heading
+        towards it, while the crossing's light is red.
+        
+        Returns:
+            (N,) index into traffic_lights of the first such light, or -1
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+        no_stop = np.full(len(positions), -1, dtype=np.int64)
+        if not hasattr(self, 'traffic_lights') or not hasattr(self, 'crossing_lanes'):
+            return no_stop
+        
+        lanes, lights = self.crossing_lanes, self.traffic_lights
+        if self._crossings is None or self._crossings_key != (id(lanes), len(lanes), id(lights), len(lights)):
+            self.compile_crossings()
+        crossings = self._crossings
+        if len(crossings['lengths']) == 0 or len(positions) == 0:
+            return no_stop
+        
+        # Only crossings whose light is red right now matter
+        red = np.array([light.get('state') == 'red' for light in lights] + [False])
+        crossing_red = red[crossings['lights']]
+        if not crossing_red.any():
+            return no_stop
+        
+        speed = np.linalg.norm(directions, axis=1)
+        moving = speed >= 0.01
+        unit = directions / np.where(moving, speed, 1.0)[:, None]
+        
+        to_ped = positions[:, None, :] - crossings['starts'][None, :, :]
+        along = np.einsum('ijk,jk->ij', to_ped, crossings['directions'])
+        across = np.einsum('ijk,jk->ij', to_ped, crossings['perpendiculars'])
+        distance = np.abs(across)
+        alignment = np.abs(unit @ crossings['directions'].T)
+        moving_toward = (unit @ crossings['perpendiculars'].T) * across < 0
+        half_width = crossings['half_widths'][None, :]
+        
+        stop = ((alignment > 0.7) &
+                (along >= 0) & (along <= crossings['lengths'][None, :]) &
+                (distance >= half_width) & (distance < half_width + 3.0) &
+                moving_toward & crossing_red[None, :] & moving[:, None])
+        
+        first = np.argmax(stop, axis=1)
+        return np.where(stop.any(axis=1), crossings['lights'][first], -1)
     
     def is_on_crossing(self, position: np.ndarray) -> bool:
         """Check if position is on a crossing lane."""
@@ -453,5 +587,6 @@ class Environment:
         env.pedestrian_lanes = data.get('pedestrianLanes', [])
         env.car_lanes = data.get('carLanes', [])
         env.vehicles = data.get('vehicles', [])
+        env.compile_crossings()
         
         return env
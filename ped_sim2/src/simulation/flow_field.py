@@ -0,0 +1,188 @@
+"""
+Per-exit flow fields for crowd navigation.
+
+Instead of planning an A* path for every pedestrian, one Dijkstra sweep from
+each exit over the pathfinding grid gives the walking distance to that exit
+from every cell. Pedestrians then read their desired direction with a single
+grid lookup.
+"""
+import numpy as np
+from typing import Dict, Optional, Tuple
+from scipy import ndimage
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from .pathfinding import PathFinder
+from .grid import NEIGHBOR_STEPS, grid_graph
+
+
+class FlowField:
+    """Distance and direction field towards a single exit."""
+
+    def __init__(self, pathfinder: PathFinder, exit_position: np.ndarray,
+                 exit_radius: float = 0.0, walkable: Optional[np.ndarray] = None,
+                 graph: Optional[csr_matrix] = None, exit_idx: Optional[int] = None):
+        """
+        Compute the field with a multi-source Dijkstra sweep from the exit.
+
+        Args:
+            pathfinder: PathFinder whose grid defines walkability
+            exit_position: Exit center [x, y]
+            exit_radius: Cells whose centers lie within this radius are goals
+            walkable: Precomputed walkability mask (optional)
+            graph: Precomputed grid graph for the mask (optional)
+            exit_idx: Index of the exit in Environment.exits (optional)
+        """
+        self.exit_idx = exit_idx
+        self.cell_size = pathfinder.cell_size
+        self.exit_position = np.array(exit_position, dtype=float)
+        self.version = pathfinder.version
+
+        if walkable is None:
+            walkable = pathfinder.get_walkable_mask()
+        if graph is None:
+            graph = grid_graph(walkable)
+        height, width = walkable.shape
+        self.walkable = walkable
+
+        # Goal cells: walkable cells inside the exit zone, or the nearest free cell
+        centers_x = np.arange(width) * self.cell_size + self.cell_size / 2
+        centers_y = np.arange(height) * self.cell_size + self.cell_size / 2
+        in_exit = ((centers_x[None, :] - self.exit_position[0]) ** 2 +
+                   (centers_y[:, None] - self.exit_position[1]) ** 2) <= exit_radius ** 2
+        sources = np.flatnonzero(in_exit & walkable)
+        if len(sources) == 0:
+            cell = (int(self.exit_position[0] / self.cell_size),
+                    int(self.exit_position[1] / self.cell_size))
+            if not pathfinder._is_valid_cell(cell):
+                cell = pathfinder._find_nearest_free_cell(cell)
+            sources = np.array([cell[1] * width + cell[0]] if cell is not None else [], dtype=int)
+
+        if len(sources) > 0:
+            distances = dijkstra(graph, directed=True, indices=sources, min_only=True)
+        else:
+            distances = np.full(height * width, np.inf)
+        self.distances = distances.reshape(height, width)
+        self.goal_mask = np.zeros((height, width), dtype=bool)
+        self.goal_mask.flat[sources] = True
+
+        # Nearest walkable (y, x) of every cell; the pathfinder's map is
+        # reused when the field is built from its current mask
+        nearest_free = None
+        if walkable.any():
+            if walkable is pathfinder.get_walkable_mask():
+                margin = pathfinder.NEAREST_FREE_RADIUS
+                nearest_free = pathfinder._get_nearest_free_map()[:, margin:-margin, margin:-margin]
+            else:
+                _, nearest_free = ndimage.distance_transform_edt(~walkable, return_indices=True)
+        self.directions = self._compute_directions(nearest_free)
+
+    def _compute_directions(self, nearest_free: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Unit direction from every cell towards its steepest-descent neighbor.
+
+        Blocked cells (walls, hazard buffers) take the direction of their
+        nearest walkable cell, the way A* snaps a blocked start to a free
+        cell, so agents pushed into them are not sent straight at the exit.
+        """
+        height, width = self.distances.shape
+        padded = np.full((height + 2, width + 2), np.inf)
+        padded[1:-1, 1:-1] = self.distances
+
+        best = np.full((height, width), np.inf)
+        best_step = np.zeros((height, width, 2))
+        for dx, dy, cost in NEIGHBOR_STEPS:
+            candidate = padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width] + cost
+            better = candidate < best
+            best[better] = candidate[better]
+            best_step[better] = (dx / cost, dy / cost)
+
+        # Only cells that actually descend towards the exit get a direction
+        descends = np.isfinite(self.distances) & (best <= self.distances + 1e-9)
+        best_step[~descends | self.goal_mask] = 0.0
+
+        if nearest_free is not None:
+            blocked = ~self.walkable
+            best_step[blocked] = best_step[nearest_free[0][blocked], nearest_free[1][blocked]]
+        return best_step
+
+    def _cell_of(self, position: np.ndarray) -> Tuple[int, int]:
+        """Grid cell (x, y) containing a position, clamped to the grid."""
+        height, width = self.distances.shape
+        x = min(max(int(position[0] / self.cell_size), 0), width - 1)
+        y = min(max(int(position[1] / self.cell_size), 0), height - 1)
+        return x, y
+
+    def direction_at(self, position: np.ndarray) -> np.ndarray:
+        """
+        Desired walking direction at a position.
+
+        Args:
+            position: World position [x, y]
+
+        Returns:
+            Unit direction, or straight towards the exit where the field has
+            no information (exit zone, cells that cannot reach the exit)
+        """
+        x, y = self._cell_of(position)
+        direction = self.directions[y, x]
+        if direction[0] == 0.0 and direction[1] == 0.0:
+            direction = self.exit_position - position
+            norm = np.linalg.norm(direction)
+            return direction / norm if norm > 0 else np.zeros(2)
+        return direction.copy()
+
+    def distance_at(self, position: np.ndarray) -> float:
+        """Walking distance (m) from a position to the exit, inf if unreachable."""
+        x, y = self._cell_of(position)
+        return float(self.distances[y, x]) * self.cell_size
+
+
+class FlowFieldCache:
+    """
+    Flow fields for each exit, recomputed only when walkability changes.
+
+    Fields are keyed by exit index and tagged with the PathFinder version
+    they were built from; walls, roads and hazards all bump that version.
+    """
+
+    def __init__(self, pathfinder: PathFinder):
+        """
+        Initialize cache.
+
+        Args:
+            pathfinder: PathFinder whose grid the fields are computed on
+        """
+        self.pathfinder = pathfinder
+        self.fields: Dict[int, FlowField] = {}
+        self._mask_version = None
+        self._walkable = None
+        self._graph = None
+
+    def get(self, exit_idx: int, exit_zone: dict) -> FlowField:
+        """
+        Get the flow field towards an exit, computing it if stale.
+
+        Args:
+            exit_idx: Index of the exit in Environment.exits
+            exit_zone: Exit dictionary with 'position' and 'radius'
+
+        Returns:
+            Up-to-date FlowField
+        """
+        field = self.fields.get(exit_idx)
+        if (field is None or field.version != self.pathfinder.version or
+                not np.array_equal(field.exit_position, exit_zone['position'])):
+            if self._mask_version != self.pathfinder.version:
+                self._walkable = self.pathfinder.get_walkable_mask()
+                self._graph = grid_graph(self._walkable)
+                self._mask_version = self.pathfinder.version
+            field = FlowField(self.pathfinder, exit_zone['position'], exit_zone['radius'],
+                              self._walkable, self._graph, exit_idx)
+            self.fields[exit_idx] = field
+        return field
+
+    def clear(self):
+        """Drop all cached fields."""
+        self.fields = {}
+        self._mask_version = None
@@ -0,0 +1,45 @@
+"""
+Shared helpers for the 8-connected pathfinding grid.
+"""
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+# 8-connected neighborhood as (dx, dy, step cost in cells)
+NEIGHBOR_STEPS = [(dx, dy, float(np.hypot(dx, dy)))
+                  for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                  if dx != 0 or dy != 0]
+
+
+def grid_graph(walkable: np.ndarray) -> csr_matrix:
+    """
+    Build the 8-connected movement graph over walkable cells.
+
+    Nodes are flat cell indices (y * width + x); an edge joins two
+    walkable neighboring cells, weighted by the step length in cells.
+
+    Args:
+        walkable: Boolean (height, width) walkability mask
+
+    Returns:
+        Sparse adjacency matrix of the grid graph
+    """
+    height, width = walkable.shape
+    ids = np.arange(height * width).reshape(height, width)
+    rows, cols, weights = [], [], []
+
+    for dx, dy, cost in NEIGHBOR_STEPS:
+        # Source cells whose neighbor at (dx, dy) lies inside the grid
+        src_y = slice(max(0, -dy), height - max(0, dy))
+        src_x = slice(max(0, -dx), width - max(0, dx))
+        dst_y = slice(max(0, dy), height - max(0, -dy))
+        dst_x = slice(max(0, dx), width - max(0, -dx))
+
+        both = walkable[src_y, src_x] & walkable[dst_y, dst_x]
+        rows.append(ids[src_y, src_x][both])
+        cols.append(ids[dst_y, dst_x][both])
+        weights.append(np.full(int(both.sum()), cost))
+
+    size = height * width
+    return csr_matrix((np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(size, size))
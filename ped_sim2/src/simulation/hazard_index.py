@@ -0,0 +1,206 @@
+"""
+Packed hazard zone arrays with a grid bucket index for point and radius queries.
+"""
+import numpy as np
+from typing import List, Tuple
+
+
+class HazardIndex:
+    """
+    Static index over hazard discs.
+
+    Hazards are packed into center/radius/intensity arrays once, and each
+    hazard is registered in every grid bucket within its reach: 1.5 times
+    its radius (the range of hazard repulsion) plus a margin. A query point
+    then only has to test the hazards listed in its own bucket.
+    """
+
+    # Reach of a hazard as a multiple of its radius (hazard repulsion range)
+    RADIUS_SCALE = 1.5
+
+    def __init__(self, hazards: List[dict], margin: float = 0.0, cell_size: float = 2.0):
+        """
+        Compile hazard zones into packed arrays and bucket them.
+
+        Args:
+            hazards: Hazard zone dictionaries with 'position', 'radius' and
+                optionally 'type' and 'intensity'
+            margin: Extra distance (m) beyond RADIUS_SCALE * radius that
+                radius queries may ask for
+            cell_size: Bucket side (m)
+        """
+        self.margin = margin
+        self.cell_size = cell_size
+
+        if len(hazards) > 0:
+            self.centers = np.array([h['position'] for h in hazards], dtype=float).reshape(-1, 2)
+            self.radii = np.array([h['radius'] for h in hazards], dtype=float)
+            self.intensities = np.array([h.get('intensity', 1.0) for h in hazards], dtype=float)
+            self.is_fire = np.array([h.get('type') == 'fire' for h in hazards], dtype=bool)
+        else:
+            self.centers = np.zeros((0, 2))
+            self.radii = np.zeros(0)
+            self.intensities = np.zeros(0)
+            self.is_fire = np.zeros(0, dtype=bool)
+        self.reach = self.radii * self.RADIUS_SCALE + margin
+
+        self._build_buckets()
+
+    def __len__(self) -> int:
+        return len(self.centers)
+
+    def _build_buckets(self):
+        """Register every hazard in the buckets within its reach."""
+        if len(self.centers) == 0:
+            self.origin = np.zeros(2, dtype=np.int64)
+            self.shape = (0, 0)
+            self.bucket_start = np.zeros(1, dtype=np.int64)
+            self.bucket_hazards = np.zeros(0, dtype=np.int64)
+            return
+
+        cell_low = np.floor((self.centers - self.reach[:, None]) / self.cell_size).astype(np.int64)
+        cell_high = np.floor((self.centers + self.reach[:, None]) / self.cell_size).astype(np.int64)
+
+        self.origin = cell_low.min(axis=0)
+        self.shape = tuple(int(v) for v in cell_high.max(axis=0) - self.origin + 1)
+
+        keys = []
+        hazard_ids = []
+        half_diagonal = self.cell_size * np.sqrt(0.5)
+        for hazard_idx in range(len(self.centers)):
+            xs = np.arange(cell_low[hazard_idx, 0], cell_high[hazard_idx, 0] + 1)
+            ys = np.arange(cell_low[hazard_idx, 1], cell_high[hazard_idx, 1] + 1)
+            cx, cy = np.meshgrid(xs, ys, indexing='ij')
+            centers = (np.column_stack([cx.ravel(), cy.ravel()]) + 0.5) * self.cell_size
+
+            distance = np.linalg.norm(centers - self.centers[hazard_idx], axis=1)
+            near = distance <= self.reach[hazard_idx] + half_diagonal
+            cells = np.column_stack([cx.ravel()[near], cy.ravel()[near]]) - self.origin
+            keys.append(cells[:, 0] * self.shape[1] + cells[:, 1])
+            hazard_ids.append(np.full(len(cells), hazard_idx, dtype=np.int64))
+
+        keys = np.concatenate(keys)
+        hazard_ids = np.concatenate(hazard_ids)
+        order = np.argsort(keys, kind='stable')
+        self.bucket_hazards = hazard_ids[order]
+        counts = np.bincount(keys, minlength=self.shape[0] * self.shape[1])
+        self.bucket_start = np.concatenate([[0], np.cumsum(counts)])
+
+    def candidate_pairs(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All (point, hazard) pairs sharing a bucket, before any distance test.
+
+        Args:
+            points: (N, 2) query positions
+
+        Returns:
+            Tuple of (point_indices, hazard_indices) arrays of equal length
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        if len(points) == 0 or len(self.centers) == 0:
+            return empty
+
+        cells = np.floor(points / self.cell_size).astype(np.int64) - self.origin
+        inside = ((cells[:, 0] >= 0) & (cells[:, 0] < self.shape[0]) &
+                  (cells[:, 1] >= 0) & (cells[:, 1] < self.shape[1]))
+        point_idx = np.nonzero(inside)[0]
+        if len(point_idx) == 0:
+            return empty
+
+        keys = cells[inside, 0] * self.shape[1] + cells[inside, 1]
+        starts = self.bucket_start[keys]
+        counts = self.bucket_start[keys + 1] - starts
+        total = counts.sum()
+        if total == 0:
+            return empty
+
+        run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return (np.repeat(point_idx, counts),
+                self.bucket_hazards[np.repeat(starts, counts) + run_offsets])
+
+    def query_pairs(self, points: np.ndarray, scale: float = 1.0,
+                    margin: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find all (point, hazard) pairs closer than scale * radius + margin.
+
+        scale * radius + margin must not exceed the reach the index was
+        built with (RADIUS_SCALE * radius + self.margin).
+
+        Args:
+            points: (N, 2) query positions
+            scale: Multiple of each hazard's radius
+            margin: Extra distance (m)
+
+        Returns:
+            Tuple of (point_indices, hazard_indices, distances)
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        point_idx, hazard_idx = self.candidate_pairs(points)
+        distance = np.linalg.norm(points[point_idx] - self.centers[hazard_idx], axis=1)
+        within = distance < self.radii[hazard_idx] * scale + margin
+        return point_idx[within], hazard_idx[within], distance[within]
+
+    def panic_levels(self, points: np.ndarray) -> np.ndarray:
+        """
+        Panic caused by the hazards at each point.
+
+        Panic is intensity * (1 - distance / radius) inside a hazard, and
+        the strongest hazard wins where discs overlap.
+
+        Args:
+            points: (N, 2) query positions
+
+        Returns:
+            (N,) panic levels, 0 outside every hazard
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        panic = np.zeros(len(points))
+        point_idx, hazard_idx, distance = self.query_pairs(points)
+        if len(point_idx) > 0:
+            level = self.intensities[hazard_idx] * (1.0 - distance / self.radii[hazard_idx])
+            np.maximum.at(panic, point_idx, level)
+        return panic
+
+    def segments_blocked(self, starts: np.ndarray, ends: np.ndarray,
+                         margin: float = 0.0) -> np.ndarray:
+        """
+        Whether each segment passes closer than radius + margin to a hazard.
+
+        Only hazards whose disc overlaps a segment's bounding box are tested.
+
+        Args:
+            starts: (N, 2) segment start points
+            ends: (N, 2) segment end points
+            margin: Extra distance (m) added to every radius
+
+        Returns:
+            (N,) boolean array
+        """
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+        blocked = np.zeros(len(starts), dtype=bool)
+        if len(starts) == 0 or len(self.centers) == 0:
+            return blocked
+
+        reach = self.radii + margin
+        low = np.minimum(starts, ends)
+        high = np.maximum(starts, ends)
+        overlap = np.all((self.centers[None, :, :] + reach[None, :, None] > low[:, None, :]) &
+                         (self.centers[None, :, :] - reach[None, :, None] < high[:, None, :]),
+                         axis=2)
+        segment_idx, hazard_idx = np.nonzero(overlap)
+        if len(segment_idx) == 0:
+            return blocked
+
+        origin = starts[segment_idx]
+        direction = ends[segment_idx] - origin
+        length_sq = np.einsum('ij,ij->i', direction, direction)
+        # Segments shorter than 1 cm are tested as points
+        degenerate = length_sq < 1e-4
+        t = np.einsum('ij,ij->i', self.centers[hazard_idx] - origin, direction)
+        t = np.where(degenerate, 0.0, np.clip(t / np.where(degenerate, 1.0, length_sq), 0, 1))
+        closest = origin + t[:, None] * direction
+        distance = np.linalg.norm(closest - self.centers[hazard_idx], axis=1)
+        blocked[segment_idx[distance < reach[hazard_idx]]] = True
+        return blocked
@@ -0,0 +1,273 @@
+"""
+Hierarchical pathfinding (HPA*) over the PathFinder grid.
+
+The grid is split into square sectors ("clusters"). Walkable openings on
+the border between two neighboring clusters become transition nodes, and
+the walking distances between transition nodes inside each cluster are
+precomputed. A query searches this small abstract graph first and then
+refines each leg with an A* search confined to one cluster.
+"""
+import heapq
+import numpy as np
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from scipy.sparse.csgraph import dijkstra
+
+from .grid import grid_graph
+
+
+Cell = Tuple[int, int]
+
+
+class HierarchicalPlanner:
+    """Cluster/entrance abstraction of a PathFinder grid for HPA* queries."""
+
+    def __init__(self, pathfinder, cluster_size: int = 16):
+        """
+        Initialize planner. The abstraction is built lazily on first use.
+
+        Args:
+            pathfinder: PathFinder providing the walkable mask and local A*
+            cluster_size: Side length of a cluster in cells
+        """
+        self.pathfinder = pathfinder
+        self.cluster_size = cluster_size
+        self.clusters_x = -(-pathfinder.grid_width // cluster_size)
+        self.clusters_y = -(-pathfinder.grid_height // cluster_size)
+
+        self._mask = None  # Walkable mask the abstraction was built from
+        self.cluster_nodes: Dict[Cell, List[Cell]] = {}
+        self.cluster_edges: Dict[Cell, Dict[Cell, Dict[Cell, float]]] = {}
+        self.cluster_graphs = {}
+        self.border_transitions: Dict[Tuple[Cell, Cell], List[Tuple[Cell, Cell]]] = {}
+        self.cluster_borders: Dict[Cell, set] = {}  # Borders (keys above) touching each cluster
+        self.graph: Dict[Cell, Dict[Cell, float]] = {}
+        self.last_rebuilt_clusters = 0  # Clusters refreshed by the last sync
+
+    def cluster_of(self, cell: Cell) -> Cell:
+        """Cluster coordinates containing a cell."""
+        return cell[0] // self.cluster_size, cell[1] // self.cluster_size
+
+    def cluster_bounds(self, cluster: Cell) -> Tuple[int, int, int, int]:
+        """Cell window (x0, y0, x1, y1), end-exclusive, covered by a cluster."""
+        x0 = cluster[0] * self.cluster_size
+        y0 = cluster[1] * self.cluster_size
+        return (x0, y0,
+                min(x0 + self.cluster_size, self.pathfinder.grid_width),
+                min(y0 + self.cluster_size, self.pathfinder.grid_height))
+
+    def sync(self):
+        """Bring the abstraction up to date, rebuilding only changed clusters."""
+        mask = self.pathfinder.get_walkable_mask()
+        if mask is self._mask:
+            return
+
+        if self._mask is None:
+            dirty = {(cx, cy) for cx in range(self.clusters_x) for cy in range(self.clusters_y)}
+        else:
+            changed = np.argwhere(mask != self._mask)
+            dirty = {(int(x) // self.cluster_size, int(y) // self.cluster_size)
+                     for y, x in changed}
+        self._mask = mask
+
+        if dirty:
+            self._update_clusters(dirty)
+
+    def _update_clusters(self, dirty: set):
+        """Recompute transitions and intra-cluster edges around dirty clusters."""
+        borders = set()
+        for cx, cy in dirty:
+            for nx, ny in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):
+                if 0 <= nx < self.clusters_x and 0 <= ny < self.clusters_y:
+                    borders.add(tuple(sorted(((cx, cy), (nx, ny)))))
+
+        # A cluster's node set only changes if one of its borders changed
+        affected = set(dirty)
+        for border in borders:
+            transitions = self._find_transitions(*border)
+            if self.border_transitions.get(border) != transitions:
+                self.border_transitions[border] = transitions
+                affected.update(border)
+            for cluster in border:
+                self.cluster_borders.setdefault(cluster, set()).add(border)
+
+        for cluster in affected:
+            self._build_cluster(cluster)
+        self.last_rebuilt_clusters = len(affected)
+
+        self._assemble_graph()
+
+    def _find_transitions(self, first: Cell, second: Cell) -> List[Tuple[Cell, Cell]]:
+        """
+        Find transition cell pairs across the border of two adjacent clusters.
+
+        Each maximal run of open border cells yields its middle pair, or both
+        end pairs if the run is wide.
+        """
+        x0, y0, x1, y1 = self.cluster_bounds(first)
+        if second[0] != first[0]:
+            # Vertical border between first (left) and second (right)
+            side_a = np.full(y1 - y0, x1 - 1)
+            side_b = side_a + 1
+            along = np.arange(y0, y1)
+            open_cells = self._mask[along, side_a] & self._mask[along, side_b]
+
+            def pair(i):
+                return (x1 - 1, int(along[i])), (x1, int(along[i]))
+        else:
+            # Horizontal border between first (below) and second (above)
+            along = np.arange(x0, x1)
+            open_cells = self._mask[y1 - 1, along] & self._mask[y1, along]
+
+            def pair(i):
+                return (int(along[i]), y1 - 1), (int(along[i]), y1)
+
+        transitions = []
+        run_start = None
+        for i in range(len(open_cells) + 1):
+            is_open = i < len(open_cells) and open_cells[i]
+            if is_open and run_start is None:
+                run_start = i
+            elif not is_open and run_start is not None:
+                run_end = i - 1
+                if run_end - run_start + 1 >= 6:
+                    transitions.append(pair(run_start))
+                    transitions.append(pair(run_end))
+                else:
+                    transitions.append(pair((run_start + run_end) // 2))
+                run_start = None
+        return transitions
+
+    def _build_cluster(self, cluster: Cell):
+        """Collect a cluster's transition nodes and their walking distances."""
+        nodes = set()
+        for border in self.cluster_borders.get(cluster, ()):
+            for a, b in self.border_transitions[border]:
+                nodes.add(a if self.cluster_of(a) == cluster else b)
+        nodes = sorted(nodes)
+
+        x0, y0, x1, y1 = self.cluster_bounds(cluster)
+        graph = grid_graph(np.ascontiguousarray(self._mask[y0:y1, x0:x1]))
+        self.cluster_graphs[cluster] = graph
+        self.cluster_nodes[cluster] = nodes
+
+        edges = defaultdict(dict)
+        if len(nodes) > 1:
+            width = x1 - x0
+            local_ids = [(y - y0) * width + (x - x0) for x, y in nodes]
+            distances = dijkstra(graph, directed=True, indices=local_ids)
+            for i, a in enumerate(nodes):
+                for j in range(i + 1, len(nodes)):
+                    cost = distances[i, local_ids[j]]
+                    if np.isfinite(cost):
+                        edges[a][nodes[j]] = float(cost)
+                        edges[nodes[j]][a] = float(cost)
+        self.cluster_edges[cluster] = edges
+
+    def _assemble_graph(self):
+        """Merge intra-cluster edges and border transitions into one graph."""
+        graph = defaultdict(dict)
+        for edges in self.cluster_edges.values():
+            for a, neighbors in edges.items():
+                graph[a].update(neighbors)
+        for transitions in self.border_transitions.values():
+            for a, b in transitions:
+                graph[a][b] = 1.0
+                graph[b][a] = 1.0
+        self.graph = dict(graph)
+
+    def _connect(self, cell: Cell) -> Dict[Cell, float]:
+        """Walking distances from a cell to the transition nodes of its cluster."""
+        cluster = self.cluster_of(cell)
+        nodes = self.cluster_nodes.get(cluster, [])
+        if not nodes:
+            return {}
+
+        x0, y0, x1, y1 = self.cluster_bounds(cluster)
+        width = x1 - x0
+        distances = dijkstra(self.cluster_graphs[cluster], directed=True,
+                             indices=(cell[1] - y0) * width + (cell[0] - x0))
+        connections = {}
+        for node in nodes:
+            cost = distances[(node[1] - y0) * width + (node[0] - x0)]
+            if np.isfinite(cost):
+                connections[node] = float(cost)
+        return connections
+
+    def find_cell_path(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """
+        Find a near-optimal cell path between two walkable cells.
+
+        Args:
+            start: Start cell (x, y)
+            goal: Goal cell (x, y)
+
+        Returns:
+            List of cells from start to goal, or None if the abstract graph
+            has no route (callers should fall back to a full search)
+        """
+        self.sync()
+
+        start_cluster = self.cluster_of(start)
+        if start_cluster == self.cluster_of(goal):
+            local = self.pathfinder._astar(start, goal, self.cluster_bounds(start_cluster))
+            if local is not None:
+                return local
+
+        start_edges = self._connect(start)
+        goal_edges = self._connect(goal)
+        abstract = self._abstract_search(start, goal, start_edges, goal_edges)
+        if abstract is None:
+            return None
+
+        # Refine each abstract leg into grid cells
+        path = [abstract[0]]
+        for a, b in zip(abstract, abstract[1:]):
+            cluster = self.cluster_of(a)
+            if cluster == self.cluster_of(b):
+                leg = self.pathfinder._astar(a, b, self.cluster_bounds(cluster))
+                if leg is None:
+                    return None
+                path.extend(leg[1:])
+            else:
+                path.append(b)
+        return path
+
+    def _abstract_search(self, start: Cell, goal: Cell,
+                         start_edges: Dict[Cell, float],
+                         goal_edges: Dict[Cell, float]) -> Optional[List[Cell]]:
+        """A* over the abstract graph with start and goal temporarily inserted."""
+        def heuristic(cell):
+            return np.hypot(cell[0] - goal[0], cell[1] - goal[1])
+
+        open_set = [(heuristic(start), start)]
+        came_from = {}
+        g_score = {start: 0.0}
+        closed = set()
+
+        while open_set:
+            current = heapq.heappop(open_set)[1]
+            if current == goal:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                return path[::-1]
+            if current in closed:
+                continue
+            closed.add(current)
+
+            neighbors = dict(self.graph.get(current, {}))
+            if current == start:
+                neighbors.update(start_edges)
+            if current in goal_edges:
+                neighbors[goal] = min(neighbors.get(goal, np.inf), goal_edges[current])
+
+            for neighbor, cost in neighbors.items():
+                tentative_g = g_score[current] + cost
+                if tentative_g < g_score.get(neighbor, np.inf):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    heapq.heappush(open_set, (tentative_g + heuristic(neighbor), neighbor))
+
+        return None
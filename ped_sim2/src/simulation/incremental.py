@@ -0,0 +1,218 @@
+"""
+Incremental replanning (LPA* / D* Lite style) over the PathFinder grid.
+
+One backward search tree is kept per goal cell. When hazards appear or
+disappear, only the cells whose walkability changed (and their neighbors)
+are made inconsistent again, and the next query repairs the tree from
+there instead of searching from scratch. Queries from different start
+cells towards the same goal share the tree as well.
+"""
+import heapq
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from .grid import NEIGHBOR_STEPS
+
+
+Cell = Tuple[int, int]
+INF = float('inf')
+
+
+class _SearchTree:
+    """Backward LPA* tree holding distances to one goal cell."""
+
+    def __init__(self, goal: Cell, walkable: np.ndarray):
+        self.goal = goal
+        self.walkable = walkable
+        self.height, self.width = walkable.shape
+        self.g: Dict[Cell, float] = {}
+        self.rhs: Dict[Cell, float] = {goal: 0.0}
+        self.start: Optional[Cell] = None
+        self.open: list = []
+        self.open_keys: Dict[Cell, Tuple[float, float]] = {}
+        self._push(goal)
+
+    def _heuristic(self, cell: Cell) -> float:
+        """Octile distance from the current query start (consistent on this grid)."""
+        dx = abs(cell[0] - self.start[0])
+        dy = abs(cell[1] - self.start[1])
+        return max(dx, dy) + (np.sqrt(2) - 1) * min(dx, dy)
+
+    def _key(self, cell: Cell) -> Tuple[float, float]:
+        best = min(self.g.get(cell, INF), self.rhs.get(cell, INF))
+        if self.start is None:
+            return best, best
+        return best + self._heuristic(cell), best
+
+    def _push(self, cell: Cell):
+        key = self._key(cell)
+        self.open_keys[cell] = key
+        heapq.heappush(self.open, (key, cell))
+
+    def _successors(self, cell: Cell):
+        """Walkable neighbors of a cell with their step costs (same moves as _astar)."""
+        x, y = cell
+        for dx, dy, cost in NEIGHBOR_STEPS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height and self.walkable[ny, nx]:
+                yield (nx, ny), cost
+
+    def _neighbors(self, cell: Cell):
+        """All in-bounds neighbors (cells whose rhs may depend on this cell)."""
+        x, y = cell
+        for dx, dy, _ in NEIGHBOR_STEPS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.width and 0 <= ny < self.height:
+                yield nx, ny
+
+    def _update_vertex(self, cell: Cell):
+        if cell != self.goal:
+            best = INF
+            for neighbor, cost in self._successors(cell):
+                candidate = cost + self.g.get(neighbor, INF)
+                if candidate < best:
+                    best = candidate
+            self.rhs[cell] = best
+
+        if self.g.get(cell, INF) != self.rhs.get(cell, INF):
+            self._push(cell)
+        else:
+            self.open_keys.pop(cell, None)
+
+    def update_cells(self, cells: List[Cell], walkable: np.ndarray):
+        """Invalidate the tree around cells whose walkability changed."""
+        self.walkable = walkable
+        for cell in cells:
+            for neighbor in self._neighbors(cell):
+                self._update_vertex(neighbor)
+
+    def _set_start(self, start: Cell):
+        """Re-key the open list for a new query start."""
+        if start == self.start:
+            return
+        self.start = start
+        self.open_keys = {cell: self._key(cell) for cell in self.open_keys}
+        self.open = [(key, cell) for cell, key in self.open_keys.items()]
+        heapq.heapify(self.open)
+
+    @staticmethod
+    def _key_reached(key: Tuple[float, float], start_key: Tuple[float, float]) -> bool:
+        """key >= start_key, treating first components within rounding as ties."""
+        if abs(key[0] - start_key[0]) > 1e-9:
+            return key[0] > start_key[0]
+        return key[1] >= start_key[1]
+
+    def compute(self, start: Cell) -> int:
+        """Repair the tree until start's distance is final; returns expansions."""
+        self._set_start(start)
+        expanded = 0
+
+        while self.open:
+            key, cell = self.open[0]
+            if self.open_keys.get(cell) != key:
+                heapq.heappop(self.open)
+                continue
+            if (self._key_reached(key, self._key(start)) and
+                    self.rhs.get(start, INF) == self.g.get(start, INF)):
+                break
+
+            heapq.heappop(self.open)
+            del self.open_keys[cell]
+            expanded += 1
+
+            g_value = self.g.get(cell, INF)
+            rhs_value = self.rhs.get(cell, INF)
+            if g_value > rhs_value:
+                self.g[cell] = rhs_value
+            else:
+                self.g[cell] = INF
+                self._update_vertex(cell)
+            for neighbor in self._neighbors(cell):
+                self._update_vertex(neighbor)
+
+        return expanded
+
+    def extract_path(self, start: Cell) -> Optional[List[Cell]]:
+        """Follow the cheapest successors from start down to the goal."""
+        if self.g.get(start, INF) == INF:
+            return None
+
+        path = [start]
+        current = start
+        for _ in range(self.width * self.height):
+            if current == self.goal:
+                return path
+            best, best_cost = None, INF
+            for neighbor, cost in self._successors(current):
+                candidate = cost + self.g.get(neighbor, INF)
+                if candidate < best_cost:
+                    best, best_cost = neighbor, candidate
+            if best is None:
+                return None
+            path.append(best)
+            current = best
+        return None
+
+
+class IncrementalPlanner:
+    """Per-goal LPA* trees over a PathFinder grid, repaired as walkability changes."""
+
+    def __init__(self, pathfinder, max_trees: int = 32):
+        """
+        Initialize planner.
+
+        Args:
+            pathfinder: PathFinder providing the walkable mask
+            max_trees: Maximum number of goal trees kept (oldest dropped first)
+        """
+        self.pathfinder = pathfinder
+        self.max_trees = max_trees
+        self.trees: Dict[Cell, _SearchTree] = {}
+        self._mask = None  # Walkable mask the trees are consistent with
+        self.last_changed_cells = 0  # Cells repaired by the last sync
+
+    def sync(self):
+        """Push walkability changes since the last query into every tree."""
+        mask = self.pathfinder.get_walkable_mask()
+        if mask is self._mask:
+            return
+        if self._mask is None or self._mask.shape != mask.shape:
+            self.trees = {}
+            self._mask = mask
+            return
+
+        changed = [(int(x), int(y)) for y, x in np.argwhere(mask != self._mask)]
+        self._mask = mask
+        self.last_changed_cells = len(changed)
+        if not changed:
+            return
+
+        for goal in list(self.trees):
+            if not mask[goal[1], goal[0]]:
+                # Goal itself is blocked now; callers snap to a new goal cell
+                del self.trees[goal]
+            else:
+                self.trees[goal].update_cells(changed, mask)
+
+    def find_cell_path(self, start: Cell, goal: Cell) -> Optional[List[Cell]]:
+        """
+        Find an optimal cell path, reusing and repairing the goal's tree.
+
+        Args:
+            start: Start cell (x, y)
+            goal: Goal cell (x, y)
+
+        Returns:
+            List of cells from start to goal, or None if unreachable
+        """
+        self.sync()
+
+        tree = self.trees.pop(goal, None)
+        if tree is None:
+            tree = _SearchTree(goal, self._mask)
+        self.trees[goal] = tree  # Most recently used goals live at the end
+        while len(self.trees) > self.max_trees:
+            del self.trees[next(iter(self.trees))]
+
+        self.pathfinder.last_expanded = tree.compute(start)
+        return tree.extract_path(start)
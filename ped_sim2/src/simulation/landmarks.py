@@ -0,0 +1,178 @@
+"""
+ALT (A*, landmarks, triangle inequality) heuristic for the PathFinder grid.
+
+Exact walking distances from a handful of landmark cells are computed once
+per scenario. For any cell n and goal g, |d(L, g) - d(L, n)| is a lower
+bound on the walking distance between them, which is much tighter than the
+straight-line distance when long walls force detours.
+
+Distances are taken on the static grid (walls and roads, no hazards).
+Hazards only remove cells, so the bounds stay admissible while they are
+active.
+"""
+import hashlib
+import os
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from scipy import ndimage
+from scipy.sparse.csgraph import dijkstra
+
+from .grid import grid_graph
+
+
+class LandmarkHeuristic:
+    """Landmark distance tables and per-goal heuristic lookups."""
+
+    # Slack (cells) absorbing float32 rounding of the stored distances
+    TOLERANCE = 1e-3
+
+    def __init__(self, landmarks: List[Tuple[int, int]], distances: np.ndarray,
+                 signature: str, table_cache_size: int = 16):
+        """
+        Initialize from precomputed tables.
+
+        Args:
+            landmarks: Landmark cells (x, y)
+            distances: (K, grid_height, grid_width) walking distances in
+                cells from each landmark, inf where unreachable
+            signature: PathFinder.grid_signature() of the grid they belong to
+            table_cache_size: Number of per-goal heuristic tables kept
+        """
+        self.landmarks = [tuple(int(v) for v in cell) for cell in landmarks]
+        self.distances = distances
+        self.signature = signature
+        self.table_cache_size = table_cache_size
+        self._tables = OrderedDict()
+
+    @classmethod
+    def build(cls, pathfinder, count: int = 8) -> 'LandmarkHeuristic':
+        """
+        Pick landmarks by farthest-point sampling and compute their tables.
+
+        Landmarks are placed in the largest connected walkable region. The
+        first is the cell farthest from an arbitrary cell of that region,
+        and each later one the cell farthest (in walking distance) from all
+        landmarks chosen so far.
+
+        Args:
+            pathfinder: PathFinder whose static grid is used
+            count: Number of landmarks K
+
+        Returns:
+            LandmarkHeuristic for the pathfinder's current static grid
+        """
+        walkable = pathfinder.get_static_walkable_mask()
+        height, width = walkable.shape
+        labels, region_count = ndimage.label(walkable, structure=np.ones((3, 3), dtype=int))
+        if region_count == 0 or count <= 0:
+            return cls([], np.zeros((0, height, width), dtype=np.float32),
+                       pathfinder.grid_signature())
+
+        # Spread the landmarks over the largest connected region
+        sizes = np.bincount(labels.ravel())[1:]
+        region = np.flatnonzero(labels.ravel() == np.argmax(sizes) + 1)
+        graph = grid_graph(walkable)
+        nearest = dijkstra(graph, directed=True, indices=int(region[0]))
+
+        landmarks = []
+        tables = []
+        for _ in range(min(count, len(region))):
+            candidate = int(region[np.argmax(nearest[region])])
+            distances = dijkstra(graph, directed=True, indices=candidate)
+            landmarks.append((candidate % width, candidate // width))
+            tables.append(distances.reshape(height, width).astype(np.float32))
+            nearest = distances if len(landmarks) == 1 else np.minimum(nearest, distances)
+
+        return cls(landmarks, np.stack(tables), pathfinder.grid_signature())
+
+    def table(self, goal: Tuple[int, int]) -> np.ndarray:
+        """
+        Heuristic value of every cell towards a goal cell.
+
+        Combines the landmark bounds with the straight-line distance, so it
+        is never weaker than PathFinder._heuristic.
+
+        Args:
+            goal: Goal cell (x, y)
+
+        Returns:
+            Read-only (grid_height, grid_width) array of lower bounds (cells)
+        """
+        table = self._tables.get(goal)
+        if table is not None:
+            self._tables.move_to_end(goal)
+            return table
+
+        height, width = self.distances.shape[1:]
+        ys, xs = np.mgrid[0:height, 0:width]
+        table = np.hypot(xs - goal[0], ys - goal[1])
+
+        if len(self.landmarks) > 0:
+            to_goal = self.distances[:, goal[1], goal[0]]
+            usable = np.isfinite(to_goal)
+            if usable.any():
+                with np.errstate(invalid='ignore'):
+                    bounds = np.abs(self.distances[usable] - to_goal[usable, None, None])
+                bounds[~np.isfinite(bounds)] = 0.0
+                table = np.maximum(table, bounds.max(axis=0) - self.TOLERANCE)
+
+        table.flags.writeable = False
+        self._tables[goal] = table
+        while len(self._tables) > self.table_cache_size:
+            self._tables.popitem(last=False)
+        return table
+
+    def save(self, path: str):
+        """Write the landmark tables to a compressed .npz file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(path, landmarks=np.array(self.landmarks, dtype=np.int64).reshape(-1, 2),
+                            distances=self.distances, signature=np.array(self.signature))
+
+    @classmethod
+    def load(cls, path: str) -> 'LandmarkHeuristic':
+        """Read landmark tables written by save()."""
+        with np.load(path) as data:
+            return cls([tuple(cell) for cell in data['landmarks']], data['distances'],
+                       str(data['signature']))
+
+
+def grid_signature(*arrays: np.ndarray, extra: str = '') -> str:
+    """Stable hash of grid arrays, used to match persisted tables to a grid."""
+    digest = hashlib.sha1(extra.encode('utf-8'))
+    for array in arrays:
+        digest.update(str(array.shape).encode('utf-8'))
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def load_or_build_landmarks(pathfinder, path: Optional[str], count: int = 8) -> LandmarkHeuristic:
+    """
+    Attach landmark tables to a PathFinder, reusing a persisted copy if it matches.
+
+    Args:
+        pathfinder: PathFinder to attach the heuristic to
+        path: .npz file the tables are persisted in (None to skip persistence)
+        count: Number of landmarks if the tables have to be built
+
+    Returns:
+        The attached LandmarkHeuristic
+    """
+    landmarks = None
+    if path is not None and os.path.exists(path):
+        try:
+            landmarks = LandmarkHeuristic.load(path)
+        except (OSError, KeyError, ValueError):
+            landmarks = None
+        if landmarks is not None and landmarks.signature != pathfinder.grid_signature():
+            landmarks = None
+
+    if landmarks is None:
+        landmarks = LandmarkHeuristic.build(pathfinder, count)
+        if path is not None:
+            landmarks.save(path)
+
+    pathfinder.set_landmarks(landmarks)
+    return landmarks
@@ -0,0 +1,329 @@
+"""
+Navigation mesh backend for PathFinder.
+
+The free space of the static grid (walls and roads, as rasterized by
+PathFinder) is triangulated once: vertices are placed at obstacle corners,
+every few cells along obstacle boundaries and on a coarse interior lattice,
+and a Delaunay triangulation of those points is kept wherever a triangle
+does not touch a blocked cell. Queries run A* over the triangles and pull a
+taut path through the shared edges with the funnel algorithm, so a large
+open floor costs a handful of triangles instead of thousands of cells.
+"""
+import heapq
+import numpy as np
+from typing import List, Optional, Tuple
+from scipy.spatial import Delaunay, cKDTree
+
+
+Point = Tuple[float, float]
+
+
+def _cross(o: Point, a: Point, b: Point) -> float:
+    """z of (a - o) x (b - o); positive when b is counter-clockwise of a."""
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+
+class NavMesh:
+    """Triangulated free space of a PathFinder grid."""
+
+    def __init__(self, pathfinder, boundary_spacing: int = 5, interior_spacing: int = 8):
+        """
+        Triangulate the pathfinder's static walkable mask.
+
+        Args:
+            pathfinder: PathFinder providing the grid, roads and hazards
+            boundary_spacing: Cells between vertices along obstacle boundaries
+            interior_spacing: Cells between vertices of the interior lattice
+        """
+        self.pathfinder = pathfinder
+        self.cell_size = pathfinder.cell_size
+        self.static_version = pathfinder.static_version
+        self.last_expanded = 0
+
+        walkable = pathfinder.get_static_walkable_mask()
+        self.vertices = self._place_vertices(walkable, boundary_spacing, interior_spacing)
+        if len(self.vertices) < 3:
+            self._set_empty()
+            return
+        try:
+            triangulation = Delaunay(self.vertices)
+        except Exception:  # Degenerate point sets (e.g. all collinear)
+            self._set_empty()
+            return
+
+        self.triangles = triangulation.simplices
+        self.valid = self._free_triangles(triangulation, walkable)
+        self.neighbors = triangulation.neighbors
+        self.centroids = self.vertices[self.triangles].mean(axis=1)
+        self._triangulation = triangulation
+
+        valid_ids = np.flatnonzero(self.valid)
+        self._valid_ids = valid_ids
+        self._centroid_tree = cKDTree(self.centroids[valid_ids]) if len(valid_ids) > 0 else None
+
+        self._blocked = np.zeros(len(self.triangles), dtype=bool)
+        self._hazard_version = None
+
+    def _set_empty(self):
+        self.triangles = np.zeros((0, 3), dtype=np.int64)
+        self.valid = np.zeros(0, dtype=bool)
+        self.neighbors = np.zeros((0, 3), dtype=np.int64)
+        self.centroids = np.zeros((0, 2))
+        self._triangulation = None
+        self._valid_ids = np.zeros(0, dtype=np.int64)
+        self._centroid_tree = None
+        self._blocked = np.zeros(0, dtype=bool)
+        self._hazard_version = None
+
+    def __len__(self) -> int:
+        """Number of walkable triangles."""
+        return int(self.valid.sum())
+
+    def _place_vertices(self, walkable: np.ndarray, boundary_spacing: int,
+                        interior_spacing: int) -> np.ndarray:
+        """Mesh vertices (world coordinates of free cell centers)."""
+        height, width = walkable.shape
+        blocked = np.pad(~walkable, 1, constant_values=True)
+
+        def shifted(dx, dy):
+            return blocked[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+
+        near_blocked = np.zeros_like(walkable)
+        corner = np.zeros_like(walkable)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                if dx == 0 and dy == 0:
+                    continue
+                near_blocked |= shifted(dx, dy)
+                if dx != 0 and dy != 0:
+                    # Convex obstacle corner: blocked diagonally, open on both sides
+                    corner |= shifted(dx, dy) & ~shifted(dx, 0) & ~shifted(0, dy)
+                    # Concave corner: blocked on both sides
+                    corner |= shifted(dx, 0) & shifted(0, dy)
+
+        ys, xs = np.mgrid[0:height, 0:width]
+        # (x + 2y) mod k spaces samples k cells apart along rows, columns and diagonals
+        spaced = (xs + 2 * ys) % boundary_spacing == 0
+        lattice = (xs % interior_spacing == 0) & (ys % interior_spacing == 0)
+
+        chosen = walkable & ((near_blocked & (corner | spaced)) | lattice)
+        cell_y, cell_x = np.nonzero(chosen)
+        return (np.column_stack([cell_x, cell_y]) + 0.5) * self.cell_size
+
+    def _free_triangles(self, triangulation: Delaunay, walkable: np.ndarray) -> np.ndarray:
+        """Triangles that neither contain nor cross a blocked cell."""
+        cs = self.cell_size
+        valid = np.ones(len(triangulation.simplices), dtype=bool)
+
+        # Any blocked cell center inside a triangle rules it out
+        blocked_y, blocked_x = np.nonzero(~walkable)
+        if len(blocked_x) > 0:
+            centers = (np.column_stack([blocked_x, blocked_y]) + 0.5) * cs
+            inside = triangulation.find_simplex(centers)
+            valid[inside[inside >= 0]] = False
+
+        # Edges are sampled every quarter cell against the mask
+        corners = self.vertices[triangulation.simplices]
+        starts = corners.reshape(-1, 2)
+        ends = np.roll(corners, -1, axis=1).reshape(-1, 2)
+        lengths = np.linalg.norm(ends - starts, axis=1)
+        counts = np.ceil(lengths / (cs / 4)).astype(np.int64) + 1
+        edge = np.repeat(np.arange(len(starts)), counts)
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = step / np.maximum(counts[edge] - 1, 1)
+        samples = starts[edge] + t[:, None] * (ends - starts)[edge]
+
+        height, width = walkable.shape
+        gx = np.clip((samples[:, 0] / cs).astype(np.int64), 0, width - 1)
+        gy = np.clip((samples[:, 1] / cs).astype(np.int64), 0, height - 1)
+        crossing = np.zeros(len(starts), dtype=bool)
+        crossing[edge[~walkable[gy, gx]]] = True
+        valid &= ~crossing.reshape(-1, 3).any(axis=1)
+        return valid
+
+    def _sync_hazards(self):
+        """Block triangles overlapping hazard discs (with the pathfinder's buffer)."""
+        version = self.pathfinder.version
+        if self._hazard_version == version:
+            return
+        self._hazard_version = version
+
+        self._blocked = np.zeros(len(self.triangles), dtype=bool)
+        if len(self.triangles) == 0:
+            return
+        corners = self.vertices[self.triangles]
+        edge_starts = corners
+        edge_vectors = np.roll(corners, -1, axis=1) - corners
+        length_sq = np.maximum(np.einsum('tij,tij->ti', edge_vectors, edge_vectors), 1e-12)
+
+        for hazard in self.pathfinder.hazard_zones:
+            center = np.asarray(hazard['position'], dtype=float)
+            radius = hazard['radius'] + self.pathfinder.hazard_buffer
+
+            # Distance from the center to each triangle edge
+            t = np.clip(np.einsum('tij,tij->ti', center - edge_starts, edge_vectors) / length_sq, 0, 1)
+            closest = edge_starts + t[..., None] * edge_vectors
+            near_edge = (np.linalg.norm(closest - center, axis=2) < radius).any(axis=1)
+
+            # Or the center lies inside the triangle
+            a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+            d1 = self._side(center, a, b)
+            d2 = self._side(center, b, c)
+            d3 = self._side(center, c, a)
+            contains = ~(((d1 < 0) | (d2 < 0) | (d3 < 0)) & ((d1 > 0) | (d2 > 0) | (d3 > 0)))
+            self._blocked |= near_edge | contains
+
+    @staticmethod
+    def _side(p: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return (b[:, 0] - a[:, 0]) * (p[1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (p[0] - a[:, 0])
+
+    def locate(self, point: np.ndarray) -> int:
+        """
+        Walkable triangle containing a point, or the one with the nearest centroid.
+
+        Returns:
+            Triangle index, or -1 if the mesh is empty
+        """
+        if self._centroid_tree is None:
+            return -1
+        triangle = int(self._triangulation.find_simplex(np.asarray(point, dtype=float)))
+        if triangle >= 0 and self.valid[triangle]:
+            return triangle
+        _, nearest = self._centroid_tree.query(point)
+        return int(self._valid_ids[nearest])
+
+    def find_path(self, start: np.ndarray, goal: np.ndarray) -> Optional[List[np.ndarray]]:
+        """
+        Plan an any-angle path between two world points.
+
+        Args:
+            start: Start position [x, y]
+            goal: Goal position [x, y]
+
+        Returns:
+            World waypoints from start to goal, or None if no route exists
+        """
+        self._sync_hazards()
+        start = np.asarray(start, dtype=float)
+        goal = np.asarray(goal, dtype=float)
+        start_triangle = self.locate(start)
+        goal_triangle = self.locate(goal)
+        if start_triangle < 0 or goal_triangle < 0:
+            return None
+
+        corridor = self._search(start_triangle, goal_triangle)
+        if corridor is None:
+            return None
+
+        # Points outside the mesh first walk to the centroid of their triangle
+        path_start = start
+        prefix = []
+        if self._triangulation.find_simplex(start) != start_triangle:
+            path_start = self.centroids[start_triangle]
+            prefix = [start]
+        path_goal = goal
+        suffix = []
+        if self._triangulation.find_simplex(goal) != goal_triangle:
+            path_goal = self.centroids[goal_triangle]
+            suffix = [goal]
+
+        corners = self._funnel(corridor, path_start, path_goal)
+        return prefix + [np.array(p) for p in corners] + suffix
+
+    def _search(self, start: int, goal: int) -> Optional[List[int]]:
+        """A* over triangle adjacency, using centroid distances."""
+        goal_centroid = self.centroids[goal]
+        open_set = [(0.0, start)]
+        came_from = {}
+        g_score = {start: 0.0}
+        closed = set()
+        self.last_expanded = 0
+
+        while open_set:
+            current = heapq.heappop(open_set)[1]
+            if current in closed:
+                continue
+            closed.add(current)
+            self.last_expanded += 1
+
+            if current == goal:
+                corridor = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    corridor.append(current)
+                return corridor[::-1]
+
+            for neighbor in self.neighbors[current]:
+                neighbor = int(neighbor)
+                if neighbor < 0 or not self.valid[neighbor] or neighbor in closed:
+                    continue
+                if self._blocked[neighbor] and neighbor != goal:
+                    continue
+                step = float(np.hypot(*(self.centroids[neighbor] - self.centroids[current])))
+                tentative_g = g_score[current] + step
+                if tentative_g < g_score.get(neighbor, np.inf):
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    h = float(np.hypot(*(self.centroids[neighbor] - goal_centroid)))
+                    heapq.heappush(open_set, (tentative_g + h, neighbor))
+
+        return None
+
+    def _portals(self, corridor: List[int]) -> List[Tuple[Point, Point]]:
+        """(left, right) shared edges along a triangle corridor."""
+        portals = []
+        for current, following in zip(corridor, corridor[1:]):
+            shared = [v for v in self.triangles[current] if v in self.triangles[following]]
+            a = tuple(self.vertices[shared[0]])
+            b = tuple(self.vertices[shared[1]])
+            origin = tuple(self.centroids[current])
+            # Seen from inside the current triangle, the CCW endpoint is on the left
+            if _cross(origin, a, b) > 0:
+                portals.append((b, a))
+            else:
+                portals.append((a, b))
+        return portals
+
+    def _funnel(self, corridor: List[int], start: np.ndarray, goal: np.ndarray) -> List[Point]:
+        """Simple stupid funnel algorithm: taut path through the corridor portals."""
+        start = (float(start[0]), float(start[1]))
+        goal = (float(goal[0]), float(goal[1]))
+        portals = [(start, start)] + self._portals(corridor) + [(goal, goal)]
+
+        path = [start]
+        apex, left, right = start, start, start
+        apex_index = left_index = right_index = 0
+        i = 1
+        while i < len(portals):
+            portal_left, portal_right = portals[i]
+
+            # Tighten the right side if the new right point moves inwards
+            if _cross(apex, right, portal_right) >= 0:
+                if apex == right or _cross(apex, left, portal_right) < 0:
+                    right, right_index = portal_right, i
+                else:
+                    # Right crossed over left: left becomes a corner
+                    path.append(left)
+                    apex, apex_index = left, left_index
+                    left, right = apex, apex
+                    left_index = right_index = apex_index
+                    i = apex_index + 1
+                    continue
+
+            # Tighten the left side if the new left point moves inwards
+            if _cross(apex, left, portal_left) <= 0:
+                if apex == left or _cross(apex, right, portal_left) > 0:
+                    left, left_index = portal_left, i
+                else:
+                    path.append(right)
+                    apex, apex_index = right, right_index
+                    left, right = apex, apex
+                    left_index = right_index = apex_index
+                    i = apex_index + 1
+                    continue
+
+            i += 1
+
+        if path[-1] != goal:
+            path.append(goal)
+        return path
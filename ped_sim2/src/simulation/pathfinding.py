@@ -2,20 +2,33 @@
 A* pathfinding algorithm for pedestrian navigation.
 """
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Sequence
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from scipy import ndimage
 import heapq
 
+from .hierarchical import HierarchicalPlanner
+from .incremental import IncrementalPlanner
+from .landmarks import LandmarkHeuristic, grid_signature
+from .navmesh import NavMesh
+from .hazard_index import HazardIndex
+
 
 class PathFinder:
     """A* pathfinding for pedestrian navigation around obstacles."""
     
-    def __init__(self, grid_size: Tuple[int, int], cell_size: float = 0.5):
+    NEAREST_FREE_RADIUS = 20  # Search reach (cells) when snapping to a free cell
+    
+    def __init__(self, grid_size: Tuple[int, int], cell_size: float = 0.5,
+                 path_cache_size: int = 1024):
         """
         Initialize pathfinding grid.
         
         Args:
             grid_size: Size of environment (width, height) in meters
             cell_size: Size of each grid cell in meters
+            path_cache_size: Maximum number of cached paths (0 disables caching)
         """
         self.grid_width = int(grid_size[0] / cell_size)
         self.grid_height = int(grid_size[1] / cell_size)
@@ -24,8 +37,65 @@ class PathFinder:
         self.walkable_grid = None  # Grid marking walkable areas (roads)
         self.roads_only_mode = False  # Whether to restrict movement to roads only
         self.hazard_zones = []  # Dynamic hazard zones to avoid
-        self.hazard_buffer = 1.5  # Extra buffer around hazards (in meters)
+        self._hazard_buffer = 1.5  # Extra buffer around hazards (in meters), see hazard_buffer
+        self.version = 0  # Incremented whenever walkability may have changed
+        self.static_version = 0  # Incremented when obstacles or roads change
+        self._hazard_signature = ()
+        self._hazard_index = None  # HazardIndex over hazard_zones (with buffer)
+        self._hazard_index_key = None
+        self._walkable = None  # Cached combined walkability mask
+        self._walkable_version = -1
+        self._components = None  # Connected-component labels of the mask
+        self._components_version = -1
+        self._nearest_free = None  # (2, H, W) nearest walkable (y, x) of every cell
+        self._nearest_free_version = -1
+        
+        # Search algorithm: 'astar', 'jps' (Jump Point Search), 'hierarchical'
+        # (HPA*), 'incremental' (LPA* trees repaired as hazards change) or
+        # 'navmesh' (A* over a triangulation of the free space)
+        self.search_mode = 'astar'
+        self.last_expanded = 0  # Nodes expanded by the most recent search
+        self.cluster_size = 16  # Cluster side (cells) for hierarchical mode
+        self._hierarchy = None
+        self._incremental = None
+        self._navmesh = None
+        self.smooth_paths = True  # Line-of-sight string pulling of planned paths
+        self._landmarks = None  # Optional ALT heuristic tables
+        self._landmarks_static_version = -1
+        
+        # LRU cache of planned paths for the current grid version
+        self.path_cache_size = path_cache_size
+        self._path_cache = OrderedDict()
+        self._cache_version = self.version
+        self.cache_hits = 0
+        self.cache_misses = 0
         
+        # find_paths worker pool, kept until the static grid or pool size changes
+        self._executor = None
+        self._executor_key = None
+        
+    def __getstate__(self) -> dict:
+        """Pickle without caches, search structures or worker pool (used to ship the grid to workers)."""
+        state = self.__dict__.copy()
+        state['_path_cache'] = OrderedDict()
+        state['_hierarchy'] = None
+        state['_incremental'] = None
+        state['_navmesh'] = None
+        state['_executor'] = None
+        state['_executor_key'] = None
+        return state
+    
+    @property
+    def hazard_buffer(self) -> float:
+        """Extra buffer around hazards (m); changing it invalidates the walkable mask."""
+        return self._hazard_buffer
+    
+    @hazard_buffer.setter
+    def hazard_buffer(self, value: float):
+        if value != self._hazard_buffer:
+            self._hazard_buffer = value
+            self.version += 1
+    
     def set_obstacle(self, x: float, y: float, width: float = None, height: float = None):
         """
         Mark a region as obstacle.
@@ -52,6 +122,8 @@ class PathFinder:
                 gy = grid_y + dy
                 if 0 <= gx < self.grid_width and 0 <= gy < self.grid_height:
                     self.grid[gy, gx] = True
+        self.version += 1
+        self.static_version += 1
     
     def set_roads_only_mode(self, enabled: bool = True):
         """
@@ -64,6 +136,8 @@ class PathFinder:
         if enabled and self.walkable_grid is None:
             # Initialize walkable grid as all unwalkable
             self.walkable_grid = np.zeros((self.grid_height, self.grid_width), dtype=bool)
+        self.version += 1
+        self.static_version += 1
     
     def update_hazard_zones(self, hazards: List[dict]):
         """
@@ -73,26 +147,121 @@ class PathFinder:
             hazards: List of hazard dictionaries with 'position' and 'radius'
         """
         self.hazard_zones = hazards
+        signature = tuple((float(h['position'][0]), float(h['position'][1]), float(h['radius']))
+                          for h in hazards)
+        if signature != self._hazard_signature:
+            self._hazard_signature = signature
+            self.version += 1
     
-    def _is_in_hazard_zone(self, world_x: float, world_y: float) -> bool:
+    def get_walkable_mask(self) -> np.ndarray:
         """
-        Check if a world coordinate is within any hazard zone (with buffer).
+        Get the combined walkability of every cell.
+        
+        Combines the obstacle grid, the road mask in roads-only mode and the
+        rasterized hazard discs (with hazard_buffer). The mask is cached and
+        only rebuilt after obstacles, roads or the hazard set change.
+        
+        Returns:
+            Read-only boolean (grid_height, grid_width) array, True where walkable
+        """
+        if self._walkable_version != self.version:
+            self._walkable = self._build_walkable_mask()
+            self._walkable_version = self.version
+        return self._walkable
+    
+    def get_static_walkable_mask(self) -> np.ndarray:
+        """Walkability from obstacles and roads only, ignoring hazards."""
+        mask = ~self.grid
+        if self.roads_only_mode and self.walkable_grid is not None:
+            mask &= self.walkable_grid
+        return mask
+    
+    def grid_signature(self) -> str:
+        """Hash of the static grid (cell size, obstacles, roads) for persisted tables."""
+        return grid_signature(self.get_static_walkable_mask(), extra=f"{self.cell_size!r}")
+    
+    def set_landmarks(self, landmarks: Optional[LandmarkHeuristic]):
+        """
+        Use landmark (ALT) bounds as the A* heuristic.
+        
+        The tables stay in use until obstacles or roads change; hazards do
+        not invalidate them.
         
         Args:
-            world_x, world_y: World coordinates to check
+            landmarks: Tables built for this grid, or None to go back to the
+                straight-line heuristic
+        """
+        self._landmarks = landmarks
+        self._landmarks_static_version = self.static_version
+    
+    def build_landmarks(self, count: int = 8) -> LandmarkHeuristic:
+        """
+        Compute and attach landmark tables for the current static grid.
+        
+        Args:
+            count: Number of landmarks
             
         Returns:
-            True if point is in a hazard zone
+            The attached LandmarkHeuristic
         """
+        landmarks = LandmarkHeuristic.build(self, count)
+        self.set_landmarks(landmarks)
+        return landmarks
+    
+    def _landmark_table(self, goal_grid: Tuple[int, int]) -> Optional[np.ndarray]:
+        """Per-cell heuristic towards a goal, or None without valid landmarks."""
+        if self._landmarks is None or self._landmarks_static_version != self.static_version:
+            return None
+        return self._landmarks.table(goal_grid)
+    
+    def _build_walkable_mask(self) -> np.ndarray:
+        """Rasterize obstacles, roads and hazards into one boolean mask."""
+        mask = self.get_static_walkable_mask()
+        
         for hazard in self.hazard_zones:
             hazard_pos = hazard['position']
             hazard_radius = hazard['radius'] + self.hazard_buffer
             
-            distance = np.sqrt((world_x - hazard_pos[0])**2 + (world_y - hazard_pos[1])**2)
-            if distance < hazard_radius:
-                return True
+            # Only cells in the disc's bounding box can be affected
+            x0 = max(0, int(np.floor((hazard_pos[0] - hazard_radius) / self.cell_size)))
+            x1 = min(self.grid_width, int(np.ceil((hazard_pos[0] + hazard_radius) / self.cell_size)) + 1)
+            y0 = max(0, int(np.floor((hazard_pos[1] - hazard_radius) / self.cell_size)))
+            y1 = min(self.grid_height, int(np.ceil((hazard_pos[1] + hazard_radius) / self.cell_size)) + 1)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            
+            centers_x = np.arange(x0, x1) * self.cell_size + self.cell_size / 2
+            centers_y = np.arange(y0, y1) * self.cell_size + self.cell_size / 2
+            distance = np.sqrt((centers_x[None, :] - hazard_pos[0]) ** 2 +
+                               (centers_y[:, None] - hazard_pos[1]) ** 2)
+            mask[y0:y1, x0:x1] &= distance >= hazard_radius
         
-        return False
+        mask.flags.writeable = False
+        return mask
+    
+    def _is_in_hazard_zone(self, world_x: float, world_y: float) -> bool:
+        """
+        Check if a world coordinate is within any hazard zone (with buffer).
+        
+        Args:
+            world_x, world_y: World coordinates to check
+            
+        Returns:
+            True if point is in a hazard zone
+        """
+        if not self.hazard_zones:
+            return False
+        point_idx, _, _ = self._get_hazard_index().query_pairs(
+            np.array([[world_x, world_y]]), margin=self.hazard_buffer)
+        return len(point_idx) > 0
+    
+    def _get_hazard_index(self) -> HazardIndex:
+        """HazardIndex over the current hazards, covering the hazard buffer."""
+        key = (self.version, self.hazard_buffer)
+        if self._hazard_index_key != key:
+            self._hazard_index = HazardIndex(self.hazard_zones, margin=self.hazard_buffer)
+            self._hazard_index_key = key
+        return self._hazard_index
     
     def add_road_segment(self, points: List[Tuple[float, float]], width: float = 2.0):
         """
@@ -106,39 +275,25 @@ class PathFinder:
             self.walkable_grid = np.zeros((self.grid_height, self.grid_width), dtype=bool)
         
         # Draw road between consecutive points
-        for i in range(len(points) - 1):
-            start = np.array(points[i])
-            end = np.array(points[i + 1])
-            self._mark_road_segment(start, end, width)
-    
-    def _mark_road_segment(self, start: np.ndarray, end: np.ndarray, width: float):
-        """Mark a road segment as walkable in the grid."""
-        # Calculate number of steps along the road
-        length = np.linalg.norm(end - start)
-        steps = int(length / (self.cell_size * 0.25))
-        steps = max(steps, 1)
-        
-        # Width in grid cells
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(points) > 1:
+            self._mark_road_segments(points[:-1], points[1:], width)
+        self.version += 1
+        self.static_version += 1
+    
+    def _mark_road_segments(self, starts: np.ndarray, ends: np.ndarray, width: float):
+        """Mark road segments as walkable in the grid."""
+        # Sample every quarter cell along the road
+        cells = self._sample_cells(starts, ends, self.cell_size * 0.25)
+        
+        # Disc of cells within half the road width of each sample's cell
         half_width_cells = int((width / 2) / self.cell_size)
+        span = np.arange(-half_width_cells, half_width_cells + 1)
+        dx, dy = np.meshgrid(span, span)
+        within = np.sqrt(dx * dx + dy * dy) * self.cell_size <= width / 2
+        offsets = np.column_stack([dx[within], dy[within]])
         
-        for i in range(steps + 1):
-            t = i / steps if steps > 0 else 0
-            point = start + t * (end - start)
-            
-            # Convert to grid coordinates
-            grid_x = int(point[0] / self.cell_size)
-            grid_y = int(point[1] / self.cell_size)
-            
-            # Mark cells around this point as walkable
-            for dy in range(-half_width_cells, half_width_cells + 1):
-                for dx in range(-half_width_cells, half_width_cells + 1):
-                    gx = grid_x + dx
-                    gy = grid_y + dy
-                    if 0 <= gx < self.grid_width and 0 <= gy < self.grid_height:
-                        # Check if within circular road width
-                        dist = np.sqrt(dx*dx + dy*dy) * self.cell_size
-                        if dist <= width / 2:
-                            self.walkable_grid[gy, gx] = True
+        self._stamp_cells(self.walkable_grid, cells, offsets)
     
     def add_wall_segment(self, start: np.ndarray, end: np.ndarray, thickness: float = 0.2):
         """
@@ -149,30 +304,181 @@ class PathFinder:
             end: Wall end point [x, y]
             thickness: Wall thickness
         """
-        # Bresenham-like algorithm to mark wall cells
-        steps = int(np.linalg.norm(end - start) / (self.cell_size * 0.5))
-        steps = max(steps, 1)
+        self.add_wall_segments([(start, end)], thickness)
+    
+    def add_wall_segments(self, walls: Sequence, thickness: float = 0.2):
+        """
+        Add many wall segments as obstacles in one pass.
+        
+        Args:
+            walls: Sequence of (start, end) wall segments
+            thickness: Wall thickness
+        """
+        if len(walls) == 0:
+            return
+        starts = np.array([wall[0] for wall in walls], dtype=float).reshape(-1, 2)
+        ends = np.array([wall[1] for wall in walls], dtype=float).reshape(-1, 2)
+        
+        # Sample every half cell and mark a thickness-sized block at each sample
+        cells = self._sample_cells(starts, ends, self.cell_size * 0.5)
+        block = max(1, int(thickness / self.cell_size))
+        dx, dy = np.meshgrid(np.arange(block), np.arange(block))
+        offsets = np.column_stack([dx.ravel(), dy.ravel()])
+        
+        self._stamp_cells(self.grid, cells, offsets)
+        self.version += 1
+        self.static_version += 1
+    
+    def _sample_cells(self, starts: np.ndarray, ends: np.ndarray, spacing: float) -> np.ndarray:
+        """
+        Grid cells of evenly spaced samples along segments.
+        
+        Each segment gets max(1, int(length / spacing)) equal steps, both
+        endpoints included; repeated cells between consecutive samples are
+        dropped.
+        
+        Args:
+            starts: (N, 2) segment starts
+            ends: (N, 2) segment ends
+            spacing: Maximum distance between samples (m)
+            
+        Returns:
+            (K, 2) array of (x, y) cells, truncated like int()
+        """
+        deltas = ends - starts
+        steps = np.maximum((np.linalg.norm(deltas, axis=1) / spacing).astype(np.int64), 1)
         
-        for i in range(steps + 1):
-            t = i / steps if steps > 0 else 0
-            point = start + t * (end - start)
-            self.set_obstacle(point[0], point[1], thickness, thickness)
+        counts = steps + 1
+        segment = np.repeat(np.arange(len(starts)), counts)
+        i = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = i / steps[segment]
+        points = starts[segment] + t[:, None] * deltas[segment]
+        cells = (points / self.cell_size).astype(np.int64)
+        
+        keep = np.ones(len(cells), dtype=bool)
+        keep[1:] = np.any(cells[1:] != cells[:-1], axis=1)
+        return cells[keep]
+    
+    def _stamp_cells(self, target: np.ndarray, cells: np.ndarray, offsets: np.ndarray):
+        """Set target[y, x] for every cell plus every (dx, dy) offset inside the grid."""
+        xs = (cells[:, 0, None] + offsets[None, :, 0]).ravel()
+        ys = (cells[:, 1, None] + offsets[None, :, 1]).ravel()
+        inside = (xs >= 0) & (xs < self.grid_width) & (ys >= 0) & (ys < self.grid_height)
+        target[ys[inside], xs[inside]] = True
     
-    def find_path(self, start: np.ndarray, goal: np.ndarray) -> List[np.ndarray]:
+    def find_path(self, start: np.ndarray, goal: np.ndarray) -> Sequence[np.ndarray]:
         """
         Find path from start to goal using A* algorithm.
         
+        Successful searches are cached per (start cell, goal cell) for the
+        current obstacle/hazard/road state. The returned waypoint tuple and
+        its arrays are read-only and shared between callers.
+        
         Args:
             start: Start position [x, y]
             goal: Goal position [x, y]
             
         Returns:
-            List of waypoints from start to goal
+            Tuple of waypoints from start to goal
         """
         # Convert to grid coordinates
         start_grid = (int(start[0] / self.cell_size), int(start[1] / self.cell_size))
         goal_grid = (int(goal[0] / self.cell_size), int(goal[1] / self.cell_size))
         
+        cache_key = (start_grid, goal_grid)
+        path = self._cache_get(cache_key)
+        if path is not None:
+            return path
+        
+        waypoints = self._plan(start_grid, goal_grid)
+        if waypoints is None:
+            return (goal,)  # Return direct goal if no path found
+        
+        path = self._freeze_path(waypoints)
+        self._cache_put(cache_key, path)
+        return path
+    
+    def find_paths(self, starts: Sequence[np.ndarray], goals: Sequence[np.ndarray],
+                   workers: int = 0) -> List[Sequence[np.ndarray]]:
+        """
+        Plan many paths at once.
+        
+        Requests are quantized to (start cell, goal cell) and deduplicated,
+        cached paths are reused, and the remaining searches optionally run
+        in a process pool. The pool is kept between calls and each worker
+        receives a read-only copy of the grid once; only the hazard zones and
+        search settings travel with every call. The pool is restarted when
+        obstacles, roads, landmarks or the worker count change.
+        
+        Args:
+            starts: Start positions
+            goals: Goal positions, one per start
+            workers: Number of worker processes (0 or 1 plans in-process)
+            
+        Returns:
+            List of waypoint tuples, in request order (same as find_path)
+        """
+        keys = [((int(s[0] / self.cell_size), int(s[1] / self.cell_size)),
+                 (int(g[0] / self.cell_size), int(g[1] / self.cell_size)))
+                for s, g in zip(starts, goals)]
+        
+        planned = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            path = self._cache_get(key)
+            if path is not None:
+                planned[key] = path
+            else:
+                missing.append(key)
+        
+        if workers > 1 and len(missing) > 1:
+            chunk_size = max(1, len(missing) // (workers * 4))
+            chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+            settings = {
+                'hazard_buffer': self.hazard_buffer,
+                'hazard_zones': self.hazard_zones,
+                'search_mode': self.search_mode,
+                'smooth_paths': self.smooth_paths,
+                'cluster_size': self.cluster_size,
+            }
+            executor = self._get_executor(workers)
+            results = [r for chunk in executor.map(_plan_in_worker, [(settings, c) for c in chunks])
+                       for r in chunk]
+        else:
+            results = [self._plan(*key) for key in missing]
+        
+        for key, waypoints in zip(missing, results):
+            if waypoints is not None:
+                planned[key] = self._freeze_path(waypoints)
+                self._cache_put(key, planned[key])
+        
+        return [planned.get(key) or (goal,) for key, goal in zip(keys, goals)]
+    
+    def _get_executor(self, workers: int) -> ProcessPoolExecutor:
+        """Worker pool holding a copy of the current static grid."""
+        key = (workers, self.static_version, id(self._landmarks))
+        if self._executor is None or self._executor_key != key:
+            self.shutdown_workers()
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_path_worker,
+                                                 initargs=(self,))
+            self._executor_key = key
+        return self._executor
+    
+    def shutdown_workers(self):
+        """Stop the find_paths worker pool, if one is running."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_key = None
+    
+    def _plan(self, start_grid: Tuple[int, int],
+              goal_grid: Tuple[int, int]) -> Optional[List[np.ndarray]]:
+        """
+        Plan between two cells, snapping them to free cells first.
+        
+        Returns:
+            Simplified world waypoints, or None if no path exists
+        """
         # Check if start or goal is in obstacle
         if not self._is_valid_cell(start_grid):
             start_grid = self._find_nearest_free_cell(start_grid)
@@ -180,82 +486,438 @@ class PathFinder:
             goal_grid = self._find_nearest_free_cell(goal_grid)
             
         if start_grid is None or goal_grid is None:
-            return [goal]  # Return direct goal if no path found
+            return None
+        
+        if self.search_mode == 'navmesh':
+            waypoints = self._navmesh_plan(start_grid, goal_grid)
+            if waypoints is not None:
+                return waypoints
+            # Corridors narrower than the mesh resolves: plan on the grid
+        
+        grid_path = self._search(start_grid, goal_grid)
+        if grid_path is None:
+            return None
+        
+        # Simplify path and convert to world coordinates
+        if self.smooth_paths:
+            return self._string_pull(grid_path)
+        return self._simplify_path(grid_path)
+    
+    def set_search_mode(self, mode: str):
+        """
+        Select the search algorithm used by find_path.
+        
+        Args:
+            mode: 'astar' for plain A*, 'jps' for Jump Point Search (same
+                optimal paths, far fewer expansions on open floors), or
+                'hierarchical' for HPA* over clusters of cluster_size cells
+                (near-optimal, better on large maps), or 'incremental' for
+                per-goal LPA* trees that are repaired, not rebuilt, when
+                hazards change, or 'navmesh' for A* over triangles of the
+                free space with funnel smoothing (far fewer nodes on large
+                sparse maps; falls back to the grid where the mesh is cut)
+        """
+        if mode not in ('astar', 'jps', 'hierarchical', 'incremental', 'navmesh'):
+            raise ValueError(f"Unknown search mode: {mode}")
+        self.search_mode = mode
+        self.clear_path_cache()
+    
+    def routes_crossing(self, routes: Sequence[Sequence[np.ndarray]],
+                        cells: np.ndarray) -> np.ndarray:
+        """
+        Find which routes pass through a set of flagged cells.
+        
+        The flagged region is grown by one cell and each route is sampled
+        every half cell, so a polyline that touches any flagged cell is
+        always reported.
+        
+        Args:
+            routes: World-coordinate polylines (e.g. position + remaining waypoints)
+            cells: Boolean (grid_height, grid_width) mask of flagged cells
+            
+        Returns:
+            Indices of the routes that cross the flagged cells
+        """
+        if len(routes) == 0 or not cells.any():
+            return np.zeros(0, dtype=np.int64)
+        region = ndimage.binary_dilation(cells, structure=np.ones((3, 3), dtype=bool))
+        
+        starts, ends, owners = [], [], []
+        for idx, route in enumerate(routes):
+            points = np.asarray(route, dtype=float).reshape(-1, 2)
+            if len(points) == 1:
+                points = np.vstack([points, points])
+            starts.append(points[:-1])
+            ends.append(points[1:])
+            owners.append(np.full(len(points) - 1, idx, dtype=np.int64))
+        starts = np.concatenate(starts)
+        ends = np.concatenate(ends)
+        owners = np.concatenate(owners)
+        
+        # Expand every segment into evenly spaced samples (endpoints included)
+        lengths = np.linalg.norm(ends - starts, axis=1)
+        counts = np.ceil(lengths / (self.cell_size / 2)).astype(np.int64) + 1
+        segment = np.repeat(np.arange(len(starts)), counts)
+        step = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = step / np.maximum(counts[segment] - 1, 1)
+        samples = starts[segment] + t[:, None] * (ends - starts)[segment]
+        
+        gx = np.clip((samples[:, 0] / self.cell_size).astype(np.int64), 0, self.grid_width - 1)
+        gy = np.clip((samples[:, 1] / self.cell_size).astype(np.int64), 0, self.grid_height - 1)
+        return np.unique(owners[segment[region[gy, gx]]])
+    
+    def set_path_smoothing(self, enabled: bool):
+        """
+        Enable or disable line-of-sight smoothing of planned paths.
+        
+        Args:
+            enabled: If True, paths are reduced to the corner waypoints of an
+                any-angle route; if False, only collinear cells are dropped
+        """
+        self.smooth_paths = enabled
+        self.clear_path_cache()
+    
+    def get_navmesh(self) -> NavMesh:
+        """Navigation mesh of the static grid, rebuilt when obstacles or roads change."""
+        if self._navmesh is None or self._navmesh.static_version != self.static_version:
+            self._navmesh = NavMesh(self)
+        return self._navmesh
+    
+    def _navmesh_plan(self, start_grid: Tuple[int, int],
+                      goal_grid: Tuple[int, int]) -> Optional[List[np.ndarray]]:
+        """Plan between two free cell centers over the navigation mesh."""
+        components = self._get_components()
+        if components[start_grid[1], start_grid[0]] != components[goal_grid[1], goal_grid[0]]:
+            return None
         
-        # A* algorithm
+        navmesh = self.get_navmesh()
+        start = (np.array(start_grid, dtype=float) + 0.5) * self.cell_size
+        goal = (np.array(goal_grid, dtype=float) + 0.5) * self.cell_size
+        waypoints = navmesh.find_path(start, goal)
+        self.last_expanded = navmesh.last_expanded
+        return waypoints
+    
+    def _get_components(self) -> np.ndarray:
+        """8-connected component labels of the walkable mask (0 = blocked)."""
+        if self._components_version != self.version:
+            self._components, _ = ndimage.label(self.get_walkable_mask(),
+                                                structure=np.ones((3, 3), dtype=int))
+            self._components_version = self.version
+        return self._components
+    
+    def _search(self, start_grid: Tuple[int, int],
+                goal_grid: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """Find a cell path with the configured search mode."""
+        # Disconnected cells: skip a search that would flood the whole region
+        components = self._get_components()
+        if components[start_grid[1], start_grid[0]] != components[goal_grid[1], goal_grid[0]]:
+            return None
+        
+        if self.search_mode == 'jps':
+            return self._jps(start_grid, goal_grid)
+        
+        if self.search_mode == 'incremental':
+            if self._incremental is None:
+                self._incremental = IncrementalPlanner(self)
+            return self._incremental.find_cell_path(start_grid, goal_grid)
+        
+        if self.search_mode == 'hierarchical':
+            if self._hierarchy is None or self._hierarchy.cluster_size != self.cluster_size:
+                self._hierarchy = HierarchicalPlanner(self, self.cluster_size)
+            grid_path = self._hierarchy.find_cell_path(start_grid, goal_grid)
+            if grid_path is not None:
+                return grid_path
+            # Openings the abstraction misses (e.g. diagonal-only gaps):
+            # fall back to a full search so no reachable goal is lost
+        
+        return self._astar(start_grid, goal_grid)
+    
+    def _astar(self, start_grid: Tuple[int, int], goal_grid: Tuple[int, int],
+               bounds: Optional[Tuple[int, int, int, int]] = None
+               ) -> Optional[List[Tuple[int, int]]]:
+        """
+        Run A* between two valid cells.
+        
+        Args:
+            start_grid: Start cell (x, y)
+            goal_grid: Goal cell (x, y)
+            bounds: Optional (x0, y0, x1, y1) window (end-exclusive) the
+                search may not leave
+            
+        Returns:
+            List of cells from start to goal, or None if unreachable
+        """
         open_set = []
         heapq.heappush(open_set, (0, start_grid))
         came_from = {}
         g_score = {start_grid: 0}
         f_score = {start_grid: self._heuristic(start_grid, goal_grid)}
+        self.last_expanded = 0
+        # A whole-grid landmark table does not pay off for a search confined
+        # to a small window (e.g. one HPA* leg), so bounded searches skip it
+        landmark_table = self._landmark_table(goal_grid) if bounds is None else None
         
         while open_set:
             current = heapq.heappop(open_set)[1]
+            self.last_expanded += 1
             
             if current == goal_grid:
-                # Reconstruct path
-                path = self._reconstruct_path(came_from, current)
-                # Simplify path and convert to world coordinates
-                return self._simplify_path(path)
+                return self._reconstruct_path(came_from, current)
             
             for neighbor in self._get_neighbors(current):
+                if bounds is not None and not (bounds[0] <= neighbor[0] < bounds[2] and
+                                               bounds[1] <= neighbor[1] < bounds[3]):
+                    continue
+                
                 tentative_g = g_score[current] + self._distance(current, neighbor)
                 
                 if neighbor not in g_score or tentative_g < g_score[neighbor]:
                     came_from[neighbor] = current
                     g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + self._heuristic(neighbor, goal_grid)
+                    if landmark_table is not None:
+                        f_score[neighbor] = tentative_g + landmark_table[neighbor[1], neighbor[0]]
+                    else:
+                        f_score[neighbor] = tentative_g + self._heuristic(neighbor, goal_grid)
                     heapq.heappush(open_set, (f_score[neighbor], neighbor))
         
-        # No path found, return direct goal
-        return [goal]
+        return None
+    
+    def _jps(self, start_grid: Tuple[int, int],
+             goal_grid: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Jump Point Search between two valid cells.
+        
+        Uses the same movement model as _astar (8-connected, diagonal steps
+        allowed whenever the target cell is walkable), so it returns paths of
+        the same optimal length while only expanding jump points.
+        
+        Returns:
+            List of cells from start to goal, or None if unreachable
+        """
+        walkable = self.get_walkable_mask()
+        width, height = self.grid_width, self.grid_height
+        
+        def is_open(x, y):
+            return 0 <= x < width and 0 <= y < height and walkable[y, x]
+        
+        def jump(x, y, dx, dy):
+            """Step from (x, y) in direction (dx, dy) until a jump point."""
+            while True:
+                if not is_open(x, y):
+                    return None
+                if (x, y) == goal_grid:
+                    return x, y
+                
+                if dx != 0 and dy != 0:
+                    if ((is_open(x - dx, y + dy) and not is_open(x - dx, y)) or
+                            (is_open(x + dx, y - dy) and not is_open(x, y - dy))):
+                        return x, y
+                    if jump(x + dx, y, dx, 0) is not None or jump(x, y + dy, 0, dy) is not None:
+                        return x, y
+                elif dx != 0:
+                    if ((is_open(x + dx, y + 1) and not is_open(x, y + 1)) or
+                            (is_open(x + dx, y - 1) and not is_open(x, y - 1))):
+                        return x, y
+                else:
+                    if ((is_open(x + 1, y + dy) and not is_open(x + 1, y)) or
+                            (is_open(x - 1, y + dy) and not is_open(x - 1, y))):
+                        return x, y
+                
+                x += dx
+                y += dy
+        
+        def successors(node, parent):
+            """Pruned neighbor directions of node given how it was reached."""
+            x, y = node
+            if parent is None:
+                return [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                        if (dx != 0 or dy != 0) and is_open(x + dx, y + dy)]
+            
+            dx = (x > parent[0]) - (x < parent[0])
+            dy = (y > parent[1]) - (y < parent[1])
+            directions = []
+            if dx != 0 and dy != 0:
+                directions.extend([(0, dy), (dx, 0), (dx, dy)])
+                if not is_open(x - dx, y):
+                    directions.append((-dx, dy))
+                if not is_open(x, y - dy):
+                    directions.append((dx, -dy))
+            elif dx == 0:
+                directions.append((0, dy))
+                if not is_open(x + 1, y):
+                    directions.append((1, dy))
+                if not is_open(x - 1, y):
+                    directions.append((-1, dy))
+            else:
+                directions.append((dx, 0))
+                if not is_open(x, y + 1):
+                    directions.append((dx, 1))
+                if not is_open(x, y - 1):
+                    directions.append((dx, -1))
+            return directions
+        
+        open_set = [(self._heuristic(start_grid, goal_grid), start_grid)]
+        came_from = {}
+        g_score = {start_grid: 0.0}
+        closed = set()
+        self.last_expanded = 0
+        
+        while open_set:
+            current = heapq.heappop(open_set)[1]
+            if current in closed:
+                continue
+            closed.add(current)
+            self.last_expanded += 1
+            
+            if current == goal_grid:
+                jump_points = self._reconstruct_path(came_from, current)
+                return self._expand_jump_points(jump_points)
+            
+            for dx, dy in successors(current, came_from.get(current)):
+                jump_point = jump(current[0] + dx, current[1] + dy, dx, dy)
+                if jump_point is None or jump_point in closed:
+                    continue
+                
+                tentative_g = g_score[current] + self._distance(current, jump_point)
+                if tentative_g < g_score.get(jump_point, np.inf):
+                    came_from[jump_point] = current
+                    g_score[jump_point] = tentative_g
+                    heapq.heappush(open_set,
+                                   (tentative_g + self._heuristic(jump_point, goal_grid), jump_point))
+        
+        return None
+    
+    @staticmethod
+    def _expand_jump_points(jump_points: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Fill in the straight or diagonal cell runs between jump points."""
+        cells = [jump_points[0]]
+        for (x0, y0), (x1, y1) in zip(jump_points, jump_points[1:]):
+            dx = (x1 > x0) - (x1 < x0)
+            dy = (y1 > y0) - (y1 < y0)
+            x, y = x0, y0
+            while (x, y) != (x1, y1):
+                x += dx
+                y += dy
+                cells.append((x, y))
+        return cells
+    
+    @staticmethod
+    def _freeze_path(waypoints: List[np.ndarray]) -> Tuple[np.ndarray, ...]:
+        """Make a waypoint list safe to share: a tuple of read-only arrays."""
+        for waypoint in waypoints:
+            waypoint.flags.writeable = False
+        return tuple(waypoints)
+    
+    def _cache_get(self, key: tuple) -> Optional[Tuple[np.ndarray, ...]]:
+        """Look up a cached path, dropping the cache if the grid changed."""
+        if self._cache_version != self.version:
+            self._path_cache.clear()
+            self._cache_version = self.version
+        
+        path = self._path_cache.get(key)
+        if path is None:
+            self.cache_misses += 1
+            return None
+        self._path_cache.move_to_end(key)
+        self.cache_hits += 1
+        return path
+    
+    def _cache_put(self, key: tuple, path: Tuple[np.ndarray, ...]):
+        """Store a path, evicting the least recently used entries."""
+        if self.path_cache_size <= 0:
+            return
+        self._path_cache[key] = path
+        while len(self._path_cache) > self.path_cache_size:
+            self._path_cache.popitem(last=False)
+    
+    def clear_path_cache(self):
+        """Drop all cached paths and reset the hit/miss counters."""
+        self._path_cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     def _is_valid_cell(self, cell: Tuple[int, int]) -> bool:
-        """Check if cell is within bounds and not an obstacle."""
+        """Check if cell is within bounds and walkable."""
         x, y = cell
         if x < 0 or x >= self.grid_width or y < 0 or y >= self.grid_height:
             return False
+        return bool(self.get_walkable_mask()[y, x])
+    
+    def _get_nearest_free_map(self) -> Optional[np.ndarray]:
+        """
+        Nearest walkable cell of every cell, from a Euclidean distance transform.
         
-        # Check if cell is an obstacle
-        if self.grid[y, x]:
-            return False
-        
-        # Check if cell is in a hazard zone
-        world_x = x * self.cell_size + self.cell_size / 2
-        world_y = y * self.cell_size + self.cell_size / 2
-        if self._is_in_hazard_zone(world_x, world_y):
-            return False
-        
-        # If roads-only mode is enabled, check if cell is on a road
-        if self.roads_only_mode and self.walkable_grid is not None:
-            return self.walkable_grid[y, x]
+        The transform covers the grid plus a margin of NEAREST_FREE_RADIUS
+        cells, so positions just outside the grid snap correctly too.
         
-        return True
+        Returns:
+            (2, grid_height + 2 * margin, grid_width + 2 * margin) array of
+            (y, x) grid cells, or None if no cell is walkable
+        """
+        if self._nearest_free_version != self.version:
+            mask = self.get_walkable_mask()
+            if mask.any():
+                margin = self.NEAREST_FREE_RADIUS
+                padded = np.pad(~mask, margin, constant_values=True)
+                _, indices = ndimage.distance_transform_edt(padded, return_indices=True)
+                self._nearest_free = (indices - margin).astype(np.int32)
+            else:
+                self._nearest_free = None
+            self._nearest_free_version = self.version
+        return self._nearest_free
     
     def _find_nearest_free_cell(self, cell: Tuple[int, int]) -> Optional[Tuple[int, int]]:
-        """Find nearest free cell to given cell."""
-        for radius in range(1, 20):
-            for dx in range(-radius, radius + 1):
-                for dy in range(-radius, radius + 1):
-                    if abs(dx) == radius or abs(dy) == radius:
-                        neighbor = (cell[0] + dx, cell[1] + dy)
-                        if self._is_valid_cell(neighbor):
-                            return neighbor
-        return None
+        """
+        Find the nearest free cell to a given cell with an O(1) lookup.
+        
+        Args:
+            cell: Cell (x, y), may lie outside the grid
+            
+        Returns:
+            Nearest walkable cell (x, y), or None if none lies within
+            NEAREST_FREE_RADIUS cells (Chebyshev distance)
+        """
+        nearest = self._get_nearest_free_map()
+        if nearest is None:
+            return None
+        
+        margin = self.NEAREST_FREE_RADIUS
+        x, y = cell[0] + margin, cell[1] + margin
+        if not (0 <= x < nearest.shape[2] and 0 <= y < nearest.shape[1]):
+            return None
+        free_y, free_x = int(nearest[0, y, x]), int(nearest[1, y, x])
+        if max(abs(free_x - cell[0]), abs(free_y - cell[1])) < margin:
+            return free_x, free_y
+        
+        # Nearest cell is out of reach: settle for the closest one inside the window
+        x0, x1 = max(cell[0] - margin + 1, 0), min(cell[0] + margin, self.grid_width)
+        y0, y1 = max(cell[1] - margin + 1, 0), min(cell[1] + margin, self.grid_height)
+        if x0 >= x1 or y0 >= y1:
+            return None
+        free = np.argwhere(self.get_walkable_mask()[y0:y1, x0:x1])
+        if len(free) == 0:
+            return None
+        offsets = free + np.array([y0 - cell[1], x0 - cell[0]])
+        best = free[np.argmin(np.einsum('ij,ij->i', offsets, offsets))]
+        return int(best[1]) + x0, int(best[0]) + y0
     
     def _get_neighbors(self, cell: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Get valid neighboring cells."""
         x, y = cell
+        walkable = self.get_walkable_mask()
         neighbors = []
         
         # 8-directional movement
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
+        for dx in (-1, 0, 1):
+            nx = x + dx
+            if nx < 0 or nx >= self.grid_width:
+                continue
+            for dy in (-1, 0, 1):
+                ny = y + dy
+                if (dx == 0 and dy == 0) or ny < 0 or ny >= self.grid_height:
                     continue
-                neighbor = (x + dx, y + dy)
-                if self._is_valid_cell(neighbor):
-                    neighbors.append(neighbor)
+                if walkable[ny, nx]:
+                    neighbors.append((nx, ny))
         
         return neighbors
     
@@ -276,6 +938,87 @@ class PathFinder:
         path.reverse()
         return path
     
+    def _has_line_of_sight(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        """
+        Check that the segment between two cell centers only touches walkable cells.
+        
+        Every cell the segment enters is tested (a supercover of the line);
+        passing exactly through a grid corner requires all cells at that
+        corner to be walkable, so lines never squeeze between obstacles.
+        """
+        walkable = self.get_walkable_mask()
+        xs = [a[0], b[0]]
+        ys = [a[1], b[1]]
+        
+        # Crossings of vertical (axis=0) and horizontal (axis=1) grid lines
+        for axis in (0, 1):
+            p0, p1 = a[axis] + 0.5, b[axis] + 0.5
+            q0, q1 = a[1 - axis] + 0.5, b[1 - axis] + 0.5
+            if p0 == p1:
+                continue
+            lines = np.arange(min(a[axis], b[axis]) + 1, max(a[axis], b[axis]) + 1)
+            across = q0 + (lines - p0) / (p1 - p0) * (q1 - q0)
+            below = np.floor(across).astype(np.int64)
+            corner = across == below
+            
+            along = np.concatenate([lines - 1, lines, lines[corner] - 1, lines[corner]])
+            other = np.concatenate([below, below, below[corner] - 1, below[corner] - 1])
+            if axis == 0:
+                xs.append(along)
+                ys.append(other)
+            else:
+                xs.append(other)
+                ys.append(along)
+        
+        xs = np.hstack(xs)
+        ys = np.hstack(ys)
+        if (xs.min() < 0 or xs.max() >= self.grid_width or
+                ys.min() < 0 or ys.max() >= self.grid_height):
+            return False
+        return bool(walkable[ys, xs].all())
+    
+    def _string_pull(self, grid_path: List[Tuple[int, int]]) -> List[np.ndarray]:
+        """
+        Reduce a cell path to the corner waypoints of an any-angle route.
+        
+        Starting from the first cell, each waypoint is connected to the
+        farthest later turning point of the cell path it can see in a
+        straight line; only the turning points where sight is lost are kept,
+        and a final pass drops any waypoint its neighbors can see past.
+        
+        Returns:
+            World waypoints (cell centers) from start to goal
+        """
+        cells = np.asarray(grid_path)
+        if len(cells) > 2:
+            steps = np.diff(cells, axis=0)
+            turns = np.nonzero(np.any(steps[1:] != steps[:-1], axis=1))[0] + 1
+            corners = [grid_path[0]] + [grid_path[i] for i in turns] + [grid_path[-1]]
+        else:
+            corners = list(grid_path)
+        
+        waypoints = [corners[0]]
+        anchor = corners[0]
+        for previous, corner in zip(corners[1:], corners[2:]):
+            if not self._has_line_of_sight(anchor, corner):
+                waypoints.append(previous)
+                anchor = previous
+        if len(corners) > 1:
+            waypoints.append(corners[-1])
+        
+        # Drop waypoints whose neighbors see each other (e.g. two cells
+        # hugging the same wall end)
+        i = 1
+        while i < len(waypoints) - 1:
+            if self._has_line_of_sight(waypoints[i - 1], waypoints[i + 1]):
+                del waypoints[i]
+            else:
+                i += 1
+        
+        return [np.array([p[0] * self.cell_size + self.cell_size / 2,
+                          p[1] * self.cell_size + self.cell_size / 2])
+                for p in waypoints]
+    
     def _simplify_path(self, grid_path: List[Tuple[int, int]]) -> List[np.ndarray]:
         """
         Simplify path by removing unnecessary waypoints and convert to world coords.
@@ -313,3 +1056,29 @@ class PathFinder:
                      for p in simplified]
         
         return world_path
+
+
+# Per-process PathFinder copy used by find_paths worker pools
+_worker_pathfinder = None
+
+
+def _init_path_worker(pathfinder: PathFinder):
+    """Process pool initializer: keep the shipped grid for all tasks."""
+    global _worker_pathfinder
+    _worker_pathfinder = pathfinder
+    _worker_pathfinder.get_walkable_mask()
+
+
+def _plan_in_worker(task: tuple) -> List[Optional[List[np.ndarray]]]:
+    """
+    Plan a chunk of requests in a worker process.
+    
+    Args:
+        task: (settings, keys) with the caller's hazard zones and search
+            settings, and the (start cell, goal cell) requests
+    """
+    settings, keys = task
+    for name in ('hazard_buffer', 'search_mode', 'smooth_paths', 'cluster_size'):
+        setattr(_worker_pathfinder, name, settings[name])
+    _worker_pathfinder.update_hazard_zones(settings['hazard_zones'])
+    return [_worker_pathfinder._plan(start_grid, goal_grid) for start_grid, goal_grid in keys]
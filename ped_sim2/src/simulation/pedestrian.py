@@ -2,14 +2,184 @@
 Pedestrian agent class representing individual pedestrians in the simulation.
 """
 import numpy as np
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List, Sequence
+
+
+class PedestrianPool:
+    """
+    Structure-of-arrays store for pedestrian state.
+    
+    Per-agent state lives in contiguous arrays indexed by slot. Slots of
+    exited pedestrians are released and reused by later spawns, so the
+    arrays stay bounded by the peak number of simultaneous pedestrians.
+    """
+    
+    # Names of the per-slot arrays
+    FIELDS = ('positions', 'velocities', 'goals', 'radii', 'masses', 'max_speeds',
+              'desired_speeds', 'panic_levels', 'active', 'reached_goal')
+    
+    def __init__(self, capacity: int = 64):
+        """
+        Initialize an empty pool.
+        
+        Args:
+            capacity: Initial number of slots (grows automatically)
+        """
+        self.capacity = 0
+        self.size = 0  # Slots ever handed out (high-water mark)
+        self.free_slots = []  # Released slots available for reuse
+        
+        self.positions = np.zeros((0, 2))
+        self.velocities = np.zeros((0, 2))
+        self.goals = np.zeros((0, 2))
+        self.radii = np.zeros(0)
+        self.masses = np.zeros(0)
+        self.max_speeds = np.zeros(0)
+        self.desired_speeds = np.zeros(0)
+        self.panic_levels = np.zeros(0)
+        self.active = np.zeros(0, dtype=bool)
+        self.reached_goal = np.zeros(0, dtype=bool)
+        
+        self._grow(max(1, capacity))
+    
+    def _grow(self, capacity: int):
+        """Resize all arrays to the given capacity, keeping existing rows."""
+        def resized(array):
+            new_array = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            new_array[:self.capacity] = array
+            return new_array
+        
+        self.positions = resized(self.positions)
+        self.velocities = resized(self.velocities)
+        self.goals = resized(self.goals)
+        self.radii = resized(self.radii)
+        self.masses = resized(self.masses)
+        self.max_speeds = resized(self.max_speeds)
+        self.desired_speeds = resized(self.desired_speeds)
+        self.panic_levels = resized(self.panic_levels)
+        self.active = resized(self.active)
+        self.reached_goal = resized(self.reached_goal)
+        self.capacity = capacity
+    
+    def allocate(self) -> int:
+        """
+        Reserve a slot, reusing a released one when available.
+        
+        Returns:
+            Slot index
+        """
+        if self.free_slots:
+            return self.free_slots.pop()
+        
+        if self.size >= self.capacity:
+            self._grow(self.capacity * 2)
+        slot = self.size
+        self.size += 1
+        return slot
+    
+    def release(self, pedestrian: 'Pedestrian'):
+        """
+        Return a pedestrian's slot to the pool.
+        
+        The pedestrian is moved to a private single-slot pool first, so any
+        remaining references to it keep seeing its final state.
+        
+        Args:
+            pedestrian: Pedestrian whose slot should be freed
+        """
+        if pedestrian.pool is not self:
+            return
+        
+        slot = pedestrian.slot
+        private = PedestrianPool(capacity=1)
+        private_slot = private.allocate()
+        for name in self.FIELDS:
+            getattr(private, name)[private_slot] = getattr(self, name)[slot]
+        pedestrian.pool = private
+        pedestrian.slot = private_slot
+        
+        self.active[slot] = False
+        self.free_slots.append(slot)
+    
+    def integrate(self, slots: np.ndarray, forces: np.ndarray, dt: float):
+        """
+        Batched version of Pedestrian.update_position.
+        
+        Args:
+            slots: (N,) slots to update
+            forces: (N, 2) total force acting on each slot
+            dt: Time step (seconds)
+        """
+        movable = self.active[slots] & ~self.reached_goal[slots]
+        slots = slots[movable]
+        forces = forces[movable]
+        
+        velocities = self.velocities[slots] + forces / self.masses[slots, None] * dt
+        
+        # Limit velocity to max speed (accounting for panic)
+        speed = np.sqrt(np.einsum('ij,ij->i', velocities, velocities))
+        effective_max_speed = self.max_speeds[slots] * (1.0 + 0.5 * self.panic_levels[slots])
+        too_fast = speed > effective_max_speed
+        velocities[too_fast] *= (effective_max_speed[too_fast] / speed[too_fast])[:, None]
+        
+        self.velocities[slots] = velocities
+        self.positions[slots] += velocities * dt
+    
+    @staticmethod
+    def locate(pedestrians: List['Pedestrian']) -> Tuple[Optional['PedestrianPool'], Optional[np.ndarray]]:
+        """
+        Find the pool shared by a list of pedestrians.
+        
+        Args:
+            pedestrians: Pedestrians to look up
+            
+        Returns:
+            Tuple of (pool, slots), or (None, None) if they do not share a pool
+        """
+        if not pedestrians:
+            return None, None
+        pool = pedestrians[0].pool
+        if any(p.pool is not pool for p in pedestrians):
+            return None, None
+        return pool, np.fromiter((p.slot for p in pedestrians), dtype=np.int64,
+                                 count=len(pedestrians))
+    
+
+def _pool_field(name: str, doc: str):
+    """Property reading and writing one slot of a PedestrianPool array."""
+    def getter(self):
+        return getattr(self.pool, name)[self.slot]
+    
+    def setter(self, value):
+        getattr(self.pool, name)[self.slot] = value
+    
+    return property(getter, setter, doc=doc)
 
 
 class Pedestrian:
-    """Represents a single pedestrian agent in the simulation."""
+    """
+    Represents a single pedestrian agent in the simulation.
+    
+    Numeric state is stored in a PedestrianPool slot; this object is a
+    lightweight view over it plus the agent's path.
+    """
+    
+    __slots__ = ('id', 'pool', 'slot', 'path', 'current_waypoint_idx', 'flow_field')
+    
+    position = _pool_field('positions', "Current position [x, y]")
+    velocity = _pool_field('velocities', "Current velocity [vx, vy]")
+    goal = _pool_field('goals', "Target destination [x, y]")
+    radius = _pool_field('radii', "Personal space radius (m)")
+    mass = _pool_field('masses', "Mass (kg)")
+    max_speed = _pool_field('max_speeds', "Maximum walking speed (m/s)")
+    desired_speed = _pool_field('desired_speeds', "Preferred walking speed (m/s)")
+    panic_level = _pool_field('panic_levels', "Panic level, 0.0 to 1.0")
+    active = _pool_field('active', "Whether the pedestrian is still in the simulation")
+    reached_goal = _pool_field('reached_goal', "Whether the final waypoint was reached")
     
     def __init__(self, ped_id: int, position: np.ndarray, goal: np.ndarray, 
-                 max_speed: float = 1.3, radius: float = 0.3):
+                 max_speed: float = 1.3, radius: float = 0.3,
+                 pool: Optional[PedestrianPool] = None):
         """
         Initialize a pedestrian agent.
         
@@ -19,8 +189,12 @@ class Pedestrian:
             goal: Target destination [x, y]
             max_speed: Maximum walking speed (m/s)
             radius: Personal space radius (m)
+            pool: Pool to store the state in (a private one is created if None)
         """
         self.id = ped_id
+        self.pool = pool if pool is not None else PedestrianPool(capacity=1)
+        self.slot = self.pool.allocate()
+        
         self.position = np.array(position, dtype=float)
         self.velocity = np.zeros(2)
         self.goal = np.array(goal, dtype=float)
@@ -31,11 +205,18 @@ class Pedestrian:
         self.active = True
         self.reached_goal = False
         self.panic_level = 0.0  # 0.0 to 1.0, affects behavior during emergencies
-        self.path = [goal]  # Waypoints to follow
+        self.path = [self.goal.copy()]  # Waypoints to follow
         self.current_waypoint_idx = 0
+        self.flow_field = None  # FlowField to follow instead of path, if set
         
     def get_desired_direction(self) -> np.ndarray:
         """Calculate the desired direction towards current waypoint."""
+        if self.flow_field is not None:
+            if np.linalg.norm(self.goal - self.position) < 0.1:
+                self.reached_goal = True
+                return np.zeros(2)
+            return self.flow_field.direction_at(self.position)
+        
         if self.current_waypoint_idx >= len(self.path):
             target = self.goal
         else:
@@ -86,11 +267,19 @@ class Pedestrian:
         """Set panic level (0.0 = calm, 1.0 = maximum panic)."""
         self.panic_level = np.clip(level, 0.0, 1.0)
     
-    def update_path(self, new_path: list):
-        """Update the path to follow."""
+    def update_path(self, new_path: Sequence[np.ndarray]):
+        """Update the path to follow (shared, not copied; must not be mutated)."""
         self.path = new_path
         self.current_waypoint_idx = 0
         self.reached_goal = False
+        self.flow_field = None
+    
+    def follow_flow_field(self, flow_field):
+        """Navigate by looking up directions in a flow field instead of a path."""
+        self.path = [self.goal.copy()]
+        self.current_waypoint_idx = 0
+        self.reached_goal = False
+        self.flow_field = flow_field
     
     def deactivate(self):
         """Deactivate pedestrian (e.g., reached exit)."""
@@ -104,8 +293,8 @@ class Pedestrian:
             'position': self.position.tolist(),
             'velocity': self.velocity.tolist(),
             'goal': self.goal.tolist(),
-            'active': self.active,
-            'reached_goal': self.reached_goal,
-            'panic_level': self.panic_level,
-            'radius': self.radius
+            'active': bool(self.active),
+            'reached_goal': bool(self.reached_goal),
+            'panic_level': float(self.panic_level),
+            'radius': float(self.radius)
         }
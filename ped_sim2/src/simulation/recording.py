@@ -0,0 +1,129 @@
+"""
+Chunked trajectory recording.
+
+Frames are captured as array slices of the PedestrianPool instead of
+per-pedestrian dictionaries, and stacked into one block of arrays every
+chunk_size frames. The dictionary frames the exporters expect are only
+built when trajectory data is actually read.
+"""
+import numpy as np
+from typing import Dict, List
+
+
+class TrajectoryRecorder:
+    """Records pedestrian states per frame into array chunks."""
+    
+    # Per-pedestrian columns copied from the pool each frame
+    FIELDS = ('positions', 'velocities', 'goals', 'reached_goal', 'panic_levels', 'radii')
+    
+    def __init__(self, chunk_size: int = 256):
+        """
+        Initialize an empty recording.
+        
+        Args:
+            chunk_size: Frames buffered before they are stacked into a chunk
+        """
+        self.chunk_size = chunk_size
+        self.chunks: List[Dict[str, np.ndarray]] = []
+        self._frame_count = 0
+        self._reset_buffer()
+    
+    def _reset_buffer(self):
+        self._times = []
+        self._ids = []
+        self._columns = {field: [] for field in self.FIELDS}
+    
+    def __len__(self) -> int:
+        """Number of recorded frames."""
+        return self._frame_count
+    
+    def clear(self):
+        """Drop all recorded frames."""
+        self.chunks = []
+        self._frame_count = 0
+        self._reset_buffer()
+    
+    def record(self, time: float, ids: np.ndarray, pool, slots: np.ndarray):
+        """
+        Capture one frame.
+        
+        Args:
+            time: Simulation time of the frame
+            ids: (N,) ids of the active pedestrians
+            pool: PedestrianPool holding their state
+            slots: (N,) their pool slots
+        """
+        self._times.append(time)
+        self._ids.append(np.asarray(ids, dtype=np.int64))
+        for field in self.FIELDS:
+            self._columns[field].append(getattr(pool, field)[slots])  # Fancy indexing copies
+        self._frame_count += 1
+        if len(self._times) >= self.chunk_size:
+            self.flush()
+    
+    def flush(self):
+        """Stack buffered frames into a chunk."""
+        if not self._times:
+            return
+        counts = np.array([len(ids) for ids in self._ids], dtype=np.int64)
+        chunk = {
+            'times': np.array(self._times, dtype=float),
+            'offsets': np.concatenate([[0], np.cumsum(counts)]),
+            'ids': np.concatenate(self._ids),
+        }
+        for field in self.FIELDS:
+            chunk[field] = np.concatenate(self._columns[field])
+        self.chunks.append(chunk)
+        self._reset_buffer()
+    
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        All frames as flat arrays.
+        
+        Returns:
+            Dict with 'times' (F,), 'offsets' (F + 1,) into the per-pedestrian
+            arrays, 'ids' and one array per FIELDS entry
+        """
+        self.flush()
+        if not self.chunks:
+            arrays = {'times': np.zeros(0), 'offsets': np.zeros(1, dtype=np.int64),
+                      'ids': np.zeros(0, dtype=np.int64)}
+            arrays.update({field: np.zeros(0) for field in self.FIELDS})
+            return arrays
+        
+        arrays = {'times': np.concatenate([c['times'] for c in self.chunks])}
+        starts = np.cumsum([0] + [len(c['ids']) for c in self.chunks[:-1]])
+        arrays['offsets'] = np.concatenate(
+            [c['offsets'][:-1] + start for c, start in zip(self.chunks, starts)] +
+            [[starts[-1] + len(self.chunks[-1]['ids'])]])
+        for key in ('ids',) + self.FIELDS:
+            arrays[key] = np.concatenate([c[key] for c in self.chunks])
+        return arrays
+    
+    def to_frames(self) -> List[dict]:
+        """
+        Recorded frames in Simulator.get_state()-style dictionaries.
+        
+        Returns:
+            List of {'time', 'pedestrians': [Pedestrian.to_dict(), ...]}
+        """
+        self.flush()
+        frames = []
+        for chunk in self.chunks:
+            offsets = chunk['offsets']
+            for frame_idx, time in enumerate(chunk['times']):
+                lo, hi = offsets[frame_idx], offsets[frame_idx + 1]
+                frames.append({
+                    'time': float(time),
+                    'pedestrians': [{
+                        'id': int(chunk['ids'][i]),
+                        'position': chunk['positions'][i].tolist(),
+                        'velocity': chunk['velocities'][i].tolist(),
+                        'goal': chunk['goals'][i].tolist(),
+                        'active': True,
+                        'reached_goal': bool(chunk['reached_goal'][i]),
+                        'panic_level': float(chunk['panic_levels'][i]),
+                        'radius': float(chunk['radii'][i])
+                    } for i in range(lo, hi)]
+                })
+        return frames
@@ -1,46 +1,77 @@
 """
 Main simulation controller integrating all components.
 """
+import io
+import logging
 import numpy as np
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import time
 import json
 
-from .pedestrian import Pedestrian
+from .pedestrian import Pedestrian, PedestrianPool
 from .social_force import SocialForceModel
+from .spatial_hash import SpatialHash
 from .pathfinding import PathFinder
+from .flow_field import FlowFieldCache
 from .environment import Environment
 from .events import EventManager, EventType, Event
+from .diagnostics import diagnostics
+from .config import load_config, simulation_setting, DEFAULT_MAX_SIMULATION_TIME
+from .recording import TrajectoryRecorder
 
 
 class Simulator:
     """Main simulation controller."""
     
-    def __init__(self, environment: Environment, dt: float = 0.1):
+    # Layout version of checkpoint() snapshots
+    CHECKPOINT_FORMAT = 1
+    
+    def __init__(self, environment: Environment, dt: float = 0.1, config: Optional[dict] = None,
+                 seed: Optional[int] = None):
         """
         Initialize simulator.
         
         Args:
             environment: Simulation environment
             dt: Time step size (seconds)
+            config: Parsed config.json (loaded from the project root if None)
+            seed: Seed of the simulation's random stream (defaults to the
+                config's random_seed; unseeded if that is null too)
         """
         self.environment = environment
         self.dt = dt
+        self.config = load_config() if config is None else config
+        # Time limit of run_until_evacuated (seconds)
+        self.max_simulation_time = float(simulation_setting(
+            self.config, 'max_simulation_time', DEFAULT_MAX_SIMULATION_TIME))
         self.time = 0.0
-        self.pedestrians = []
+        self.pedestrians = []  # Pedestrians still in the simulation
+        self.pool = PedestrianPool()  # Array storage backing self.pedestrians
         self.next_ped_id = 0
         
         # Simulation parameters
         self.target_pedestrian_count = 100  # Default target
         self.simulation_speed = 1.0  # Playback speed multiplier
         self.exit_selection_mode = 'random'  # 'random', 'nearest', or 'weighted'
+        self.navigation_mode = 'astar'  # 'astar' (per-agent paths) or 'flow_field'
+        self.path_workers = 0  # Worker processes for batch path planning (0 = in-process)
+        
+        # Random stream shared by spawning, exit selection and the force model
+        self.random_seed = simulation_setting(self.config, 'random_seed') if seed is None else seed
+        self.rng = np.random.default_rng(self.random_seed)
         
         # Initialize subsystems
-        self.social_force = SocialForceModel()
+        self.social_force = SocialForceModel(rng=self.rng)
+        self.neighbor_index = SpatialHash(self.social_force.interaction_cutoff or 2.0)
         self.pathfinder = PathFinder(
             (environment.width, environment.height),
             cell_size=0.5
         )
+        self._pathfinder_hazard_version = None  # Environment.hazard_version last synced
+        self._newly_blocked = None  # Cells blocked by hazards since the last path recalculation
+        self.last_replanned_ids = []  # Pedestrians rerouted by the last path recalculation
+        self.flow_fields = FlowFieldCache(self.pathfinder)
+        self._flow_field_version = self.pathfinder.version
         self.event_manager = EventManager()
         
         # Statistics
@@ -51,6 +82,8 @@ class Simulator:
             'total_panic': 0.0
         }
         
+        self.exit_counts = np.zeros(len(environment.exits), dtype=np.int64)  # Arrivals per exit
+        
         # Spawn tracking
         self.spawn_timers = [0.0] * len(environment.entrances)
         
@@ -62,7 +95,19 @@ class Simulator:
         
         # Recording for export
         self.recording = False
-        self.trajectory_data = []
+        self.recorder = TrajectoryRecorder()
+    
+    def reseed(self, seed: Optional[int] = None):
+        """
+        Restart the random stream of the simulation and its subsystems.
+        
+        Args:
+            seed: New seed (None keeps the current random_seed)
+        """
+        if seed is not None:
+            self.random_seed = seed
+        self.rng = np.random.default_rng(self.random_seed)
+        self.social_force.rng = self.rng
     
     def select_exit_for_pedestrian(self, position: np.ndarray) -> np.ndarray:
         """
@@ -84,30 +129,97 @@ class Simulator:
             
         elif self.exit_selection_mode == 'weighted':
             # Weighted random selection (closer exits more likely)
-            distances = []
-            for exit_zone in self.environment.exits:
-                dist = np.linalg.norm(exit_zone['position'] - position)
-                distances.append(dist)
+            distances = np.linalg.norm(self.environment.exit_positions - position, axis=1)
             
             # Convert distances to probabilities (inverse distance)
             # Add small epsilon to avoid division by zero
-            inv_distances = [1.0 / (d + 0.1) for d in distances]
-            total = sum(inv_distances)
-            probabilities = [inv_d / total for inv_d in inv_distances]
+            inv_distances = 1.0 / (distances + 0.1)
+            probabilities = inv_distances / inv_distances.sum()
             
             # Select exit based on probabilities
-            exit_idx = np.random.choice(len(self.environment.exits), p=probabilities)
+            exit_idx = self.rng.choice(len(self.environment.exits), p=probabilities)
             return self.environment.exits[exit_idx]['position']
             
         else:  # 'random' mode (default)
             # Randomly select any exit with equal probability
-            exit_idx = np.random.randint(0, len(self.environment.exits))
+            exit_idx = self.rng.integers(0, len(self.environment.exits))
             return self.environment.exits[exit_idx]['position']
         
+    def _find_exit_index(self, goal: np.ndarray) -> Optional[int]:
+        """Index of the exit located at goal, or None if goal is not an exit."""
+        matches = np.flatnonzero(np.all(self.environment.exit_positions == goal, axis=1))
+        return int(matches[0]) if len(matches) > 0 else None
+    
+    def _assign_route(self, ped: Pedestrian, goal: np.ndarray) -> bool:
+        """
+        Route a pedestrian to a goal using the current navigation mode.
+        
+        In flow-field mode, pedestrians heading to an exit follow that exit's
+        shared flow field; everything else gets an A* path.
+        
+        Args:
+            ped: Pedestrian to route
+            goal: Goal position
+            
+        Returns:
+            True if a route was assigned
+        """
+        if self.navigation_mode == 'flow_field':
+            exit_idx = self._find_exit_index(goal)
+            if exit_idx is not None:
+                ped.follow_flow_field(
+                    self.flow_fields.get(exit_idx, self.environment.exits[exit_idx])
+                )
+                return True
+        
+        path = self.pathfinder.find_path(ped.position, goal)
+        if len(path) > 0:
+            ped.update_path(path)
+            return True
+        return False
+    
+    def _assign_routes(self, peds: List[Pedestrian], goals: List[np.ndarray]):
+        """
+        Batch version of _assign_route, planning all A* paths in one call.
+        
+        Args:
+            peds: Pedestrians to route
+            goals: Goal position for each pedestrian
+        """
+        planned_peds = []
+        planned_goals = []
+        for ped, goal in zip(peds, goals):
+            if self.navigation_mode == 'flow_field' and self._find_exit_index(goal) is not None:
+                self._assign_route(ped, goal)
+            else:
+                planned_peds.append(ped)
+                planned_goals.append(goal)
+        
+        if not planned_peds:
+            return
+        
+        paths = self.pathfinder.find_paths(
+            [p.position for p in planned_peds], planned_goals, workers=self.path_workers
+        )
+        for ped, path in zip(planned_peds, paths):
+            ped.update_path(path)
+    
+    def _refresh_flow_fields(self):
+        """Swap in recomputed flow fields after walls or hazards changed."""
+        if self._flow_field_version == self.pathfinder.version:
+            return
+        self._flow_field_version = self.pathfinder.version
+        
+        for ped in self.pedestrians:
+            field = ped.flow_field
+            if field is not None and field.exit_idx is not None:
+                ped.flow_field = self.flow_fields.get(
+                    field.exit_idx, self.environment.exits[field.exit_idx]
+                )
+    
     def _update_pathfinding_grid(self):
         """Update pathfinding grid with current walls."""
-        for wall in self.environment.walls:
-            self.pathfinder.add_wall_segment(wall[0], wall[1])
+        self.pathfinder.add_wall_segments(self.environment.walls)
         
         # Set up roads if present
         if hasattr(self.environment, 'roads') and self.environment.roads:
@@ -152,7 +264,7 @@ class Simulator:
         position = event.parameters['position']
         radius = event.parameters['radius']
         self.environment.add_hazard_zone(position, radius, 'fire')
-        print(f"Fire started at {position} with radius {radius}")
+        diagnostics.log('events', "Fire started at %s with radius %s", position, radius, level=logging.INFO)
         
         # Recalculate paths for all pedestrians
         self._recalculate_all_paths()
@@ -162,7 +274,7 @@ class Simulator:
         position = event.parameters['position']
         radius = event.parameters['radius']
         self.environment.add_hazard_zone(position, radius, 'shooting')
-        print(f"Shooting incident at {position}")
+        diagnostics.log('events', "Shooting incident at %s", position, level=logging.INFO)
         
         # Immediately panic nearby pedestrians
         for ped in self.pedestrians:
@@ -178,19 +290,19 @@ class Simulator:
         """Handle entrance blocking."""
         entrance_idx = event.parameters['entrance_idx']
         self.environment.block_entrance(entrance_idx)
-        print(f"Entrance {entrance_idx} blocked")
+        diagnostics.log('events', "Entrance %d blocked", entrance_idx, level=logging.INFO)
     
     def _handle_entrance_opened(self, event: Event):
         """Handle entrance opening."""
         entrance_idx = event.parameters['entrance_idx']
         self.environment.unblock_entrance(entrance_idx)
-        print(f"Entrance {entrance_idx} opened")
+        diagnostics.log('events', "Entrance %d opened", entrance_idx, level=logging.INFO)
     
     def _handle_exit_blocked(self, event: Event):
         """Handle exit blocking."""
         exit_idx = event.parameters['exit_idx']
         self.environment.block_exit(exit_idx)
-        print(f"Exit {exit_idx} blocked")
+        diagnostics.log('events', "Exit %d blocked", exit_idx, level=logging.INFO)
         
         # Recalculate paths to find alternative exits
         self._recalculate_all_paths()
@@ -199,17 +311,48 @@ class Simulator:
         """Handle exit opening."""
         exit_idx = event.parameters['exit_idx']
         self.environment.unblock_exit(exit_idx)
-        print(f"Exit {exit_idx} opened")
+        diagnostics.log('events', "Exit %d opened", exit_idx, level=logging.INFO)
     
     def _recalculate_all_paths(self):
-        """Recalculate paths for all active pedestrians."""
-        for ped in self.pedestrians:
-            if ped.active and not ped.reached_goal:
-                # Find new goal (nearest safe exit)
-                new_goal = self.environment.get_nearest_exit(ped.position)
-                path = self.pathfinder.find_path(ped.position, new_goal)
-                ped.update_path(path)
-                ped.goal = new_goal
+        """
+        Reroute active pedestrians after hazards or exits changed.
+        
+        Only pedestrians whose nearest safe exit changed, or whose remaining
+        route crosses cells that just became blocked, are replanned; everyone
+        else keeps their current waypoints.
+        """
+        self._update_pathfinding_hazards()
+        newly_blocked = self._newly_blocked
+        self._newly_blocked = None
+        
+        peds = [p for p in self.pedestrians if p.active and not p.reached_goal]
+        # New goals (nearest safe exit) for everyone at once
+        new_goals = self.environment.get_nearest_exits(
+            np.array([p.position for p in peds]).reshape(-1, 2))
+        replan = set()
+        routes = []
+        route_owners = []
+        for i, (ped, new_goal) in enumerate(zip(peds, new_goals)):
+            if not np.array_equal(new_goal, ped.goal):
+                replan.add(i)
+            ped.goal = new_goal
+            
+            if ped.flow_field is not None:
+                continue  # Flow fields are refreshed as a whole in step()
+            remaining = ped.path[ped.current_waypoint_idx:] if ped.path is not None else []
+            if len(remaining) == 0:
+                replan.add(i)
+            else:
+                routes.append([ped.position] + list(remaining))
+                route_owners.append(i)
+        
+        if newly_blocked is not None:
+            for route_idx in self.pathfinder.routes_crossing(routes, newly_blocked):
+                replan.add(route_owners[route_idx])
+        
+        replan_peds = [peds[i] for i in sorted(replan)]
+        self.last_replanned_ids = [ped.id for ped in replan_peds]
+        self._assign_routes(replan_peds, [ped.goal for ped in replan_peds])
     
     def spawn_pedestrian(self, entrance_idx: int) -> Optional[Pedestrian]:
         """
@@ -229,8 +372,8 @@ class Simulator:
             return None
         
         # Random position within entrance radius
-        angle = np.random.uniform(0, 2 * np.pi)
-        distance = np.random.uniform(0, entrance['radius'])
+        angle = self.rng.uniform(0, 2 * np.pi)
+        distance = self.rng.uniform(0, entrance['radius'])
         position = entrance['position'] + distance * np.array([
             np.cos(angle), np.sin(angle)
         ])
@@ -238,20 +381,22 @@ class Simulator:
         # Select exit based on configured mode (random/nearest/weighted)
         goal = self.select_exit_for_pedestrian(position)
         
-        print(f"Spawning ped at entrance {entrance_idx}: pos={position}, goal={goal}, distance={np.linalg.norm(goal - position):.2f}")
+        if diagnostics.enabled('spawn'):
+            diagnostics.log('spawn', "Spawning ped at entrance %d: pos=%s, goal=%s, distance=%.2f",
+                            entrance_idx, position, goal, np.linalg.norm(goal - position))
         
         # Create pedestrian
         ped = Pedestrian(
             self.next_ped_id,
             position,
             goal,
-            max_speed=np.random.normal(1.3, 0.2)  # Vary speed
+            max_speed=self.rng.normal(1.3, 0.2),  # Vary speed
+            pool=self.pool
         )
         self.next_ped_id += 1
         
-        # Calculate path
-        path = self.pathfinder.find_path(position, goal)
-        ped.update_path(path)
+        # Calculate route
+        self._assign_route(ped, goal)
         
         self.pedestrians.append(ped)
         self.stats['spawned'] += 1
@@ -277,6 +422,8 @@ class Simulator:
         pedestrians_spawned = 0
         max_attempts = count * 10  # Prevent infinite loop
         attempts = 0
+        new_peds = []
+        new_goals = []
         
         while pedestrians_spawned < count and pedestrians_spawned < self.target_pedestrian_count and attempts < max_attempts:
             attempts += 1
@@ -289,8 +436,8 @@ class Simulator:
                 # Leave margin from edges to avoid walls
                 margin = 2.0
                 position = np.array([
-                    np.random.uniform(margin, self.environment.width - margin),
-                    np.random.uniform(margin, self.environment.height - margin)
+                    self.rng.uniform(margin, self.environment.width - margin),
+                    self.rng.uniform(margin, self.environment.height - margin)
                 ])
             
             # Check if position is valid (not inside a wall)
@@ -326,25 +473,30 @@ class Simulator:
                 self.next_ped_id,
                 position,
                 goal,
-                max_speed=np.random.normal(1.3, 0.2)
+                max_speed=self.rng.normal(1.3, 0.2),
+                pool=self.pool
             )
             self.next_ped_id += 1
             
-            # Calculate path
-            path = self.pathfinder.find_path(position, goal)
-            ped.update_path(path)
-            
+            new_peds.append(ped)
+            new_goals.append(goal)
+            pedestrians_spawned += 1
+        
+        # Calculate all routes in one batch
+        self._assign_routes(new_peds, new_goals)
+        
+        for ped in new_peds:
             # Give them initial velocity in the direction they're heading
             direction = ped.get_desired_direction()
             if np.linalg.norm(direction) > 0:
-                ped.velocity = direction * np.random.uniform(0.5, 1.2) * ped.max_speed
+                ped.velocity = direction * self.rng.uniform(0.5, 1.2) * ped.max_speed
             
             self.pedestrians.append(ped)
             self.stats['spawned'] += 1
-            pedestrians_spawned += 1
         
         if pedestrians_spawned < count:
-            print(f"Warning: Could only pre-populate {pedestrians_spawned} out of {count} pedestrians")
+            diagnostics.log('spawn', "Could only pre-populate %d out of %d pedestrians",
+                            pedestrians_spawned, count, level=logging.WARNING)
     
     def _get_random_road_position(self) -> np.ndarray:
         """Get a random position on a road."""
@@ -353,19 +505,19 @@ class Simulator:
             return np.array([self.environment.width / 2, self.environment.height / 2])
         
         # Pick a random road
-        road = self.environment.roads[np.random.randint(0, len(self.environment.roads))]
+        road = self.environment.roads[self.rng.integers(0, len(self.environment.roads))]
         points = road['points']
         
         if len(points) < 2:
             return np.array(points[0])
         
         # Pick a random segment in the road
-        segment_idx = np.random.randint(0, len(points) - 1)
+        segment_idx = self.rng.integers(0, len(points) - 1)
         start = np.array(points[segment_idx])
         end = np.array(points[segment_idx + 1])
         
         # Pick a random position along the segment
-        t = np.random.uniform(0.1, 0.9)  # Avoid exact endpoints
+        t = self.rng.uniform(0.1, 0.9)  # Avoid exact endpoints
         position = start + t * (end - start)
         
         # Add small random offset perpendicular to road (within road width)
@@ -376,7 +528,7 @@ class Simulator:
         if road_len > 0:
             # Perpendicular vector
             perp = np.array([-road_vec[1], road_vec[0]]) / road_len
-            offset = np.random.uniform(-road_width / 3, road_width / 3)
+            offset = self.rng.uniform(-road_width / 3, road_width / 3)
             position = position + perp * offset
         
         return position
@@ -398,25 +550,27 @@ class Simulator:
             # Try to find alternative exit
             alternative_exit = self.environment.get_alternative_exit(ped.position, ped.goal)
             
-            # Update pathfinder with current hazards
-            self.pathfinder.update_hazard_zones(self.environment.hazard_zones)
-            
-            # Calculate new path to alternative exit
-            new_path = self.pathfinder.find_path(ped.position, alternative_exit)
+            # Make sure the pathfinder sees the current hazards
+            self._update_pathfinding_hazards()
             
-            if len(new_path) > 0:
-                # Update pedestrian's goal and path
-                ped.goal = alternative_exit
-                ped.update_path(new_path)
+            # Update pedestrian's goal and route to the alternative exit
+            ped.goal = alternative_exit
+            if self._assign_route(ped, alternative_exit):
                 # Increase panic level due to rerouting
                 ped.set_panic_level(min(1.0, ped.panic_level + 0.3))
-            else:
-                # If no path found, at least update the goal
-                ped.goal = alternative_exit
     
     def _update_pathfinding_hazards(self):
-        """Update pathfinder with current hazard zones."""
+        """Update pathfinder with current hazard zones, if they changed."""
+        if self._pathfinder_hazard_version == self.environment.hazard_version:
+            return
+        old_mask = self.pathfinder.get_walkable_mask()
         self.pathfinder.update_hazard_zones(self.environment.hazard_zones)
+        self._pathfinder_hazard_version = self.environment.hazard_version
+        
+        # Remember which cells became blocked so rerouting can skip unaffected routes
+        blocked = old_mask & ~self.pathfinder.get_walkable_mask()
+        if blocked.any():
+            self._newly_blocked = blocked if self._newly_blocked is None else self._newly_blocked | blocked
     
     def _update_traffic_lights(self):
         """Update traffic light states based on simulation time."""
@@ -438,8 +592,10 @@ class Simulator:
                 light['state'] = 'green' if cycle_time < 15 else 'red'
             
             # Debug: Log state changes
-            if old_state != light.get('state'):
-                print(f"Traffic light {light['id']} ({controls}): {old_state} -> {light['state']} at time {self.time:.1f}s (cycle: {cycle_time:.1f}s)")
+            if old_state != light.get('state') and diagnostics.enabled('traffic_light', logging.INFO):
+                diagnostics.log('traffic_light', "Traffic light %s (%s): %s -> %s at time %.1fs (cycle: %.1fs)",
+                                light['id'], controls, old_state, light['state'], self.time, cycle_time,
+                                level=logging.INFO)
     
     def step(self):
         """Execute one simulation step."""
@@ -449,9 +605,8 @@ class Simulator:
         # Update traffic lights (30 second cycle: 15s green, 15s red, alternating)
         self._update_traffic_lights()
         
-        # Update pathfinder with current hazards
-        if len(self.environment.hazard_zones) > 0:
-            self._update_pathfinding_hazards()
+        # Update pathfinder with current hazards (no-op unless they changed)
+        self._update_pathfinding_hazards()
         
         # Update spawn timers and spawn pedestrians (only if under target count)
         if self.stats['spawned'] < self.target_pedestrian_count:
@@ -464,6 +619,10 @@ class Simulator:
                         self.spawn_pedestrian(i)
                         self.spawn_timers[i] -= spawn_interval
         
+        # Pick up recomputed flow fields if walkability changed
+        if self.navigation_mode == 'flow_field':
+            self._refresh_flow_fields()
+        
         # Update each pedestrian
         active_peds = [p for p in self.pedestrians if p.active]
         walls = self.environment.get_walls_as_segments()
@@ -471,24 +630,39 @@ class Simulator:
         # Periodically check all pedestrians for blocked paths (every 2 seconds)
         check_rerouting = (int(self.time * 10) % 20 == 0)  # Every 2 seconds
         
-        for ped in active_peds:
+        # Panic from hazard zones, looked up for all pedestrians at once
+        hazard_panic = np.zeros(len(active_peds))
+        if active_peds and self.environment.hazard_zones:
+            hazard_panic = self.environment.get_panic_levels(
+                np.array([p.position for p in active_peds]))
+        
+        for ped, panic_level in zip(active_peds, hazard_panic):
             # Check if in hazard zone
-            in_hazard, panic_level = self.environment.is_point_in_hazard(ped.position)
-            if in_hazard:
+            if panic_level > 0:
                 ped.set_panic_level(panic_level)
                 # Immediate reroute check when in hazard
                 self._check_and_reroute_pedestrian(ped)
             elif check_rerouting and len(self.environment.hazard_zones) > 0:
                 # Periodic check for all pedestrians if hazards exist
                 self._check_and_reroute_pedestrian(ped)
-            
-            # Check traffic lights FIRST - before calculating any forces
-            desired_direction = ped.get_desired_direction()
-            should_stop, reason = self.environment.get_traffic_light_state(ped.position, desired_direction)
-            
+        
+        # Check traffic lights FIRST - before calculating any forces
+        stop_mask = np.zeros(len(active_peds), dtype=bool)
+        if active_peds:
+            desired_directions = np.array([p.get_desired_direction() for p in active_peds])
+            stop_mask = self.environment.get_traffic_light_stop_mask(
+                np.array([p.position for p in active_peds]), desired_directions)
+        
+        moving_peds = []
+        for i, (ped, should_stop) in enumerate(zip(active_peds, stop_mask)):
             # Debug: Log first few pedestrians
-            if ped.id < 3 and int(self.time * 10) % 50 == 0:  # Every 5 seconds for first 3 peds
-                print(f"Ped {ped.id} at [{ped.position[0]:.1f},{ped.position[1]:.1f}], dir=[{desired_direction[0]:.2f},{desired_direction[1]:.2f}], should_stop={should_stop}, reason='{reason}', panic={ped.panic_level:.2f}")
+            if (ped.id < 3 and int(self.time * 10) % 50 == 0 and  # Every 5 seconds for first 3 peds
+                    diagnostics.enabled('pedestrian')):
+                desired_direction = desired_directions[i]
+                _, reason = self.environment.get_traffic_light_state(ped.position, desired_direction)
+                diagnostics.log('pedestrian', "Ped %d at [%.1f,%.1f], dir=[%.2f,%.2f], should_stop=%s, reason='%s', panic=%.2f",
+                                ped.id, ped.position[0], ped.position[1], desired_direction[0],
+                                desired_direction[1], should_stop, reason, ped.panic_level)
             
             # HARD STOP at red light - completely prevent movement
             # If traffic light says stop, FREEZE the pedestrian completely
@@ -497,26 +671,59 @@ class Simulator:
                 # Skip position update entirely - don't move at all
                 continue
             
-            # Calculate social forces (including hazard repulsion)
-            force = self.social_force.calculate_total_force(
-                ped, active_peds, walls, self.environment.hazard_zones
-            )
-            
-            # Update position
-            ped.update_position(force, self.dt)
-            
-            # Check if reached exit
-            for exit_zone in self.environment.exits:
-                if exit_zone['active']:
-                    distance = np.linalg.norm(ped.position - exit_zone['position'])
-                    if distance < exit_zone['radius']:
-                        ped.deactivate()
-                        self.stats['exited'] += 1
-                        break
+            moving_peds.append(ped)
+        
+        # Rebuild the neighbor index over this step's active positions
+        neighbor_index = None
+        cutoff = self.social_force.interaction_cutoff
+        if cutoff is not None and moving_peds:
+            if self.neighbor_index.cell_size != cutoff:
+                self.neighbor_index = SpatialHash(cutoff)
+            self.neighbor_index.rebuild(np.array([p.position for p in active_peds]))
+            neighbor_index = self.neighbor_index
+        
+        # Calculate social forces (including hazard repulsion) for all moving
+        # pedestrians at once, from the same snapshot of positions
+        wall_index = None
+        if self.social_force.wall_cutoff is not None:
+            wall_index = self.environment.get_wall_index(self.social_force.wall_cutoff)
+        
+        hazard_index = None
+        if self.environment.hazard_zones:
+            hazard_index = self.environment.get_hazard_index()
+        
+        forces = self.social_force.calculate_total_forces(
+            moving_peds, active_peds, walls, self.environment.hazard_zones,
+            neighbor_index, wall_index, hazard_index
+        )
         
-        # Update statistics
+        # Update positions
+        if moving_peds:
+            slots = np.array([p.slot for p in moving_peds])
+            self.pool.integrate(slots, forces, self.dt)
+            
+            # Check which pedestrians reached an exit, all at once
+            reached = self.environment.find_exits_reached(self.pool.positions[slots])
+            for idx in np.flatnonzero(reached >= 0):
+                moving_peds[idx].deactivate()
+                self.stats['exited'] += 1
+            if len(self.exit_counts) < len(self.environment.exits):
+                self.exit_counts = np.pad(self.exit_counts,
+                                          (0, len(self.environment.exits) - len(self.exit_counts)))
+            np.add.at(self.exit_counts, reached[reached >= 0], 1)
+        
+        # Update statistics (before releasing slots, while every active
+        # pedestrian still lives in the shared pool)
         self.stats['active'] = len(active_peds)
-        self.stats['total_panic'] = sum(p.panic_level for p in active_peds)
+        self.stats['total_panic'] = float(self.pool.panic_levels[
+            [p.slot for p in active_peds]].sum()) if active_peds else 0.0
+        
+        # Drop exited pedestrians and free their slots for reuse
+        exited_peds = [p for p in self.pedestrians if not p.active]
+        if exited_peds:
+            for ped in exited_peds:
+                self.pool.release(ped)
+            self.pedestrians = [p for p in self.pedestrians if p.active]
         
         # Record frame if recording
         if self.recording:
@@ -527,21 +734,81 @@ class Simulator:
     
     def _record_frame(self):
         """Record current frame for export."""
-        frame_data = {
-            'time': self.time,
-            'pedestrians': [p.to_dict() for p in self.pedestrians if p.active]
-        }
-        self.trajectory_data.append(frame_data)
+        peds = [p for p in self.pedestrians if p.active]
+        self.recorder.record(self.time, [p.id for p in peds], self.pool,
+                             np.array([p.slot for p in peds], dtype=np.int64))
+    
+    @property
+    def trajectory_data(self) -> List[dict]:
+        """Recorded frames as {'time', 'pedestrians': [Pedestrian.to_dict(), ...]}."""
+        return self.recorder.to_frames()
     
     def start_recording(self):
         """Start recording simulation for export."""
         self.recording = True
-        self.trajectory_data = []
+        self.recorder.clear()
     
     def stop_recording(self):
         """Stop recording."""
         self.recording = False
     
+    def run_for(self, seconds: float) -> int:
+        """
+        Advance the simulation headlessly by a fixed amount of time.
+        
+        Args:
+            seconds: Simulated time to run
+            
+        Returns:
+            Number of steps taken
+        """
+        steps = max(0, int(round(seconds / self.dt)))
+        for _ in range(steps):
+            self.step()
+        return steps
+    
+    def run_until(self, predicate: Callable[['Simulator'], bool],
+                  max_time: Optional[float] = None) -> bool:
+        """
+        Step headlessly until a condition holds.
+        
+        The predicate is checked before the first step and after every step.
+        
+        Args:
+            predicate: Called with the simulator; stop when it returns True
+            max_time: Simulation time at which to give up (defaults to
+                max_simulation_time from config.json)
+            
+        Returns:
+            True if the predicate was met, False if max_time was reached first
+        """
+        if max_time is None:
+            max_time = self.max_simulation_time
+        # Half a step of slack so float accumulation of time cannot add a step
+        while not predicate(self):
+            if self.time >= max_time - self.dt / 2:
+                return False
+            self.step()
+        return True
+    
+    def is_evacuated(self) -> bool:
+        """Whether every pedestrian has been spawned and none is left inside."""
+        return (self.stats['spawned'] >= self.target_pedestrian_count and
+                not any(p.active for p in self.pedestrians))
+    
+    def run_until_evacuated(self, max_time: Optional[float] = None) -> bool:
+        """
+        Step headlessly until everyone has left (see is_evacuated).
+        
+        Args:
+            max_time: Simulation time at which to give up (defaults to
+                max_simulation_time from config.json)
+            
+        Returns:
+            True if the scene was evacuated, False if max_time was reached
+        """
+        return self.run_until(Simulator.is_evacuated, max_time)
+    
     def get_state(self) -> dict:
         """Get current simulation state."""
         return {
@@ -552,10 +819,22 @@ class Simulator:
             'events': self.event_manager.to_dict()
         }
     
+    def close(self):
+        """Stop the path planning worker processes (restarted on demand)."""
+        self.pathfinder.shutdown_workers()
+    
+    def __enter__(self) -> 'Simulator':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def reset(self):
         """Reset simulation."""
+        self.close()
         self.time = 0.0
         self.pedestrians = []
+        self.pool = PedestrianPool()
         self.next_ped_id = 0
         self.spawn_timers = [0.0] * len(self.environment.entrances)
         self.stats = {
@@ -564,5 +843,152 @@ class Simulator:
             'active': 0,
             'total_panic': 0.0
         }
+        self.exit_counts = np.zeros(len(self.environment.exits), dtype=np.int64)
         self.event_manager.clear_events()
-        self.trajectory_data = []
+        self.flow_fields.clear()
+        self._newly_blocked = None
+        self.last_replanned_ids = []
+        self.recorder.clear()
+        self.reseed()
+    
+    def checkpoint(self) -> bytes:
+        """
+        Snapshot the dynamic simulation state as compact binary data.
+        
+        Covers time, the population arrays, routes, random stream, spawn
+        timers, statistics, event queue and log, hazards, entrance/exit
+        states and traffic lights. The static scenario (walls, roads, zone
+        layout) and settings such as exit_selection_mode are not included,
+        so a snapshot is restored into a simulator built from the same
+        scenario. Recorded trajectories are not part of the snapshot.
+        
+        Returns:
+            Compressed .npz archive for restore()
+        """
+        env = self.environment
+        peds = self.pedestrians
+        slots = np.array([p.slot for p in peds], dtype=np.int64)
+        paths = [np.asarray(p.path, dtype=float).reshape(-1, 2) for p in peds]
+        
+        state = {
+            'format': self.CHECKPOINT_FORMAT,
+            'time': self.time,
+            'next_ped_id': self.next_ped_id,
+            'stats': self.stats,
+            'random_seed': self.random_seed,
+            'rng_state': self.rng.bit_generator.state,
+            'last_replanned_ids': list(self.last_replanned_ids),
+            'entrance_active': [bool(e['active']) for e in env.entrances],
+            'exit_active': [bool(e['active']) for e in env.exits],
+            'hazards': env.hazard_zones,
+            'traffic_lights': [light.get('state') for light in getattr(env, 'traffic_lights', [])],
+            'events': [e.to_dict() for e in self.event_manager.events],
+            'event_log': self.event_manager.event_log,
+        }
+        arrays = {
+            'state': np.array(json.dumps(state, default=_json_value)),
+            'ids': np.array([p.id for p in peds], dtype=np.int64),
+            'waypoints': np.array([p.current_waypoint_idx for p in peds], dtype=np.int64),
+            # Exit index of the followed flow field, -1 for path followers
+            'flow_field_exits': np.array([-1 if p.flow_field is None or p.flow_field.exit_idx is None
+                                          else p.flow_field.exit_idx for p in peds], dtype=np.int64),
+            'path_lengths': np.array([len(path) for path in paths], dtype=np.int64),
+            'path_points': np.concatenate(paths) if paths else np.zeros((0, 2)),
+            'spawn_timers': np.array(self.spawn_timers, dtype=float),
+            'exit_counts': self.exit_counts,
+        }
+        for name in PedestrianPool.FIELDS:
+            arrays['ped_' + name] = getattr(self.pool, name)[slots]
+        if self._newly_blocked is not None:
+            arrays['newly_blocked'] = self._newly_blocked
+        
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+    
+    def restore(self, snapshot: bytes):
+        """
+        Continue from a checkpoint() snapshot instead of replaying up to it.
+        
+        Args:
+            snapshot: Bytes returned by checkpoint() on a simulator of the
+                same scenario
+        
+        Raises:
+            ValueError: If the snapshot has another format or scenario layout
+        """
+        with np.load(io.BytesIO(snapshot), allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        state = json.loads(str(arrays['state']))
+        
+        env = self.environment
+        if state['format'] != self.CHECKPOINT_FORMAT:
+            raise ValueError(f"Unsupported checkpoint format: {state['format']}")
+        if (len(state['entrance_active']) != len(env.entrances) or
+                len(state['exit_active']) != len(env.exits)):
+            raise ValueError("Checkpoint was taken from a different scenario")
+        self.close()
+        
+        self.time = state['time']
+        self.next_ped_id = state['next_ped_id']
+        self.stats = state['stats']
+        self.random_seed = state['random_seed']
+        self.rng.bit_generator.state = state['rng_state']
+        self.last_replanned_ids = state['last_replanned_ids']
+        self.spawn_timers = arrays['spawn_timers'].tolist()
+        self.exit_counts = arrays['exit_counts'].copy()
+        
+        # Scenario state changed by events
+        for idx, active in enumerate(state['entrance_active']):
+            if active:
+                env.unblock_entrance(idx)
+            else:
+                env.block_entrance(idx)
+        for idx, active in enumerate(state['exit_active']):
+            if active:
+                env.unblock_exit(idx)
+            else:
+                env.block_exit(idx)
+        env.hazard_zones = [dict(h, position=np.array(h['position'])) for h in state['hazards']]
+        env.mark_hazards_changed()
+        for light, light_state in zip(getattr(env, 'traffic_lights', []), state['traffic_lights']):
+            light['state'] = light_state
+        
+        self.event_manager.events = []
+        for event_data in state['events']:
+            event = Event(EventType(event_data['type']), event_data['trigger_time'],
+                          event_data['parameters'])
+            event.triggered = event_data['triggered']
+            self.event_manager.events.append(event)
+        self.event_manager.event_log = state['event_log']
+        
+        # Bring the pathfinding grid up to date with the restored hazards
+        self._update_pathfinding_hazards()
+        self._newly_blocked = arrays.get('newly_blocked')
+        self._flow_field_version = self.pathfinder.version
+        
+        # Population: slot i of a fresh pool holds pedestrian i
+        count = len(arrays['ids'])
+        self.pool = PedestrianPool(capacity=max(1, count))
+        path_ends = np.cumsum(arrays['path_lengths'])
+        path_points = arrays['path_points']
+        self.pedestrians = []
+        for i in range(count):
+            ped = Pedestrian(int(arrays['ids'][i]), arrays['ped_positions'][i],
+                             arrays['ped_goals'][i], pool=self.pool)
+            ped.path = self.pathfinder._freeze_path(
+                list(path_points[path_ends[i] - arrays['path_lengths'][i]:path_ends[i]]))
+            ped.current_waypoint_idx = int(arrays['waypoints'][i])
+            exit_idx = int(arrays['flow_field_exits'][i])
+            if exit_idx >= 0:
+                ped.flow_field = self.flow_fields.get(exit_idx, env.exits[exit_idx])
+            self.pedestrians.append(ped)
+        for name in PedestrianPool.FIELDS:
+            getattr(self.pool, name)[:count] = arrays['ped_' + name]
+        
+        self.recorder.clear()
+
+
+def _json_value(value):
+    """json.dumps fallback for NumPy arrays and scalars."""
+    return value.tolist()
@@ -3,8 +3,11 @@ Social Force Model for pedestrian movement simulation.
 Based on Helbing & Molnár (1995) and Helbing et al. (2000).
 """
 import numpy as np
-from typing import List
-from .pedestrian import Pedestrian
+from typing import List, Optional, Tuple
+from .pedestrian import Pedestrian, PedestrianPool
+from .spatial_hash import SpatialHash
+from .wall_index import WallIndex
+from .hazard_index import HazardIndex
 
 
 class SocialForceModel:
@@ -12,8 +15,16 @@ class SocialForceModel:
     Implements the social force model for realistic pedestrian dynamics.
     """
     
-    def __init__(self):
-        """Initialize social force model parameters."""
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        """
+        Initialize social force model parameters.
+        
+        Args:
+            rng: Random generator for the fluctuation term (a fresh,
+                unseeded one if None)
+        """
+        self.rng = np.random.default_rng() if rng is None else rng
+        
         # Driving force parameters
         self.relaxation_time = 0.5  # Time to reach desired velocity
         
@@ -21,9 +32,14 @@ class SocialForceModel:
         self.A_ped = 2000.0  # Interaction strength (N)
         self.B_ped = 0.08    # Interaction range (m)
         
+        # Pedestrians farther apart than this are ignored by the batched engine
+        # (None = all pairs). At 2 m the repulsion is below 1e-4 N.
+        self.interaction_cutoff = 2.0
+        
         # Pedestrian-wall repulsion
         self.A_wall = 2000.0  # Wall interaction strength (N)
         self.B_wall = 0.08    # Wall interaction range (m)
+        self.wall_cutoff = 2.0  # Walls beyond this are ignored by the batched engine
         
         # Hazard repulsion (fire, shooting, etc.)
         self.A_hazard = 5000.0  # Hazard interaction strength (N) - stronger than walls
@@ -164,8 +180,8 @@ class SocialForceModel:
         Returns:
             Random force vector
         """
-        angle = np.random.uniform(0, 2 * np.pi)
-        magnitude = np.random.normal(0, self.fluctuation_strength)
+        angle = self.rng.uniform(0, 2 * np.pi)
+        magnitude = self.rng.normal(0, self.fluctuation_strength)
         return magnitude * np.array([np.cos(angle), np.sin(angle)])
     
     def calculate_hazard_repulsion(self, pedestrian: Pedestrian,
@@ -249,3 +265,298 @@ class SocialForceModel:
         force += self.calculate_random_fluctuation()
         
         return force
+    
+    def calculate_driving_forces(self, desired_directions: np.ndarray,
+                                 desired_speeds: np.ndarray,
+                                 velocities: np.ndarray,
+                                 masses: np.ndarray,
+                                 panic_levels: np.ndarray) -> np.ndarray:
+        """
+        Batched version of calculate_driving_force.
+        
+        Args:
+            desired_directions: (N, 2) unit directions towards current waypoints
+            desired_speeds: (N,) desired walking speeds
+            velocities: (N, 2) current velocities
+            masses: (N,) pedestrian masses
+            panic_levels: (N,) panic levels
+            
+        Returns:
+            (N, 2) driving forces
+        """
+        scale = desired_speeds * (1.0 + 0.3 * panic_levels)
+        desired_velocities = desired_directions * scale[:, None]
+        forces = (desired_velocities - velocities) / self.relaxation_time
+        return forces * masses[:, None]
+    
+    def calculate_pedestrian_repulsions(self, positions: np.ndarray,
+                                        radii: np.ndarray,
+                                        panic_levels: np.ndarray,
+                                        ids: np.ndarray,
+                                        other_positions: np.ndarray,
+                                        other_radii: np.ndarray,
+                                        other_ids: np.ndarray,
+                                        pairs: Optional[Tuple[np.ndarray, np.ndarray]] = None
+                                        ) -> np.ndarray:
+        """
+        Batched version of calculate_pedestrian_repulsion summed over all others.
+        
+        Args:
+            positions: (N, 2) positions of the pedestrians the forces act on
+            radii: (N,) radii of those pedestrians
+            panic_levels: (N,) panic levels of those pedestrians
+            ids: (N,) pedestrian ids, used to skip self-interaction
+            other_positions: (M, 2) positions of the interacting pedestrians
+            other_radii: (M,) radii of the interacting pedestrians
+            other_ids: (M,) ids of the interacting pedestrians
+            pairs: Optional (i, j) index arrays restricting the interaction to
+                those pairs (e.g. from a SpatialHash); all pairs if None
+            
+        Returns:
+            (N, 2) total pedestrian repulsion per pedestrian
+        """
+        if pairs is not None:
+            i, j = pairs
+            keep = ids[i] != other_ids[j]
+            i, j = i[keep], j[keep]
+            
+            diff = positions[i] - other_positions[j]
+            distance = np.maximum(np.sqrt(np.einsum('ij,ij->i', diff, diff)), 0.01)
+            magnitude = self.A_ped * np.exp((radii[i] + other_radii[j] - distance) / self.B_ped)
+            magnitude *= 1.0 + panic_levels[i]
+            
+            pair_forces = diff * (magnitude / distance)[:, None]
+            count = len(positions)
+            return np.column_stack([
+                np.bincount(i, weights=pair_forces[:, 0], minlength=count),
+                np.bincount(i, weights=pair_forces[:, 1], minlength=count)
+            ])
+        
+        diff = positions[:, None, :] - other_positions[None, :, :]
+        distance = np.maximum(np.sqrt(np.einsum('ijk,ijk->ij', diff, diff)), 0.01)
+        
+        combined_radius = radii[:, None] + other_radii[None, :]
+        magnitude = self.A_ped * np.exp((combined_radius - distance) / self.B_ped)
+        magnitude *= (1.0 + panic_levels)[:, None]
+        magnitude[ids[:, None] == other_ids[None, :]] = 0.0
+        
+        return np.einsum('ij,ijk->ik', magnitude / distance, diff)
+    
+    def calculate_wall_repulsions(self, positions: np.ndarray,
+                                  radii: np.ndarray,
+                                  walls: List[np.ndarray],
+                                  wall_index: Optional[WallIndex] = None) -> np.ndarray:
+        """
+        Batched version of calculate_wall_repulsion.
+        
+        Args:
+            positions: (N, 2) pedestrian positions
+            radii: (N,) pedestrian radii
+            walls: List of wall segments [start, end]
+            wall_index: Optional WallIndex over walls; when given, only walls
+                within its cutoff are evaluated
+            
+        Returns:
+            (N, 2) total wall repulsion per pedestrian
+        """
+        if len(walls) == 0:
+            return np.zeros((len(positions), 2))
+        
+        if wall_index is not None:
+            i, wall_ids = wall_index.query_pairs(positions)
+            closest, distance = wall_index.closest_points(positions[i], wall_ids)
+            diff = positions[i] - closest
+            
+            too_close = distance < 0.01
+            distance = np.where(too_close, 0.01, distance)
+            diff[too_close] = 0.1
+            
+            magnitude = self.A_wall * np.exp((radii[i] - distance) / self.B_wall)
+            pair_forces = diff * (magnitude / distance)[:, None]
+            count = len(positions)
+            return np.column_stack([
+                np.bincount(i, weights=pair_forces[:, 0], minlength=count),
+                np.bincount(i, weights=pair_forces[:, 1], minlength=count)
+            ])
+        
+        starts = np.array([w[0] for w in walls], dtype=float)
+        segments = np.array([w[1] for w in walls], dtype=float) - starts
+        length_sq = np.einsum('ij,ij->i', segments, segments)
+        
+        to_point = positions[:, None, :] - starts[None, :, :]
+        safe_length_sq = np.where(length_sq < 1e-6, 1.0, length_sq)
+        t = np.einsum('ijk,jk->ij', to_point, segments) / safe_length_sq
+        t = np.where(length_sq < 1e-6, 0.0, np.clip(t, 0, 1))
+        
+        diff = to_point - t[:, :, None] * segments[None, :, :]
+        distance = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+        
+        # Same small-distance perturbation as the per-agent model
+        too_close = distance < 0.01
+        distance = np.where(too_close, 0.01, distance)
+        diff = np.where(too_close[:, :, None], 0.1, diff)
+        
+        magnitude = self.A_wall * np.exp((radii[:, None] - distance) / self.B_wall)
+        return np.einsum('ij,ijk->ik', magnitude / distance, diff)
+    
+    def calculate_hazard_repulsions(self, positions: np.ndarray,
+                                    panic_levels: np.ndarray,
+                                    hazard_zones: List[dict],
+                                    hazard_index: Optional[HazardIndex] = None) -> np.ndarray:
+        """
+        Batched version of calculate_hazard_repulsion.
+        
+        Args:
+            positions: (N, 2) pedestrian positions
+            panic_levels: (N,) panic levels
+            hazard_zones: List of hazard zone dictionaries
+            hazard_index: Optional HazardIndex over hazard_zones; when given,
+                only hazards within 1.5 radii of a pedestrian are evaluated
+            
+        Returns:
+            (N, 2) total hazard repulsion per pedestrian
+        """
+        if not hazard_zones:
+            return np.zeros((len(positions), 2))
+        
+        if hazard_index is not None:
+            i, hazard_ids, distance = hazard_index.query_pairs(positions, scale=1.5)
+            diff = positions[i] - hazard_index.centers[hazard_ids]
+            
+            too_close = distance < 0.01
+            distance = np.where(too_close, 0.01, distance)
+            diff[too_close] = 0.1
+            
+            magnitude = self.A_hazard * np.exp((hazard_index.radii[hazard_ids] - distance) / self.B_hazard)
+            magnitude *= np.where(hazard_index.is_fire[hazard_ids], 1.5, 1.0)
+            magnitude *= 1.0 + 2.0 * panic_levels[i]
+            pair_forces = diff * (magnitude / distance)[:, None]
+            count = len(positions)
+            return np.column_stack([
+                np.bincount(i, weights=pair_forces[:, 0], minlength=count),
+                np.bincount(i, weights=pair_forces[:, 1], minlength=count)
+            ])
+        
+        centers = np.array([h['position'] for h in hazard_zones], dtype=float)
+        hazard_radii = np.array([h['radius'] for h in hazard_zones], dtype=float)
+        type_factor = np.array([1.5 if h.get('type') == 'fire' else 1.0
+                                for h in hazard_zones])
+        
+        diff = positions[:, None, :] - centers[None, :, :]
+        distance = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+        
+        too_close = distance < 0.01
+        distance = np.where(too_close, 0.01, distance)
+        diff = np.where(too_close[:, :, None], 0.1, diff)
+        
+        magnitude = self.A_hazard * np.exp((hazard_radii[None, :] - distance) / self.B_hazard)
+        magnitude *= type_factor[None, :] * (1.0 + 2.0 * panic_levels)[:, None]
+        magnitude[distance >= hazard_radii[None, :] * 1.5] = 0.0
+        
+        return np.einsum('ij,ijk->ik', magnitude / distance, diff)
+    
+    def calculate_random_fluctuations(self, count: int) -> np.ndarray:
+        """
+        Batched version of calculate_random_fluctuation.
+        
+        Args:
+            count: Number of fluctuation vectors to draw
+            
+        Returns:
+            (count, 2) random force vectors
+        """
+        angle = self.rng.uniform(0, 2 * np.pi, count)
+        magnitude = self.rng.normal(0, self.fluctuation_strength, count)
+        return magnitude[:, None] * np.column_stack([np.cos(angle), np.sin(angle)])
+    
+    def calculate_total_forces(self, pedestrians: List[Pedestrian],
+                               other_pedestrians: List[Pedestrian],
+                               walls: List[np.ndarray],
+                               hazard_zones: List[dict] = None,
+                               neighbor_index: Optional[SpatialHash] = None,
+                               wall_index: Optional[WallIndex] = None,
+                               hazard_index: Optional[HazardIndex] = None) -> np.ndarray:
+        """
+        Calculate total forces for a group of pedestrians in one NumPy pass.
+        
+        Gives the same physics as calling calculate_total_force for each
+        pedestrian, which remains the per-agent reference implementation.
+        When interaction_cutoff / wall_cutoff are set, only pedestrians and
+        walls within the cutoff contribute repulsion.
+        
+        Args:
+            pedestrians: Pedestrians to calculate forces for
+            other_pedestrians: Pedestrians exerting repulsion on them
+            walls: List of wall segments
+            hazard_zones: List of hazard zone dictionaries (optional)
+            neighbor_index: SpatialHash already built over the positions of the
+                active other_pedestrians, in order (optional, built if needed)
+            wall_index: WallIndex compiled from walls (optional, built if needed)
+            hazard_index: HazardIndex compiled from hazard_zones (optional)
+            
+        Returns:
+            (N, 2) array of total force vectors, in the order of pedestrians
+        """
+        count = len(pedestrians)
+        if count == 0:
+            return np.zeros((0, 2))
+        
+        pool, slots = PedestrianPool.locate(pedestrians)
+        if pool is not None:
+            positions = pool.positions[slots]
+            velocities = pool.velocities[slots]
+            radii = pool.radii[slots]
+            masses = pool.masses[slots]
+            speeds = pool.desired_speeds[slots]
+            panic = pool.panic_levels[slots]
+        else:
+            positions = np.array([p.position for p in pedestrians], dtype=float)
+            velocities = np.array([p.velocity for p in pedestrians], dtype=float)
+            radii = np.array([p.radius for p in pedestrians], dtype=float)
+            masses = np.array([p.mass for p in pedestrians], dtype=float)
+            speeds = np.array([p.desired_speed for p in pedestrians], dtype=float)
+            panic = np.array([p.panic_level for p in pedestrians], dtype=float)
+        ids = np.array([p.id for p in pedestrians])
+        directions = np.array([p.get_desired_direction() for p in pedestrians], dtype=float)
+        
+        # Driving force towards goal
+        forces = self.calculate_driving_forces(directions, speeds, velocities, masses, panic)
+        
+        # Repulsion from other (active) pedestrians
+        others = [p for p in other_pedestrians if p.active]
+        if others:
+            other_pool, other_slots = PedestrianPool.locate(others)
+            if other_pool is not None:
+                other_positions = other_pool.positions[other_slots]
+                other_radii = other_pool.radii[other_slots]
+            else:
+                other_positions = np.array([p.position for p in others], dtype=float)
+                other_radii = np.array([p.radius for p in others], dtype=float)
+            
+            pairs = None
+            if self.interaction_cutoff is not None:
+                if neighbor_index is None:
+                    neighbor_index = SpatialHash(self.interaction_cutoff)
+                    neighbor_index.rebuild(other_positions)
+                pairs = neighbor_index.query_pairs(positions, self.interaction_cutoff)
+            
+            forces += self.calculate_pedestrian_repulsions(
+                positions, radii, panic, ids,
+                other_positions, other_radii,
+                np.array([p.id for p in others]),
+                pairs
+            )
+        
+        # Repulsion from walls
+        if self.wall_cutoff is not None and wall_index is None and len(walls) > 0:
+            wall_index = WallIndex(walls, self.wall_cutoff)
+        forces += self.calculate_wall_repulsions(positions, radii, walls, wall_index)
+        
+        # Repulsion from hazards
+        if hazard_zones:
+            forces += self.calculate_hazard_repulsions(positions, panic, hazard_zones, hazard_index)
+        
+        # Random fluctuation
+        forces += self.calculate_random_fluctuations(count)
+        
+        return forces
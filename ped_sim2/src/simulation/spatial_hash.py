@@ -0,0 +1,116 @@
+"""
+Uniform-grid spatial hash (cell list) for fast neighbor queries.
+"""
+import numpy as np
+from typing import Tuple
+
+
+class SpatialHash:
+    """
+    Cell-list index over a set of 2D points.
+
+    Points are bucketed into square cells of side cell_size. A radius query
+    with radius <= cell_size only has to visit the 3x3 block of cells around
+    each query point, so the cost scales with the local density rather than
+    with the total number of points.
+    """
+
+    # Offsets of the 3x3 block of cells visited per query
+    NEIGHBOR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+    def __init__(self, cell_size: float = 2.0):
+        """
+        Initialize spatial hash.
+
+        Args:
+            cell_size: Side length of a cell (m), also the maximum query radius
+        """
+        self.cell_size = cell_size
+        self.positions = np.zeros((0, 2))
+        self.order = np.zeros(0, dtype=np.int64)
+        self.cell_start = np.zeros(1, dtype=np.int64)
+        self.origin = np.zeros(2, dtype=np.int64)
+        self.shape = (0, 0)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def _cell_coords(self, positions: np.ndarray) -> np.ndarray:
+        """Integer cell coordinates of positions."""
+        return np.floor(positions / self.cell_size).astype(np.int64)
+
+    def rebuild(self, positions: np.ndarray):
+        """
+        Rebuild the index over a new set of points.
+
+        Args:
+            positions: (N, 2) point positions; query results index into this array
+        """
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if len(self.positions) == 0:
+            self.order = np.zeros(0, dtype=np.int64)
+            self.cell_start = np.zeros(1, dtype=np.int64)
+            self.shape = (0, 0)
+            return
+
+        cells = self._cell_coords(self.positions)
+        self.origin = cells.min(axis=0)
+        cells -= self.origin
+        self.shape = tuple(int(v) for v in cells.max(axis=0) + 1)
+
+        keys = cells[:, 0] * self.shape[1] + cells[:, 1]
+        self.order = np.argsort(keys, kind='stable')
+        counts = np.bincount(keys, minlength=self.shape[0] * self.shape[1])
+        self.cell_start = np.concatenate([[0], np.cumsum(counts)])
+
+    def query_pairs(self, points: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find all (query point, indexed point) pairs closer than radius.
+
+        Args:
+            points: (Q, 2) query positions
+            radius: Query radius (m), must not exceed cell_size
+
+        Returns:
+            Tuple of (query_indices, point_indices) arrays of equal length
+        """
+        if radius > self.cell_size:
+            raise ValueError(f"Query radius {radius} exceeds cell size {self.cell_size}")
+
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        if len(points) == 0 or len(self.positions) == 0:
+            return empty
+
+        query_cells = self._cell_coords(points) - self.origin
+        query_chunks = []
+        point_chunks = []
+
+        for dx, dy in self.NEIGHBOR_OFFSETS:
+            cx = query_cells[:, 0] + dx
+            cy = query_cells[:, 1] + dy
+            inside = (cx >= 0) & (cx < self.shape[0]) & (cy >= 0) & (cy < self.shape[1])
+            query_idx = np.nonzero(inside)[0]
+            if len(query_idx) == 0:
+                continue
+
+            keys = cx[inside] * self.shape[1] + cy[inside]
+            starts = self.cell_start[keys]
+            counts = self.cell_start[keys + 1] - starts
+            total = counts.sum()
+            if total == 0:
+                continue
+
+            # Expand each (query, cell) into one entry per point in the cell
+            run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            query_chunks.append(np.repeat(query_idx, counts))
+            point_chunks.append(self.order[np.repeat(starts, counts) + run_offsets])
+
+        if not query_chunks:
+            return empty
+
+        query_idx = np.concatenate(query_chunks)
+        point_idx = np.concatenate(point_chunks)
+        diff = points[query_idx] - self.positions[point_idx]
+        within = np.einsum('ij,ij->i', diff, diff) <= radius * radius
+        return query_idx[within], point_idx[within]
@@ -0,0 +1,143 @@
+"""
+Packed wall segment arrays with a grid bucket index for wall repulsion.
+"""
+import numpy as np
+from typing import List, Tuple
+
+
+class WallIndex:
+    """
+    Static index over wall segments.
+
+    Walls are packed into start/direction/length arrays once, and each
+    segment is registered in every grid bucket that lies within the cutoff
+    distance of it. A query point then only has to test the walls listed in
+    its own bucket.
+    """
+
+    def __init__(self, walls: List[np.ndarray], cutoff: float = 2.0):
+        """
+        Compile wall segments into packed arrays and bucket them.
+
+        Args:
+            walls: List of wall segments [start, end]
+            cutoff: Maximum distance (m) at which a wall is reported
+        """
+        self.cutoff = cutoff
+        self.cell_size = cutoff
+
+        if len(walls) > 0:
+            self.starts = np.array([w[0] for w in walls], dtype=float)
+            ends = np.array([w[1] for w in walls], dtype=float)
+        else:
+            self.starts = np.zeros((0, 2))
+            ends = np.zeros((0, 2))
+        self.directions = ends - self.starts  # Unnormalized segment vectors
+        self.length_sq = np.einsum('ij,ij->i', self.directions, self.directions)
+        self.lengths = np.sqrt(self.length_sq)
+
+        self._build_buckets(ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _build_buckets(self, ends: np.ndarray):
+        """Register every wall in the buckets within cutoff of the segment."""
+        if len(self.starts) == 0:
+            self.origin = np.zeros(2, dtype=np.int64)
+            self.shape = (0, 0)
+            self.bucket_start = np.zeros(1, dtype=np.int64)
+            self.bucket_walls = np.zeros(0, dtype=np.int64)
+            return
+
+        low = np.minimum(self.starts, ends) - self.cutoff
+        high = np.maximum(self.starts, ends) + self.cutoff
+        cell_low = np.floor(low / self.cell_size).astype(np.int64)
+        cell_high = np.floor(high / self.cell_size).astype(np.int64)
+
+        self.origin = cell_low.min(axis=0)
+        self.shape = tuple(int(v) for v in cell_high.max(axis=0) - self.origin + 1)
+
+        keys = []
+        wall_ids = []
+        # Any point in a cell is within half a diagonal of the cell center
+        reach = self.cutoff + self.cell_size * np.sqrt(0.5)
+        for wall_idx in range(len(self.starts)):
+            xs = np.arange(cell_low[wall_idx, 0], cell_high[wall_idx, 0] + 1)
+            ys = np.arange(cell_low[wall_idx, 1], cell_high[wall_idx, 1] + 1)
+            cx, cy = np.meshgrid(xs, ys, indexing='ij')
+            centers = (np.column_stack([cx.ravel(), cy.ravel()]) + 0.5) * self.cell_size
+
+            _, distance = self.closest_points(centers, np.full(len(centers), wall_idx))
+            near = distance <= reach
+            cells = np.column_stack([cx.ravel()[near], cy.ravel()[near]]) - self.origin
+            keys.append(cells[:, 0] * self.shape[1] + cells[:, 1])
+            wall_ids.append(np.full(len(cells), wall_idx, dtype=np.int64))
+
+        keys = np.concatenate(keys)
+        wall_ids = np.concatenate(wall_ids)
+        order = np.argsort(keys, kind='stable')
+        self.bucket_walls = wall_ids[order]
+        counts = np.bincount(keys, minlength=self.shape[0] * self.shape[1])
+        self.bucket_start = np.concatenate([[0], np.cumsum(counts)])
+
+    def closest_points(self, points: np.ndarray,
+                       wall_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Closest point on each given wall to each given point.
+
+        Args:
+            points: (K, 2) query points
+            wall_ids: (K,) wall index paired with each point
+
+        Returns:
+            Tuple of (closest_points (K, 2), distances (K,))
+        """
+        starts = self.starts[wall_ids]
+        segments = self.directions[wall_ids]
+        length_sq = self.length_sq[wall_ids]
+
+        degenerate = length_sq < 1e-6
+        t = np.einsum('ij,ij->i', points - starts, segments) / np.where(degenerate, 1.0, length_sq)
+        t = np.where(degenerate, 0.0, np.clip(t, 0, 1))
+
+        closest = starts + t[:, None] * segments
+        diff = points - closest
+        return closest, np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+    def query_pairs(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find all (point, wall) pairs closer than the cutoff.
+
+        Args:
+            points: (N, 2) query positions
+
+        Returns:
+            Tuple of (point_indices, wall_indices) arrays of equal length
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        if len(points) == 0 or len(self.starts) == 0:
+            return empty
+
+        cells = np.floor(points / self.cell_size).astype(np.int64) - self.origin
+        inside = ((cells[:, 0] >= 0) & (cells[:, 0] < self.shape[0]) &
+                  (cells[:, 1] >= 0) & (cells[:, 1] < self.shape[1]))
+        point_idx = np.nonzero(inside)[0]
+        if len(point_idx) == 0:
+            return empty
+
+        keys = cells[inside, 0] * self.shape[1] + cells[inside, 1]
+        starts = self.bucket_start[keys]
+        counts = self.bucket_start[keys + 1] - starts
+        total = counts.sum()
+        if total == 0:
+            return empty
+
+        run_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        point_idx = np.repeat(point_idx, counts)
+        wall_idx = self.bucket_walls[np.repeat(starts, counts) + run_offsets]
+
+        _, distance = self.closest_points(points[point_idx], wall_idx)
+        within = distance <= self.cutoff
+        return point_idx[within], wall_idx[within]
@@ -5,6 +5,7 @@ from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
 import json
+import logging
 import sys
 import os
 
@@ -14,6 +15,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from simulation.environment import Environment
 from simulation.simulator import Simulator
 from simulation.events import EventType
+from simulation.landmarks import load_or_build_landmarks
+from simulation.diagnostics import diagnostics
 from export.unity_exporter import UnityExporter
 
 app = Flask(__name__)
@@ -80,7 +83,9 @@ def handle_create_environment(data):
             )
         
         # Create simulator
-        simulator = Simulator(env, dt=0.1)
+        if simulator is not None:
+            simulator.close()
+        simulator = Simulator(env, dt=0.1, seed=data.get('seed'))
         
         emit('environment_created', {
             'status': 'success',
@@ -164,12 +169,17 @@ def run_simulation_loop():
         still_spawning = simulator.stats['spawned'] < simulator.target_pedestrian_count
         has_active_peds = simulator.stats['active'] > 0
         
-        print(f"Loop: spawned={simulator.stats['spawned']}/{simulator.target_pedestrian_count}, active={simulator.stats['active']}, still_spawning={still_spawning}, has_active={has_active_peds}")
+        if diagnostics.enabled('loop'):
+            diagnostics.log('loop', "Loop: spawned=%d/%d, active=%d, still_spawning=%s, has_active=%s",
+                            simulator.stats['spawned'], simulator.target_pedestrian_count,
+                            simulator.stats['active'], still_spawning, has_active_peds)
         
         if not (still_spawning or has_active_peds):
             # Simulation complete
             running = False
-            print(f"Simulation stopping: reason={'complete' if simulator.stats['spawned'] >= simulator.target_pedestrian_count else 'no active'}")
+            diagnostics.log('loop', "Simulation stopping: reason=%s",
+                            'complete' if simulator.stats['spawned'] >= simulator.target_pedestrian_count
+                            else 'no active', level=logging.INFO)
             socketio.emit('simulation_stopped', {
                 'reason': 'Simulation complete' if simulator.stats['spawned'] >= simulator.target_pedestrian_count else 'No active pedestrians',
                 'stats': simulator.stats
@@ -181,7 +191,7 @@ def run_simulation_loop():
         socketio.sleep(sleep_time)
     
     if not running:
-        print("Loop exiting: simulation stopped by user")
+        diagnostics.log('loop', "Loop exiting: simulation stopped by user", level=logging.INFO)
 
 
 @socketio.on('stop_simulation')
@@ -346,7 +356,13 @@ def handle_load_scenario(data):
         env = Environment.from_dict(scenario_data['environment'])
         
         # Create simulator
-        simulator = Simulator(env, dt=0.1)
+        if simulator is not None:
+            simulator.close()
+        simulator = Simulator(env, dt=0.1, seed=data.get('seed'))
+        
+        # Landmark heuristic tables, persisted next to the scenario
+        landmark_path = os.path.join(scenarios_dir, 'compiled', f'{scenario_id}.landmarks.npz')
+        load_or_build_landmarks(simulator.pathfinder, landmark_path)
         
         emit('scenario_loaded', {
             'status': 'success',
@@ -362,6 +378,10 @@ def handle_load_scenario(data):
 
 
 if __name__ == '__main__':
+    # Simulation events and state changes at INFO; per-tick diagnostics
+    # (ped_sim.loop, ped_sim.spawn, ...) stay off unless set to DEBUG
+    logging.basicConfig(level=logging.WARNING, format='%(name)s: %(message)s')
+    logging.getLogger('ped_sim').setLevel(logging.INFO)
     print("Starting Pedestrian Simulation Server...")
     print("Open http://localhost:5000 in your browser")
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
@@ -3,14 +3,17 @@ Test script to verify all components work correctly.
 """
 import sys
 import os
+import json
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import numpy as np
-from src.simulation.pedestrian import Pedestrian
+from src.simulation.pedestrian import Pedestrian, PedestrianPool
 from src.simulation.social_force import SocialForceModel
 from src.simulation.pathfinding import PathFinder
+from src.simulation.hierarchical import HierarchicalPlanner
+from src.simulation.spatial_hash import SpatialHash
 from src.simulation.environment import Environment
 from src.simulation.events import EventManager, EventType
 from src.simulation.simulator import Simulator
@@ -39,6 +42,39 @@ def test_pedestrian():
     print("✓ Pedestrian tests passed")
 
 
+def test_pedestrian_pool():
+    """Test structure-of-arrays pedestrian storage."""
+    print("Testing PedestrianPool...")
+    pool = PedestrianPool(capacity=2)
+    peds = [Pedestrian(i, [i, 0], [10, 10], pool=pool) for i in range(3)]
+    
+    assert pool.capacity >= 3
+    assert [p.slot for p in peds] == [0, 1, 2]
+    
+    # Views write through to the arrays
+    peds[1].position += np.array([0.5, 0.5])
+    peds[1].velocity = np.array([1.0, 0.0])
+    assert np.allclose(pool.positions[1], [1.5, 0.5])
+    assert np.allclose(pool.velocities[1], [1.0, 0.0])
+    
+    # Released slots are reused, released views keep their state
+    peds[1].deactivate()
+    pool.release(peds[1])
+    new_ped = Pedestrian(3, [7, 7], [10, 10], pool=pool)
+    assert new_ped.slot == 1
+    assert np.allclose(peds[1].position, [1.5, 0.5])
+    assert peds[1].to_dict()['active'] == False
+    
+    # Batched integration matches the per-agent update
+    force = np.array([[50.0, -20.0]])
+    reference = Pedestrian(9, [0, 0], [10, 10])
+    reference.update_position(force[0], 0.1)
+    pool.integrate(np.array([peds[0].slot]), force, 0.1)
+    assert np.allclose(peds[0].position - [0, 0], reference.position)
+    
+    print("✓ PedestrianPool tests passed")
+
+
 def test_social_force():
     """Test social force model."""
     print("Testing Social Force Model...")
@@ -64,6 +100,152 @@ def test_social_force():
     print("✓ Social Force Model tests passed")
 
 
+def test_social_force_batch():
+    """Test batched social force engine against the per-agent model."""
+    print("Testing batched Social Force Model...")
+    model = SocialForceModel()
+    model.fluctuation_strength = 0.0
+    model.interaction_cutoff = None
+    model.wall_cutoff = None
+    
+    rng = np.random.RandomState(42)
+    peds = []
+    for i in range(30):
+        ped = Pedestrian(i, rng.uniform(1, 19, 2), [20, 10])
+        ped.velocity = rng.uniform(-1, 1, 2)
+        ped.set_panic_level(rng.uniform(0, 1))
+        peds.append(ped)
+    peds[5].position = peds[4].position.copy()  # Coincident pair
+    walls = [[np.array([0, 0]), np.array([20, 0])],
+             [np.array([0, 0]), np.array([0, 20])],
+             [np.array([5, 5]), np.array([5, 5])]]  # Degenerate wall
+    hazards = [{'position': np.array([10, 10]), 'radius': 3.0, 'type': 'fire'},
+               {'position': np.array([4, 15]), 'radius': 2.0, 'type': 'shooting'}]
+    
+    expected = np.array([model.calculate_total_force(p, peds, walls, hazards) for p in peds])
+    forces = model.calculate_total_forces(peds, peds, walls, hazards)
+    
+    assert forces.shape == (30, 2)
+    assert np.allclose(forces, expected, rtol=1e-9, atol=1e-6)
+    
+    # Cutoffs only drop negligible long-range contributions
+    model.interaction_cutoff = 2.0
+    model.wall_cutoff = 2.0
+    forces = model.calculate_total_forces(peds, peds, walls, hazards)
+    assert np.allclose(forces, expected, atol=1e-3)
+    
+    print("✓ Batched Social Force Model tests passed")
+
+
+def test_spatial_hash():
+    """Test spatial hash neighbor queries against brute force."""
+    print("Testing Spatial Hash...")
+    rng = np.random.RandomState(1)
+    points = rng.uniform(-5, 25, (200, 2))
+    queries = rng.uniform(-5, 25, (50, 2))
+    
+    index = SpatialHash(cell_size=2.0)
+    index.rebuild(points)
+    qi, pj = index.query_pairs(queries, 1.5)
+    
+    dist = np.linalg.norm(queries[:, None, :] - points[None, :, :], axis=2)
+    expected = set(zip(*np.nonzero(dist <= 1.5)))
+    assert set(zip(qi.tolist(), pj.tolist())) == expected
+    assert len(qi) == len(expected)
+    
+    print("✓ Spatial Hash tests passed")
+
+
+def test_wall_index():
+    """Test wall bucket index against brute force distances."""
+    print("Testing Wall Index...")
+    env = Environment(40, 40)
+    env.add_boundary_walls()
+    env.add_wall((5, 5), (30, 22))
+    env.add_wall((12, 30), (12, 30))  # Degenerate wall
+    
+    index = env.get_wall_index(cutoff=2.0)
+    assert env.get_wall_index(cutoff=2.0) is index  # Cached until walls change
+    
+    rng = np.random.RandomState(3)
+    points = rng.uniform(-3, 43, (300, 2))
+    pi, wi = index.query_pairs(points)
+    
+    expected = set()
+    for i, point in enumerate(points):
+        for j, wall in enumerate(env.walls):
+            _, distance = SocialForceModel()._closest_point_on_segment(point, wall[0], wall[1])
+            if distance <= 2.0:
+                expected.add((i, j))
+    assert set(zip(pi.tolist(), wi.tolist())) == expected
+    
+    env.add_wall((20, 20), (25, 20))
+    assert env.get_wall_index(cutoff=2.0) is not index
+    
+    print("✓ Wall Index tests passed")
+
+
+def test_hazard_index():
+    """Test hazard bucket index queries against per-hazard loops."""
+    print("Testing Hazard Index...")
+    env = Environment(40, 40)
+    env.add_hazard_zone((10, 10), 3.0, 'fire')
+    env.add_hazard_zone((12, 11), 2.0, 'shooting')
+    env.add_hazard_zone((30, 25), 5.0, 'fire')
+    env.hazard_zones[1]['intensity'] = 0.5
+    env.mark_hazards_changed()
+    
+    index = env.get_hazard_index()
+    assert env.get_hazard_index() is index  # Cached until hazards change
+    
+    rng = np.random.RandomState(4)
+    points = rng.uniform(-3, 43, (400, 2))
+    points[0] = [10, 10]  # Hazard center
+    
+    expected_panic = np.zeros(len(points))
+    for i, point in enumerate(points):
+        for hazard in env.hazard_zones:
+            distance = np.linalg.norm(point - hazard['position'])
+            if distance < hazard['radius']:
+                panic = hazard['intensity'] * (1.0 - distance / hazard['radius'])
+                expected_panic[i] = max(expected_panic[i], panic)
+    assert np.allclose(env.get_panic_levels(points), expected_panic)
+    assert env.is_point_in_hazard(points[0]) == (True, 1.0)
+    
+    # Radius queries match brute force for any reach the index covers
+    pi, hi, _ = index.query_pairs(points, scale=1.5)
+    dist = np.linalg.norm(points[:, None, :] - index.centers[None, :, :], axis=2)
+    expected = set(zip(*np.nonzero(dist < 1.5 * index.radii[None, :])))
+    assert set(zip(pi.tolist(), hi.tolist())) == expected
+    
+    # Segment queries against the closest point on each segment
+    ends = rng.uniform(-3, 43, (400, 2))
+    ends[1] = points[1]  # Degenerate segment
+    blocked = env.are_paths_blocked_by_hazard(points, ends)
+    for start, end, result in zip(points, ends, blocked):
+        samples = start + np.linspace(0, 1, 2001)[:, None] * (end - start)
+        near = any(np.linalg.norm(samples - h['position'], axis=1).min() < h['radius'] - 0.05
+                   for h in env.hazard_zones)
+        far = all(np.linalg.norm(samples - h['position'], axis=1).min() > h['radius'] + 0.05
+                  for h in env.hazard_zones)
+        assert (near and result) or (far and not result) or not (near or far)
+    
+    # Indexed repulsion matches the per-agent model
+    model = SocialForceModel()
+    peds = [Pedestrian(i, p, [0, 0]) for i, p in enumerate(points[:100])]
+    for ped in peds:
+        ped.set_panic_level(rng.uniform(0, 1))
+    panic = np.array([p.panic_level for p in peds])
+    expected_forces = np.array([model.calculate_hazard_repulsion(p, env.hazard_zones) for p in peds])
+    forces = model.calculate_hazard_repulsions(points[:100], panic, env.hazard_zones, index)
+    assert np.allclose(forces, expected_forces, rtol=1e-9, atol=1e-6)
+    
+    env.add_hazard_zone((20, 20), 1.0)
+    assert env.get_hazard_index() is not index
+    
+    print("✓ Hazard Index tests passed")
+
+
 def test_pathfinding():
     """Test pathfinding."""
     print("Testing Pathfinding...")
@@ -80,9 +262,449 @@ def test_pathfinding():
     assert len(path) > 0
     assert isinstance(path[0], np.ndarray)
     
+    # Same cells hit the cache and share the read-only waypoints
+    again = pathfinder.find_path(start + 0.1, goal + 0.1)
+    assert again is path
+    assert pathfinder.cache_hits == 1 and pathfinder.cache_misses == 1
+    assert not path[0].flags.writeable
+    
+    # Least recently used entries are evicted beyond capacity
+    pathfinder.path_cache_size = 2
+    pathfinder.find_path(np.array([5, 5]), goal)
+    pathfinder.find_path(np.array([6, 6]), goal)
+    assert pathfinder.find_path(start, goal) is not path
+    
+    # Grid changes invalidate cached paths
+    cached = pathfinder.find_path(start, goal)
+    pathfinder.set_obstacle(30, 30, 2, 2)
+    assert pathfinder.find_path(start, goal) is not cached
+    
+    # Changing the hazard buffer takes effect on the next query
+    pathfinder.update_hazard_zones([{'position': np.array([25.0, 25.0]), 'radius': 2.0}])
+    cached = pathfinder.find_path(start, goal)
+    walkable = pathfinder.get_walkable_mask().sum()
+    pathfinder.hazard_buffer = 5.0
+    assert pathfinder.get_walkable_mask().sum() < walkable
+    assert pathfinder.find_path(start, goal) is not cached
+    pathfinder.update_hazard_zones([])
+    
+    # Batch planning deduplicates requests and keeps request order
+    batch_finder = PathFinder((30, 30), cell_size=0.5)
+    batch_finder.set_obstacle(10, 5, 2, 20)
+    starts = [np.array([2.0, 15.0]), np.array([25.0, 3.0]), np.array([2.1, 15.1])]
+    goals = [np.array([28.0, 15.0]), np.array([3.0, 28.0]), np.array([28.0, 15.0])]
+    paths = batch_finder.find_paths(starts, goals)
+    assert paths[0] is paths[2]
+    assert batch_finder.cache_misses == 2
+    for start, goal, batch_path in zip(starts, goals, paths):
+        assert batch_finder.find_path(start, goal) is batch_path
+    
+    pooled = PathFinder((30, 30), cell_size=0.5)
+    pooled.set_obstacle(10, 5, 2, 20)
+    pooled_paths = pooled.find_paths(starts, goals, workers=2)
+    for batch_path, pooled_path in zip(paths, pooled_paths):
+        assert np.allclose(np.array(batch_path), np.array(pooled_path))
+    
+    # The pool is kept across calls; hazards travel with each call
+    executor = pooled._executor
+    hazards = [{'position': np.array([20.0, 15.0]), 'radius': 2.0}]
+    pooled.update_hazard_zones(hazards)
+    batch_finder.update_hazard_zones(hazards)
+    pooled_paths = pooled.find_paths(starts, goals, workers=2)
+    assert pooled._executor is executor
+    for batch_path, pooled_path in zip(batch_finder.find_paths(starts, goals), pooled_paths):
+        assert np.allclose(np.array(batch_path), np.array(pooled_path))
+    
+    # Static changes restart it, and pickled copies carry no pool or hierarchy
+    pooled.set_obstacle(20, 25, 2, 2)
+    pooled.find_paths(starts, goals, workers=2)
+    assert pooled._executor is not executor
+    pooled._hierarchy = object()
+    state = pooled.__getstate__()
+    assert state['_executor'] is None and state['_hierarchy'] is None
+    pooled.shutdown_workers()
+    assert pooled._executor is None
+    
     print("✓ Pathfinding tests passed")
 
 
+def path_cost(cells):
+    """Length of a cell path in cells."""
+    return sum(np.hypot(a[0] - b[0], a[1] - b[1]) for a, b in zip(cells, cells[1:]))
+
+
+def test_hierarchical_pathfinding():
+    """Test HPA* search mode."""
+    print("Testing Hierarchical Pathfinding...")
+    pathfinder = PathFinder((60, 60), cell_size=0.5)
+    for x in (15, 30, 45):
+        pathfinder.add_wall_segment(np.array([x, 0.0]), np.array([x, 50.0]))
+    pathfinder.set_search_mode('hierarchical')
+    
+    start, goal = (4, 10), (110, 20)
+    cells = pathfinder._search(start, goal)
+    optimal = pathfinder._astar(start, goal)
+    mask = pathfinder.get_walkable_mask()
+    
+    assert cells[0] == start and cells[-1] == goal
+    assert all(mask[y, x] for x, y in cells)
+    assert all(max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 for a, b in zip(cells, cells[1:]))
+    assert path_cost(cells) <= 1.3 * path_cost(optimal)
+    
+    # A local hazard only invalidates the clusters around it
+    hierarchy = pathfinder._hierarchy
+    pathfinder.update_hazard_zones([{'position': np.array([40.0, 55.0]), 'radius': 1.0}])
+    pathfinder._search(start, goal)
+    total = hierarchy.clusters_x * hierarchy.clusters_y
+    assert 0 < hierarchy.last_rebuilt_clusters < total // 2
+    
+    # Building a cluster only reads its own (at most four) borders
+    class CountingDict(dict):
+        reads = 0
+        
+        def __getitem__(self, key):
+            CountingDict.reads += 1
+            return dict.__getitem__(self, key)
+    
+    large = PathFinder((256, 256), cell_size=0.5)
+    hierarchy = HierarchicalPlanner(large, large.cluster_size)
+    hierarchy.border_transitions = CountingDict()
+    hierarchy.sync()
+    clusters = hierarchy.clusters_x * hierarchy.clusters_y
+    assert hierarchy.last_rebuilt_clusters == clusters == 32 * 32
+    assert CountingDict.reads == 2 * len(hierarchy.border_transitions) <= 4 * clusters
+    
+    print("✓ Hierarchical Pathfinding tests passed")
+
+
+def test_jump_point_search():
+    """Test JPS returns paths as short as A*."""
+    print("Testing Jump Point Search...")
+    pathfinder = PathFinder((30, 30), cell_size=0.5)
+    pathfinder.add_wall_segment(np.array([10.0, 0.0]), np.array([10.0, 22.0]))
+    pathfinder.add_wall_segment(np.array([20.0, 8.0]), np.array([20.0, 30.0]))
+    pathfinder.add_wall_segment(np.array([3.0, 12.0]), np.array([8.0, 17.0]))
+    pathfinder.update_hazard_zones([{'position': np.array([25.0, 4.0]), 'radius': 2.0}])
+    mask = pathfinder.get_walkable_mask()
+    
+    rng = np.random.RandomState(1)
+    free = np.argwhere(mask)
+    for _ in range(20):
+        (sy, sx), (gy, gx) = free[rng.randint(len(free), size=2)]
+        start, goal = (int(sx), int(sy)), (int(gx), int(gy))
+        optimal = pathfinder._astar(start, goal)
+        astar_expanded = pathfinder.last_expanded
+        cells = pathfinder._jps(start, goal)
+        
+        assert (cells is None) == (optimal is None)
+        if cells is None:
+            continue
+        assert cells[0] == start and cells[-1] == goal
+        assert all(mask[y, x] for x, y in cells)
+        assert all(max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1 for a, b in zip(cells, cells[1:]))
+        assert abs(path_cost(cells) - path_cost(optimal)) < 1e-9
+        assert pathfinder.last_expanded <= astar_expanded
+    
+    pathfinder.set_search_mode('jps')
+    path = pathfinder.find_path(np.array([2.0, 2.0]), np.array([28.0, 28.0]))
+    assert len(path) > 2
+    
+    print("✓ Jump Point Search tests passed")
+
+
+def test_incremental_replanning():
+    """Test LPA* tree repair and selective rerouting after hazards appear."""
+    print("Testing Incremental Replanning...")
+    pathfinder = PathFinder((30, 30), cell_size=0.5)
+    pathfinder.add_wall_segment(np.array([15.0, 5.0]), np.array([15.0, 30.0]))
+    pathfinder.set_search_mode('incremental')
+    goal = (55, 55)
+    starts = [(2, 2), (5, 50), (20, 30), (40, 10)]
+    for start in starts:
+        pathfinder._search(start, goal)
+    
+    pathfinder.update_hazard_zones([{'position': np.array([22.0, 3.0]), 'radius': 1.0}])
+    for start in starts:
+        cells = pathfinder._search(start, goal)
+        assert abs(path_cost(cells) - path_cost(pathfinder._astar(start, goal))) < 1e-9
+    assert 0 < pathfinder._incremental.last_changed_cells < 200
+    
+    # Only pedestrians whose route crosses the new hazard are rerouted
+    env = Environment(40, 20)
+    env.add_boundary_walls()
+    env.add_entrance((3, 4), radius=0.5)
+    env.add_entrance((3, 16), radius=0.5)
+    env.add_exit((37, 4), radius=1.0)
+    env.add_exit((37, 16), radius=1.0)
+    sim = Simulator(env, dt=0.1)
+    sim.exit_selection_mode = 'nearest'
+    lower = [sim.spawn_pedestrian(0) for _ in range(3)]
+    upper = [sim.spawn_pedestrian(1) for _ in range(3)]
+    upper_paths = [ped.path for ped in upper]
+    
+    sim.event_manager.schedule_fire(sim.time, (20, 4), radius=1.0)
+    sim.step()
+    assert sorted(sim.last_replanned_ids) == sorted(ped.id for ped in lower)
+    assert all(ped.path is path for ped, path in zip(upper, upper_paths))
+    for ped in lower:
+        assert all(np.linalg.norm(waypoint - np.array([20.0, 4.0])) > 1.0 for waypoint in ped.path)
+    
+    print("✓ Incremental Replanning tests passed")
+
+
+def test_landmark_heuristic():
+    """Test ALT landmark heuristic tables and their persistence."""
+    print("Testing Landmark Heuristic...")
+    import tempfile
+    from scipy.sparse.csgraph import dijkstra
+    from src.simulation.grid import grid_graph
+    from src.simulation.landmarks import LandmarkHeuristic, load_or_build_landmarks
+    
+    pathfinder = PathFinder((30, 20), cell_size=0.5)
+    for x, y0, y1 in ((8, 0, 16), (16, 4, 20), (24, 0, 16)):
+        pathfinder.add_wall_segment(np.array([x, y0], dtype=float), np.array([x, y1], dtype=float))
+    start, goal = (4, 4), (56, 4)
+    pathfinder._astar(start, goal)
+    plain_expanded = pathfinder.last_expanded
+    optimal = pathfinder._astar(start, goal)
+    
+    landmarks = pathfinder.build_landmarks(count=6)
+    assert len(landmarks.landmarks) == 6
+    cells = pathfinder._astar(start, goal)
+    assert abs(path_cost(cells) - path_cost(optimal)) < 1e-9
+    assert pathfinder.last_expanded < plain_expanded
+    
+    # Window-confined searches (HPA* legs) do not build whole-grid tables
+    cached = list(landmarks._tables)
+    assert pathfinder._astar((4, 4), (10, 10), bounds=(0, 0, 16, 16)) is not None
+    assert list(landmarks._tables) == cached
+    
+    # Bounds never exceed the true walking distance, also with a hazard active
+    pathfinder.update_hazard_zones([{'position': np.array([20.0, 2.0]), 'radius': 1.0}])
+    mask = pathfinder.get_walkable_mask()
+    width = pathfinder.grid_width
+    true_distance = dijkstra(grid_graph(mask), indices=goal[1] * width + goal[0]).reshape(mask.shape)
+    table = landmarks.table(goal)
+    reachable = np.isfinite(true_distance)
+    assert np.all(table[reachable] <= true_distance[reachable] + 1e-6)
+    
+    # Persisted tables are reused for the same grid and rebuilt for another
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'compiled', 'scenario.landmarks.npz')
+        load_or_build_landmarks(pathfinder, path, count=4)
+        loaded = LandmarkHeuristic.load(path)
+        assert loaded.signature == pathfinder.grid_signature()
+        assert np.array_equal(loaded.distances, pathfinder._landmarks.distances)
+        assert load_or_build_landmarks(pathfinder, path).landmarks == loaded.landmarks
+        
+        pathfinder.add_wall_segment(np.array([2.0, 10.0]), np.array([6.0, 10.0]))
+        assert pathfinder._landmark_table(goal) is None
+        rebuilt = load_or_build_landmarks(pathfinder, path, count=4)
+        assert rebuilt.signature == pathfinder.grid_signature() != loaded.signature
+    
+    print("✓ Landmark Heuristic tests passed")
+
+
+def test_path_smoothing():
+    """Test line-of-sight string pulling of planned paths."""
+    print("Testing Path Smoothing...")
+    pathfinder = PathFinder((30, 30), cell_size=0.5)
+    pathfinder.add_wall_segments([(np.array([10.0, 0.0]), np.array([10.0, 20.0])),
+                                  (np.array([20.0, 10.0]), np.array([20.0, 30.0]))])
+    start, goal = np.array([3.0, 4.0]), np.array([27.0, 26.0])
+    
+    pathfinder.set_path_smoothing(False)
+    collinear = pathfinder.find_path(start, goal)
+    pathfinder.set_path_smoothing(True)
+    smooth = pathfinder.find_path(start, goal)
+    
+    def length(path):
+        return sum(np.linalg.norm(b - a) for a, b in zip(path, path[1:]))
+    
+    assert len(smooth) < len(collinear) / 3
+    assert length(smooth) < length(collinear)
+    mask = pathfinder.get_walkable_mask()
+    assert all(mask[int(p[1] / 0.5), int(p[0] / 0.5)] for p in smooth)
+    
+    # Sight lines are blocked by walls and by squeezing through a diagonal gap
+    assert not pathfinder._has_line_of_sight((5, 5), (30, 5))
+    pathfinder.grid[:] = False
+    pathfinder.grid[10, 11] = pathfinder.grid[11, 10] = True
+    pathfinder.version += 1
+    assert pathfinder._has_line_of_sight((5, 5), (9, 9))
+    assert not pathfinder._has_line_of_sight((5, 5), (15, 15))
+    
+    # An open floor needs no intermediate waypoints at all
+    pathfinder.grid[:] = False
+    pathfinder.version += 1
+    assert len(pathfinder.find_path(np.array([1.0, 1.0]), np.array([27.0, 9.0]))) == 2
+    
+    print("✓ Path Smoothing tests passed")
+
+
+def test_navmesh():
+    """Test navigation mesh planning through the find_path interface."""
+    print("Testing Navigation Mesh...")
+    pathfinder = PathFinder((40, 30), cell_size=0.5)
+    pathfinder.add_wall_segments([(np.array([15.0, 0.0]), np.array([15.0, 22.0])),
+                                  (np.array([28.0, 8.0]), np.array([28.0, 30.0]))])
+    start, goal = np.array([3.0, 4.0]), np.array([37.0, 26.0])
+    
+    grid_path = pathfinder.find_path(start, goal)
+    pathfinder.set_search_mode('navmesh')
+    mesh_path = pathfinder.find_path(start, goal)
+    navmesh = pathfinder.get_navmesh()
+    
+    def length(path):
+        return sum(np.linalg.norm(b - a) for a, b in zip(path, path[1:]))
+    
+    # Far fewer nodes than walkable cells, and the route stays on free cells
+    mask = pathfinder.get_walkable_mask()
+    assert 0 < len(navmesh) < mask.sum() / 10
+    assert navmesh.last_expanded < len(navmesh)
+    for a, b in zip(mesh_path, mesh_path[1:]):
+        for t in np.linspace(0, 1, int(np.linalg.norm(b - a) / 0.1) + 2):
+            p = a + t * (b - a)
+            assert mask[int(p[1] / 0.5), int(p[0] / 0.5)]
+    assert np.allclose(mesh_path[-1], [37.25, 26.25])
+    assert length(mesh_path) < length(grid_path) * 1.1
+    
+    # The mesh follows obstacle changes
+    pathfinder.add_wall_segment(np.array([15.0, 22.0]), np.array([15.0, 30.0]))
+    assert pathfinder.get_navmesh() is not navmesh
+    assert len(pathfinder.find_path(start, goal)) == 1  # Unreachable: direct goal
+    
+    print("✓ Navigation Mesh tests passed")
+
+
+def test_grid_rasterization():
+    """Test vectorized wall/road rasterization against per-sample loops."""
+    print("Testing Grid Rasterization...")
+    cs = 0.5
+    pathfinder = PathFinder((20, 15), cell_size=cs)
+    walls = [(np.array([1.0, 1.0]), np.array([18.3, 2.7])),
+             (np.array([-2.0, 5.0]), np.array([25.0, 5.0])),
+             (np.array([7.0, 14.9]), np.array([7.0, 14.9]))]
+    road = [(1, 1), (10.3, 12.2), (19.5, 3.1)]
+    pathfinder.add_wall_segments(walls[:2])
+    pathfinder.add_wall_segment(walls[2][0], walls[2][1], thickness=1.2)
+    pathfinder.add_road_segment(road, width=3.0)
+    
+    expected_grid = np.zeros_like(pathfinder.grid)
+    for (start, end), thickness in zip(walls, (0.2, 0.2, 1.2)):
+        steps = max(int(np.linalg.norm(end - start) / (cs * 0.5)), 1)
+        block = max(1, int(thickness / cs))
+        for i in range(steps + 1):
+            point = start + i / steps * (end - start)
+            for dy in range(block):
+                for dx in range(block):
+                    gx, gy = int(point[0] / cs) + dx, int(point[1] / cs) + dy
+                    if 0 <= gx < pathfinder.grid_width and 0 <= gy < pathfinder.grid_height:
+                        expected_grid[gy, gx] = True
+    
+    expected_roads = np.zeros_like(pathfinder.grid)
+    half = int(1.5 / cs)
+    for start, end in zip(road, road[1:]):
+        start, end = np.array(start, dtype=float), np.array(end, dtype=float)
+        steps = max(int(np.linalg.norm(end - start) / (cs * 0.25)), 1)
+        for i in range(steps + 1):
+            point = start + i / steps * (end - start)
+            for dy in range(-half, half + 1):
+                for dx in range(-half, half + 1):
+                    gx, gy = int(point[0] / cs) + dx, int(point[1] / cs) + dy
+                    if (0 <= gx < pathfinder.grid_width and 0 <= gy < pathfinder.grid_height and
+                            np.sqrt(dx * dx + dy * dy) * cs <= 1.5):
+                        expected_roads[gy, gx] = True
+    
+    assert np.array_equal(pathfinder.grid, expected_grid)
+    assert np.array_equal(pathfinder.walkable_grid, expected_roads)
+    
+    print("✓ Grid Rasterization tests passed")
+
+
+def test_walkable_mask():
+    """Test cached walkability mask against per-cell checks."""
+    print("Testing Walkable Mask...")
+    pathfinder = PathFinder((20, 20), cell_size=0.5)
+    pathfinder.add_wall_segment(np.array([2.0, 2.0]), np.array([15.0, 9.0]))
+    pathfinder.add_road_segment([(1, 1), (18, 18), (18, 2)], width=3.0)
+    pathfinder.set_roads_only_mode(True)
+    hazards = [{'position': np.array([10.0, 10.0]), 'radius': 1.2},
+               {'position': np.array([19.5, 3.0]), 'radius': 2.0}]
+    pathfinder.update_hazard_zones(hazards)
+    
+    mask = pathfinder.get_walkable_mask()
+    for y in range(pathfinder.grid_height):
+        for x in range(pathfinder.grid_width):
+            expected = (not pathfinder.grid[y, x] and pathfinder.walkable_grid[y, x] and
+                        not pathfinder._is_in_hazard_zone(x * 0.5 + 0.25, y * 0.5 + 0.25))
+            assert mask[y, x] == expected
+    
+    # Unchanged hazard set keeps the cached mask, a changed one rebuilds it
+    pathfinder.update_hazard_zones(list(hazards))
+    assert pathfinder.get_walkable_mask() is mask
+    pathfinder.update_hazard_zones(hazards[:1])
+    assert pathfinder.get_walkable_mask() is not mask
+    
+    # Snapping returns the Euclidean-nearest free cell, also from outside the grid
+    mask = pathfinder.get_walkable_mask()
+    free = np.argwhere(mask)
+    for cell in [(0, 0), (20, 20), (39, 0), (-3, 12), (45, 30), (10, -25)]:
+        snapped = pathfinder._find_nearest_free_cell(cell)
+        distances = np.hypot(free[:, 1] - cell[0], free[:, 0] - cell[1])
+        if distances.min() >= PathFinder.NEAREST_FREE_RADIUS:
+            assert snapped is None or mask[snapped[1], snapped[0]]
+            continue
+        assert mask[snapped[1], snapped[0]]
+        assert np.isclose(np.hypot(snapped[0] - cell[0], snapped[1] - cell[1]), distances.min())
+    nearest = pathfinder._get_nearest_free_map()
+    pathfinder._find_nearest_free_cell((0, 0))
+    assert pathfinder._get_nearest_free_map() is nearest
+    
+    print("✓ Walkable Mask tests passed")
+
+
+def test_flow_field():
+    """Test flow-field navigation."""
+    print("Testing Flow Fields...")
+    env = Environment(30, 10)
+    env.add_boundary_walls()
+    env.add_wall((15, 0), (15, 7))  # Partition with a gap at the top
+    env.add_entrance((3, 3), radius=1.0, flow_rate=5.0)
+    env.add_exit((27, 3), radius=1.5)
+    
+    sim = Simulator(env, dt=0.1)
+    sim.navigation_mode = 'flow_field'
+    sim.target_pedestrian_count = 10
+    
+    field = sim.flow_fields.get(0, env.exits[0])
+    assert sim.flow_fields.get(0, env.exits[0]) is field  # Cached
+    
+    # Walking distance goes around the partition, not straight through it
+    assert field.distance_at(np.array([3, 3])) > 24.0
+    # Next to the partition the field points up towards the gap
+    assert field.direction_at(np.array([14, 3]))[1] > 0.5
+    
+    for _ in range(600):
+        sim.step()
+    assert sim.stats['exited'] == 10
+    
+    # Hazards change walkability and invalidate the field
+    sim.pathfinder.update_hazard_zones([{'position': np.array([20, 8]), 'radius': 1.0}])
+    assert sim.flow_fields.get(0, env.exits[0]) is not field
+    
+    # An agent caught inside a hazard buffer steers around the fire, not
+    # straight through it towards the exit
+    sim.pathfinder.update_hazard_zones([{'position': np.array([22.0, 3.0]), 'radius': 1.0}])
+    field = sim.flow_fields.get(0, env.exits[0])
+    inside = np.array([19.8, 3.0])
+    assert not sim.pathfinder._is_valid_cell(field._cell_of(inside))
+    direction = field.direction_at(inside)
+    assert abs(direction[1]) > 0.5 and np.isclose(np.linalg.norm(direction), 1.0)
+    
+    print("✓ Flow Field tests passed")
+
+
 def test_environment():
     """Test environment."""
     print("Testing Environment...")
@@ -108,6 +730,39 @@ def test_environment():
     nearest_exit = env.get_nearest_exit(np.array([10, 25]))
     assert isinstance(nearest_exit, np.ndarray)
     
+    # Batched exit queries against per-exit loops
+    env.add_exit((5, 45), radius=1.5)
+    env.add_exit((6, 44), radius=3.0)
+    env.add_exit((25, 2), radius=1.0)
+    env.block_exit(3)
+    rng = np.random.RandomState(5)
+    positions = rng.uniform(0, 50, (300, 2))
+    positions[:3] = [[45.5, 25], [5.5, 44.5], [25, 2]]
+    
+    def reference_nearest(position, exits):
+        best = min(exits, key=lambda e: np.linalg.norm(position - e['position']))
+        return best['position']
+    
+    active = [e for e in env.exits if e['active']]
+    nearest = env.get_nearest_exits(positions)
+    reached = env.find_exits_reached(positions)
+    alternative = env.get_alternative_exits(positions, np.tile([5.0, 45.0], (300, 1)))
+    for i, position in enumerate(positions):
+        assert np.array_equal(nearest[i], reference_nearest(position, active))
+        inside = [j for j, e in enumerate(env.exits)
+                  if e['active'] and np.linalg.norm(position - e['position']) < e['radius']]
+        assert reached[i] == (inside[0] if inside else -1)
+        far = [e for e in active if np.linalg.norm(e['position'] - [5, 45]) > 2.0]
+        assert np.array_equal(alternative[i], reference_nearest(position, far))
+    assert list(reached[:3]) == [0, 1, -1]  # Blocked exits are never reached
+    
+    for idx in range(len(env.exits)):
+        env.block_exit(idx)
+    assert np.array_equal(env.get_nearest_exit(np.array([1, 1])), [25, 25])
+    assert (env.find_exits_reached(positions) == -1).all()
+    env.unblock_exit(0)
+    assert np.array_equal(env.get_alternative_exit(np.array([1, 1]), np.array([45, 25])), [45, 25])
+    
     # Test serialization
     data = env.to_dict()
     env2 = Environment.from_dict(data)
@@ -117,6 +772,68 @@ def test_environment():
     print("✓ Environment tests passed")
 
 
+def test_traffic_lights():
+    """Test compiled crossing lanes and batched red-light stops."""
+    print("Testing Traffic Lights...")
+    env = Environment.from_dict({
+        'width': 60, 'height': 60, 'walls': [], 'entrances': [], 'exits': [],
+        'trafficLights': [{'id': 'light_ns', 'controls': 'north-south', 'state': 'red'},
+                          {'id': 'light_ew', 'controls': 'east-west', 'state': 'green'}],
+        'crossingLanes': [{'start': [20, 10], 'end': [20, 40], 'width': 4, 'trafficLightId': 'light_ns'},
+                          {'start': [10, 30], 'end': [50, 30], 'trafficLightId': 'light_ew'},
+                          {'start': [40, 5], 'end': [40, 5], 'trafficLightId': 'light_ns'},
+                          {'start': [30, 50], 'end': [45, 50], 'trafficLightId': 'missing'}]
+    })
+    
+    def reference(position, direction):
+        """Per-crossing rules of the original scalar implementation."""
+        if np.linalg.norm(direction) < 0.01:
+            return False
+        unit = direction / np.linalg.norm(direction)
+        for crossing in env.crossing_lanes:
+            vec = np.subtract(crossing['end'], crossing['start'], dtype=float)
+            if np.linalg.norm(vec) < 0.01:
+                continue
+            axis = vec / np.linalg.norm(vec)
+            if abs(np.dot(unit, axis)) <= 0.7:
+                continue
+            to_ped = position - crossing['start']
+            along = np.dot(to_ped, axis)
+            perp = np.array([-axis[1], axis[0]])
+            across = np.dot(to_ped, perp)
+            half_width = crossing.get('width', 4) / 2.0
+            if abs(across) < half_width:
+                continue
+            if (abs(across) < half_width + 3.0 and np.dot(unit, perp) * across < 0 and
+                    0 <= along <= np.linalg.norm(vec)):
+                for light in env.traffic_lights:
+                    if light['id'] == crossing.get('trafficLightId') and light['state'] == 'red':
+                        return True
+        return False
+    
+    rng = np.random.RandomState(6)
+    positions = rng.uniform(0, 60, (2000, 2))
+    directions = rng.normal(0, 1, (2000, 2))
+    directions[:5] = 0.0  # Standing still never stops
+    positions[5], directions[5] = [16.0, 20.0], [0.2, 1.0]  # Approaching the NS crossing
+    
+    for states in (('red', 'green'), ('green', 'red'), ('red', 'red')):
+        for light, state in zip(env.traffic_lights, states):
+            light['state'] = state
+        mask = env.get_traffic_light_stop_mask(positions, directions)
+        expected = [reference(p, d) for p, d in zip(positions, directions)]
+        assert mask.tolist() == expected
+        assert mask.any()
+        assert not mask[:5].any()
+    
+    assert env.get_traffic_light_state(positions[5], directions[5]) == (True, "Red light at light_ns")
+    env.traffic_lights[0]['state'] = 'green'
+    assert env.get_traffic_light_state(positions[5], directions[5]) == (False, "")
+    assert Environment(10, 10).get_traffic_light_stop_mask(positions, directions).sum() == 0
+    
+    print("✓ Traffic Lights tests passed")
+
+
 def test_events():
     """Test event system."""
     print("Testing Event System...")
@@ -175,9 +892,268 @@ def test_simulator():
     assert 'pedestrians' in state
     assert 'stats' in state
     
+    # total_panic counts pedestrians exiting this step with their own panic
+    panic_env = Environment(30, 10)
+    panic_env.add_boundary_walls()
+    panic_env.add_exit((28, 5), radius=1.5)
+    panic_sim = Simulator(panic_env, dt=0.1)
+    staying = Pedestrian(0, np.array([5.0, 5.0]), np.array([28.0, 5.0]), pool=panic_sim.pool)
+    leaving = Pedestrian(1, np.array([27.5, 5.0]), np.array([28.0, 5.0]), pool=panic_sim.pool)
+    staying.set_panic_level(0.2)
+    leaving.set_panic_level(0.9)
+    panic_sim.pedestrians = [staying, leaving]
+    panic_sim.step()
+    assert panic_sim.stats['exited'] == 1 and not leaving.active
+    assert np.isclose(panic_sim.stats['total_panic'], 1.1)
+    
+    # Hazard-derived structures are refreshed only when hazards change
+    sim.event_manager.schedule_fire(sim.time, (15, 5), radius=1.0)
+    sim.step()
+    version = sim.pathfinder.version
+    assert env.hazard_version == 1
+    for _ in range(20):
+        sim.step()
+    assert sim.pathfinder.version == version
+    env.remove_hazard(0)
+    sim.step()
+    assert sim.pathfinder.version > version
+    assert sim.pathfinder.hazard_zones == []
+    
     print("✓ Simulator tests passed")
 
 
+def test_headless_runner():
+    """Test run_for / run_until / run_until_evacuated and chunked recording."""
+    print("Testing Headless Runner...")
+    env = Environment(30, 10)
+    env.add_boundary_walls()
+    env.add_entrance((2, 5), radius=1.5, flow_rate=5.0)
+    env.add_exit((28, 5), radius=1.5)
+    
+    sim = Simulator(env, dt=0.1, config={'simulation': {'max_simulation_time': 120.0}})
+    assert sim.max_simulation_time == 120.0
+    assert Simulator(env).max_simulation_time == 300.0  # From config.json
+    sim.target_pedestrian_count = 10
+    sim.recorder.chunk_size = 7
+    sim.start_recording()
+    
+    assert sim.run_until(lambda s: s.stats['spawned'] >= 3)
+    assert sim.stats['spawned'] == 3  # Stops on the step that met the condition
+    start = sim.time
+    assert sim.run_for(2.0) == 20
+    assert np.isclose(sim.time, start + 2.0)
+    
+    # Recorded frames match the per-pedestrian dictionaries of the live state
+    frames = sim.trajectory_data
+    assert len(frames) == len(sim.recorder) == int(round(sim.time / sim.dt))
+    assert len(sim.recorder.chunks) >= 3
+    sim.step()
+    last = sim.trajectory_data[-1]
+    assert np.isclose(last['time'], sim.time - sim.dt)
+    assert len(last['pedestrians']) > 0
+    assert last['pedestrians'] == sim.get_state()['pedestrians']
+    arrays = sim.recorder.to_arrays()
+    assert len(arrays['times']) == len(frames) + 1
+    assert arrays['offsets'][-1] == len(arrays['ids']) == sum(len(f['pedestrians']) for f in sim.trajectory_data)
+    
+    assert sim.run_until_evacuated()
+    assert sim.is_evacuated() and sim.stats['exited'] == 10
+    assert sim.time < 120.0
+    
+    # Gives up at max_time
+    sim.reset()
+    sim.target_pedestrian_count = 1000
+    assert not sim.run_until_evacuated(max_time=1.0)
+    assert np.isclose(sim.time, 1.0)
+    assert len(sim.recorder) == 10
+    
+    # close() (also on reset and leaving a with block) stops path workers
+    starts = [np.array([3.0, 3.0]), np.array([3.0, 7.0])]
+    goals = [np.array([27.0, 5.0])] * 2
+    with Simulator(env, dt=0.1) as pooled:
+        pooled.pathfinder.find_paths(starts, goals, workers=2)
+        assert pooled.pathfinder._executor is not None
+        pooled.reset()
+        assert pooled.pathfinder._executor is None
+        pooled.pathfinder.find_paths([s + 1.0 for s in starts], goals, workers=2)
+        assert pooled.pathfinder._executor is not None
+    assert pooled.pathfinder._executor is None
+    
+    print("✓ Headless Runner tests passed")
+
+
+def test_random_streams():
+    """Test that seeded simulators are reproducible and leave np.random alone."""
+    print("Testing Random Streams...")
+    env = Environment(30, 10)
+    env.add_boundary_walls()
+    env.add_entrance((2, 5), radius=1.5, flow_rate=5.0)
+    env.add_exit((28, 3), radius=1.5)
+    env.add_exit((28, 7), radius=1.5)
+    
+    def run(sim):
+        sim.target_pedestrian_count = 8
+        sim.pre_populate_pedestrians(4)
+        sim.run_for(3.0)
+        return sim.pool.positions[[p.slot for p in sim.pedestrians]].copy()
+    
+    np.random.seed(123)
+    global_state = np.random.get_state()[1].copy()
+    first = run(Simulator(env, dt=0.1, seed=7))
+    assert np.array_equal(np.random.get_state()[1], global_state)
+    
+    # Same seed (argument or config.json random_seed) -> identical trajectories
+    assert np.array_equal(run(Simulator(env, dt=0.1, seed=7)), first)
+    configured = Simulator(env, dt=0.1, config={'simulation': {'random_seed': 7}})
+    assert configured.random_seed == 7
+    assert np.array_equal(run(configured), first)
+    assert configured.social_force.rng is configured.rng
+    
+    # reset() replays the same stream, reseed() switches to another one
+    configured.reset()
+    assert np.array_equal(run(configured), first)
+    configured.reset()
+    configured.reseed(8)
+    other = run(configured)
+    assert other.shape != first.shape or not np.array_equal(other, first)
+    
+    print("✓ Random Streams tests passed")
+
+
+def test_checkpoint():
+    """Test that a restored checkpoint continues exactly like the original run."""
+    print("Testing Checkpoint/Restore...")
+    
+    def build():
+        env = Environment(30, 10)
+        env.add_boundary_walls()
+        env.add_entrance((2, 5), radius=1.5, flow_rate=5.0)
+        env.add_exit((28, 3), radius=1.5)
+        env.add_exit((28, 7), radius=1.5)
+        sim = Simulator(env, dt=0.1, seed=3)
+        sim.target_pedestrian_count = 20
+        sim.event_manager.schedule_fire(2.0, (15, 5), 2.0)
+        sim.event_manager.schedule_exit_closure(6.0, 0)
+        return sim
+    
+    original = build()
+    original.run_for(4.0)
+    snapshot = original.checkpoint()
+    assert isinstance(snapshot, bytes)
+    original.run_for(8.0)
+    
+    branch = build()
+    branch.restore(snapshot)
+    assert np.isclose(branch.time, 4.0)
+    assert len(branch.environment.hazard_zones) == 1
+    # Restored paths keep the shared-path contract: tuples of read-only arrays
+    assert all(isinstance(p.path, tuple) and not any(w.flags.writeable for w in p.path)
+               for p in branch.pedestrians)
+    branch.run_for(8.0)
+    
+    assert branch.time == original.time
+    assert branch.stats == original.stats
+    assert np.array_equal(branch.exit_counts, original.exit_counts)
+    assert not branch.environment.exits[0]['active']
+    assert [p.id for p in branch.pedestrians] == [p.id for p in original.pedestrians]
+    assert branch.get_state()['pedestrians'] == original.get_state()['pedestrians']
+    
+    # Restoring rewinds a simulator that has moved on
+    original.restore(snapshot)
+    assert np.isclose(original.time, 4.0) and original.environment.exits[0]['active']
+    
+    try:
+        Simulator(Environment(30, 10)).restore(snapshot)
+        assert False, "Expected ValueError for a different scenario"
+    except ValueError:
+        pass
+    
+    print("✓ Checkpoint/Restore tests passed")
+
+
+def test_ensemble_runner():
+    """Test seeded Monte Carlo replicates and their summary."""
+    from src.simulation.ensemble import EnsembleRunner
+    print("Testing Ensemble Runner...")
+    env = Environment(30, 10)
+    env.add_boundary_walls()
+    env.add_entrance((2, 5), radius=1.5, flow_rate=5.0)
+    env.add_exit((28, 2), radius=1.5)
+    env.add_exit((28, 8), radius=1.5)
+    sim = Simulator(env, dt=0.1)
+    sim.target_pedestrian_count = 8
+    sim.exit_selection_mode = 'random'
+    
+    runner = EnsembleRunner(sim, sample_interval=5.0, max_time=60.0)
+    summary = runner.run(4, seeds=[1, 2, 3, 4])
+    assert sim.time == 0.0 and sim.stats['spawned'] == 0  # Template untouched
+    
+    assert summary['exited'].shape == (4, len(runner.sample_times))
+    assert summary['exit_counts'].shape == (4, 2)
+    assert np.all(summary['exit_counts'].sum(axis=1) == summary['exited'][:, -1])
+    assert np.all(np.diff(summary['exited'], axis=1) >= 0)
+    assert summary['evacuated_fraction'] == 1.0
+    assert np.all(summary['evacuation_times'] <= 60.0)
+    assert len(set(map(tuple, summary['exit_counts']))) > 1  # Seeds differ
+    assert np.all(summary['exited_low'] <= summary['exited_mean'])
+    assert np.all(summary['exited_mean'] <= summary['exited_high'])
+    assert (summary['evacuation_time_low'] <= summary['evacuation_time_mean'] <=
+            summary['evacuation_time_high'])
+    
+    # Replicates are reproducible, in-process or in worker processes
+    again = runner.run(2, seeds=[2, 3], workers=2)
+    assert np.array_equal(again['exited'], summary['exited'][1:3])
+    assert np.array_equal(again['exit_counts'], summary['exit_counts'][1:3])
+    
+    print("✓ Ensemble Runner tests passed")
+
+
+def test_diagnostics():
+    """Test sampled, category-based logging of simulation diagnostics."""
+    import logging
+    from src.simulation.diagnostics import diagnostics
+    print("Testing Diagnostics...")
+    
+    records = []
+    
+    class Collect(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+    
+    handler = Collect()
+    spawn_logger = logging.getLogger('ped_sim.spawn')
+    spawn_logger.addHandler(handler)
+    try:
+        env = Environment(20, 10)
+        env.add_entrance((2, 5), radius=1.0)
+        env.add_exit((18, 5))
+        sim = Simulator(env, dt=0.1)
+        
+        # Disabled by default: nothing is formatted or emitted
+        assert not diagnostics.enabled('spawn')
+        sim.spawn_pedestrian(0)
+        assert records == []
+        
+        spawn_logger.setLevel(logging.DEBUG)
+        diagnostics.set_sampling('spawn', every=3)
+        for _ in range(7):
+            sim.spawn_pedestrian(0)
+        assert len(records) == 3  # Spawns 1, 4 and 7
+        assert records[0].name == 'ped_sim.spawn'
+        assert 'Spawning ped at entrance 0' in records[0].getMessage()
+        
+        diagnostics.set_sampling('spawn', interval=3600.0)
+        for _ in range(5):
+            sim.spawn_pedestrian(0)
+        assert len(records) == 4  # Rate limited to one message
+    finally:
+        spawn_logger.removeHandler(handler)
+        spawn_logger.setLevel(logging.NOTSET)
+        diagnostics.set_sampling('spawn')
+    
+    print("✓ Diagnostics tests passed")
+
+
 def test_unity_exporter():
     """Test Unity exporter."""
     print("Testing Unity Exporter...")
@@ -200,6 +1176,9 @@ def test_unity_exporter():
     filepath = exporter.export_simulation(sim, filename='test_export.json')
     
     assert os.path.exists(filepath)
+    with open(filepath, 'r') as f:
+        exported = json.load(f)
+    assert exported['metadata']['frame_count'] == len(sim.trajectory_data) == len(sim.recorder)
     
     # Export template
     template_path = exporter.export_unity_scene_template('test_template.txt')
@@ -221,11 +1200,31 @@ def run_all_tests():
     
     try:
         test_pedestrian()
+        test_pedestrian_pool()
         test_social_force()
+        test_social_force_batch()
+        test_spatial_hash()
+        test_wall_index()
+        test_hazard_index()
         test_pathfinding()
+        test_landmark_heuristic()
+        test_path_smoothing()
+        test_navmesh()
+        test_grid_rasterization()
+        test_walkable_mask()
+        test_jump_point_search()
+        test_incremental_replanning()
+        test_hierarchical_pathfinding()
+        test_flow_field()
         test_environment()
+        test_traffic_lights()
         test_events()
         test_simulator()
+        test_headless_runner()
+        test_random_streams()
+        test_checkpoint()
+        test_ensemble_runner()
+        test_diagnostics()
         test_unity_exporter()
         
         print("\n" + "=" * 50)